@@ -0,0 +1,124 @@
+"""
+Dynamic micro-batching of single predictions.
+Concurrent requests are grouped into one vectorized model call.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+import numpy as np
+from loguru import logger
+
+from api.metrics import enregistrer_micro_lot
+
+
+class MicroBatcher:
+    """
+    Group concurrent single-row predictions into one vectorized call.
+
+    Callers submit one feature row and block on a Future. A background
+    thread takes the first waiting row, keeps collecting until `max_batch_size`
+    rows are queued or `max_wait_s` has elapsed, runs `predict_fn` once on the
+    stacked rows and fans the results back out.
+
+    The thread is started lazily on first use, and restarted if the process
+    was forked after it started.
+
+    Attributes:
+        predict_fn: Function mapping an (n, d) array to (class indices, probabilities)
+        max_batch_size: Maximum number of rows per model call
+        max_wait_s: Maximum time a batch stays open after its first row
+    """
+
+    def __init__(self, predict_fn: Callable, max_batch_size: int = 64, max_wait_s: float = 0.002):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_s)
+        self._file = queue.SimpleQueue()
+        self._verrou = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, features: np.ndarray) -> Future:
+        """
+        Queue one feature row for prediction.
+
+        Args:
+            features: Array of shape (d,)
+
+        Returns:
+            Future resolving to (class index, probabilities row)
+        """
+        self._demarrer()
+        future = Future()
+        self._file.put((features, time.perf_counter(), future))
+        return future
+
+    def predict(self, features: np.ndarray) -> tuple:
+        """
+        Predict one feature row and wait for the result.
+
+        Args:
+            features: Array of shape (d,)
+
+        Returns:
+            Tuple (class index, probabilities row)
+        """
+        return self.submit(features).result()
+
+    def _demarrer(self) -> None:
+        """
+        Start the batching thread if it is not running in this process.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._verrou:
+            if self._pid == os.getpid():
+                return
+            self._file = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._boucle, name="micro-batcher", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            logger.info(
+                f"Micro-batching actif: lot max={self.max_batch_size}, "
+                f"attente max={self.max_wait_s * 1e6:.0f}µs"
+            )
+
+    def _collecter(self) -> list:
+        """
+        Block until a row arrives, then gather rows until the batch is full
+        or the wait budget is spent.
+        """
+        lot = [self._file.get()]
+        echeance = time.perf_counter() + self.max_wait_s
+        while len(lot) < self.max_batch_size:
+            restant = echeance - time.perf_counter()
+            try:
+                lot.append(self._file.get(timeout=restant) if restant > 0 else self._file.get_nowait())
+            except queue.Empty:
+                break
+        return lot
+
+    def _boucle(self) -> None:
+        """
+        Batching loop run by the background thread.
+        """
+        while True:
+            lot = self._collecter()
+            debut = time.perf_counter()
+            enregistrer_micro_lot(len(lot), [debut - arrivee for _, arrivee, _ in lot])
+
+            try:
+                indices, probas = self.predict_fn(np.vstack([features for features, _, _ in lot]))
+            except Exception as e:
+                logger.error(f"Erreur lors de la prédiction d'un micro-lot: {e}")
+                for _, _, future in lot:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, _, future) in enumerate(lot):
+                future.set_result((int(indices[i]), probas[i]))
@@ -0,0 +1,206 @@
+"""
+Content-addressed on-disk cache of Evidently report results.
+A report is keyed on the hash of its input data, of the preset configuration
+and of the Evidently version; its results dictionary (and HTML file when
+one was saved) are kept on disk, evicting the least recently used reports
+past a size budget, so identical reports are not computed again.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import evidently
+import pandas as pd
+from loguru import logger
+
+from api import config
+from api.reference import ProfilReference
+
+# Format of the cache entries; entries of another version are never read
+VERSION_CACHE = 1
+
+
+def empreinte_donnees(donnees) -> Optional[str]:
+    """
+    Hash the content of report input data.
+
+    A profile built from a CSV is identified by the hash of that CSV and of
+    its schema; a DataFrame by its column names, dtypes and row values (the
+    index is ignored, as by the reports).
+
+    Args:
+        donnees: DataFrame or `ProfilReference`
+
+    Returns:
+        Hex digest, or None if the data cannot be hashed
+    """
+    if isinstance(donnees, ProfilReference):
+        if donnees.meta.get("source_sha256"):
+            return f"profil:{donnees.meta['source_sha256']}:{donnees.meta['schema_sha256']}"
+        donnees = donnees.dataframe()
+    try:
+        lignes = pd.util.hash_pandas_object(donnees, index=False).to_numpy()
+    except TypeError:
+        return None
+    empreinte = hashlib.sha256()
+    empreinte.update(json.dumps([(str(nom), str(dtype)) for nom, dtype in donnees.dtypes.items()]).encode())
+    empreinte.update(lignes.tobytes())
+    return empreinte.hexdigest()
+
+
+def cle_rapport(rapport: str, preset, reference_data, current_data, parametres: dict) -> Optional[str]:
+    """
+    Compute the cache key of a report.
+
+    Args:
+        rapport: Report name, e.g. "drift"
+        preset: Evidently preset of the report
+        reference_data: Reference data, or its `ProfilReference`
+        current_data: Current data
+        parametres: Other arguments changing the results (e.g. column names)
+
+    Returns:
+        Key, or None if the inputs cannot be hashed
+    """
+    reference = empreinte_donnees(reference_data)
+    courant = empreinte_donnees(current_data)
+    if reference is None or courant is None:
+        return None
+    description = {
+        "cache": VERSION_CACHE,
+        "evidently": evidently.__version__,
+        "rapport": rapport,
+        "preset": preset.dict(),
+        "parametres": parametres,
+        "reference": reference,
+        "courant": courant,
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CacheRapports:
+    """
+    Directory of report results, with size-based LRU eviction.
+
+    Each entry is "<key>.json" (results dictionary) and optionally
+    "<key>.html". Files are written under temporary names and renamed, so
+    processes sharing the directory never read a partial entry; reading an
+    entry refreshes its modification time, which orders the eviction.
+
+    Attributes:
+        dossier: Directory of the entries
+        taille_max: Total size of the entries above which the least
+            recently used ones are deleted, in bytes
+    """
+
+    def __init__(self, dossier: Path, taille_max: int):
+        self.dossier = Path(dossier)
+        self.taille_max = taille_max
+
+    def lire(self, cle: str, avec_html: bool = False) -> Optional[tuple]:
+        """
+        Read a cached report.
+
+        Args:
+            cle: Key from `cle_rapport`
+            avec_html: Only return the entry if its HTML file is cached too
+
+        Returns:
+            Tuple (results dictionary, HTML path or None), or None on a miss
+        """
+        chemin = self.dossier / f"{cle}.json"
+        html = self.dossier / f"{cle}.html"
+        try:
+            resultats = json.loads(chemin.read_text())
+            if avec_html and not html.exists():
+                return None
+            os.utime(chemin)
+        except (OSError, ValueError):
+            return None
+        return resultats, html if html.exists() else None
+
+    def ecrire(self, cle: str, resultats: dict, html: Optional[Path] = None) -> int:
+        """
+        Store a report, then evict entries past the size budget.
+
+        Args:
+            cle: Key from `cle_rapport`
+            resultats: Results dictionary of the report
+            html: HTML file of the report, copied into the cache (optional)
+
+        Returns:
+            Number of entries evicted
+        """
+        try:
+            self.dossier.mkdir(parents=True, exist_ok=True)
+            suffixe = f".{os.getpid()}.tmp"
+            if html is not None:
+                temporaire = self.dossier / f"{cle}.html{suffixe}"
+                shutil.copyfile(html, temporaire)
+                os.replace(temporaire, self.dossier / f"{cle}.html")
+            temporaire = self.dossier / f"{cle}.json{suffixe}"
+            temporaire.write_text(json.dumps(resultats, default=str))
+            os.replace(temporaire, self.dossier / f"{cle}.json")
+            return self._evincer()
+        except OSError as e:
+            logger.warning(f"Rapport non mis en cache: {e}")
+            return 0
+
+    def _entrees(self) -> list:
+        """
+        List the entries, least recently used first.
+
+        Returns:
+            List of (last use time, size in bytes, files of the entry)
+        """
+        entrees = {}
+        for fichier in self.dossier.iterdir():
+            if fichier.suffix not in (".json", ".html"):
+                continue
+            try:
+                statut = fichier.stat()
+            except FileNotFoundError:
+                continue
+            utilisation, taille, fichiers = entrees.get(fichier.stem, (0.0, 0, []))
+            if fichier.suffix == ".json":
+                utilisation = statut.st_mtime
+            entrees[fichier.stem] = (utilisation, taille + statut.st_size, fichiers + [fichier])
+        return sorted(entrees.values(), key=lambda entree: entree[0])
+
+    def _evincer(self) -> int:
+        """
+        Delete the least recently used entries until the cache fits its budget.
+
+        Returns:
+            Number of entries evicted
+        """
+        entrees = self._entrees()
+        total = sum(taille for _, taille, _ in entrees)
+        evincees = 0
+        for _, taille, fichiers in entrees:
+            if total <= self.taille_max:
+                break
+            for fichier in fichiers:
+                fichier.unlink(missing_ok=True)
+            total -= taille
+            evincees += 1
+        return evincees
+
+    def taille(self) -> int:
+        """
+        Total size of the entries in bytes.
+        """
+        if not self.dossier.exists():
+            return 0
+        return sum(taille for _, taille, _ in self._entrees())
+
+
+DOSSIER_CACHE = Path(config.REPORT_CACHE_DIR or Path(__file__).resolve().parent.parent / "reports" / "cache" / "evidently")
+
+cache_rapports = None
+if config.REPORT_CACHE_MAX_MB > 0:
+    cache_rapports = CacheRapports(DOSSIER_CACHE, int(config.REPORT_CACHE_MAX_MB * 1024 * 1024))
@@ -0,0 +1,144 @@
+"""
+Compilation of the two-feature model into a decision table.
+Tree ensembles split the fare axis into intervals with a constant output;
+tabulating those intervals for each sex turns inference into a
+`numpy.searchsorted` lookup.
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+from sklearn.pipeline import Pipeline
+
+
+def _arbres(estimateur) -> Optional[list]:
+    """
+    List the fitted trees of a tree or tree ensemble.
+
+    Args:
+        estimateur: Final estimator of the pipeline
+
+    Returns:
+        List of sklearn Tree objects, or None if the estimator is not tree-based
+    """
+    if isinstance(estimateur, Pipeline):
+        estimateur = estimateur.steps[-1][1]
+    if hasattr(estimateur, "tree_"):
+        return [estimateur.tree_]
+    sous_estimateurs = getattr(estimateur, "estimators_", None)
+    if sous_estimateurs is not None and all(hasattr(e, "tree_") for e in np.ravel(sous_estimateurs)):
+        return [e.tree_ for e in np.ravel(sous_estimateurs)]
+    return None
+
+
+def _representants(seuils: np.ndarray) -> np.ndarray:
+    """
+    Pick one float32 value inside each interval delimited by the thresholds.
+
+    Trees compare float32 inputs with `x <= seuil`, so interval i is
+    (seuils[i-1], seuils[i]], the last one being (seuils[-1], +inf).
+
+    Args:
+        seuils: Sorted unique thresholds
+
+    Returns:
+        Array of len(seuils) + 1 float32-representable values
+    """
+    if len(seuils) == 0:
+        return np.zeros(1)
+    bornes = seuils.astype(np.float32)
+    trop_grands = bornes.astype(np.float64) > seuils
+    bornes[trop_grands] = np.nextafter(bornes[trop_grands], np.float32(-np.inf))
+    dernier = np.float32(seuils[-1])
+    while float(dernier) <= seuils[-1]:
+        dernier = np.nextafter(dernier, np.float32(np.inf))
+    return np.append(bornes, dernier).astype(np.float64)
+
+
+class CompiledModel:
+    """
+    Decision table equivalent to a tree-based pipeline on [Sex, Fare].
+
+    For each sex, the (preprocessed) fare axis is cut at every fare
+    threshold used by the trees; the table holds the class probabilities of
+    each interval.
+
+    Attributes:
+        seuils: Sorted fare thresholds, in the preprocessed space
+        table: Probabilities, shape (2, len(seuils) + 1, n_classes)
+    """
+
+    def __init__(self, pretraitement: Callable, colonne_fare: int, seuils: np.ndarray, table: np.ndarray):
+        self._pretraitement = pretraitement
+        self._colonne_fare = colonne_fare
+        self.seuils = seuils
+        self.table = table
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Look up class probabilities.
+
+        Args:
+            features: Array of shape (n, 2) with columns Sex (0/1), Fare
+
+        Returns:
+            Array of shape (n, n_classes)
+        """
+        fare = self._pretraitement(features)[:, self._colonne_fare]
+        intervalles = np.searchsorted(self.seuils, fare.astype(np.float32), side="left")
+        return self.table[features[:, 0].astype(np.intp), intervalles]
+
+
+def compiler_modele(pretraitement: Callable, estimateur) -> Optional[CompiledModel]:
+    """
+    Tabulate a tree-based estimator over the fare axis for each sex.
+
+    Args:
+        pretraitement: Function mapping [Sex, Fare] rows to the estimator inputs
+        estimateur: Fitted estimator (or pipeline tail) consuming those inputs
+
+    Returns:
+        CompiledModel, or None if the estimator is not tree-based
+    """
+    arbres = _arbres(estimateur)
+    if arbres is None:
+        logger.info("Modèle non arborescent: compilation en table impossible")
+        return None
+
+    sondes = pretraitement(np.array([[0.0, 1.0], [0.0, 2.0], [1.0, 1.0]]))
+    colonne_fare = int(np.flatnonzero(sondes[0] != sondes[1])[0])
+
+    seuils = np.unique(np.concatenate([
+        arbre.threshold[arbre.feature == colonne_fare] for arbre in arbres
+    ]))
+    representants = _representants(seuils)
+
+    table = []
+    for sex in (0.0, 1.0):
+        entrees = np.repeat(pretraitement(np.array([[sex, 0.0]])), len(representants), axis=0)
+        entrees[:, colonne_fare] = representants
+        table.append(estimateur.predict_proba(entrees))
+
+    logger.info(f"Modèle compilé: {len(representants)} intervalles de prix par sexe")
+    return CompiledModel(pretraitement, colonne_fare, seuils, np.stack(table))
+
+
+def verifier_modele_compile(modele: CompiledModel, reference: Callable, features: np.ndarray) -> bool:
+    """
+    Check that a compiled model reproduces the reference pipeline.
+
+    Args:
+        modele: Compiled model
+        reference: Function returning the pipeline probabilities for features
+        features: Array of shape (n, 2) of [Sex, Fare] rows to compare on
+
+    Returns:
+        True if every probability matches
+    """
+    ecart = np.abs(modele.predict_proba(features) - reference(features)).max()
+    if ecart > 1e-12:
+        logger.warning(f"Table compilée incohérente avec le pipeline (écart max={ecart:.2e})")
+        return False
+    logger.info(f"Table compilée vérifiée sur {len(features)} lignes")
+    return True
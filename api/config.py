@@ -0,0 +1,146 @@
+"""
+Configuration of the Titanic ML API.
+Values are read from environment variables, with defaults suited to a
+single-container deployment.
+"""
+
+import os
+
+
+def _lire_bool(nom: str, defaut: bool = False) -> bool:
+    """
+    Read a boolean environment variable.
+
+    Args:
+        nom: Variable name
+        defaut: Value used when the variable is not set
+
+    Returns:
+        True for "1", "true", "yes" or "on" (case-insensitive)
+    """
+    valeur = os.getenv(nom)
+    if valeur is None:
+        return defaut
+    return valeur.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Micro-batching of /predict
+PREDICT_BATCHING_ENABLED = _lire_bool("PREDICT_BATCHING_ENABLED")
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+PREDICT_BATCH_MAX_WAIT_US = int(os.getenv("PREDICT_BATCH_MAX_WAIT_US", "2000"))
+
+# Dedicated thread pool for model inference
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", str(min(4, os.cpu_count() or 1))))
+
+# Streaming NDJSON scoring
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "10000"))
+# Longer lines are answered with an error and skipped without being buffered
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
+
+# LRU cache of single predictions
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_FARE_STEP = float(os.getenv("PREDICTION_CACHE_FARE_STEP", "0"))
+
+# Decision-table compilation of tree-based models
+MODEL_COMPILED = _lire_bool("MODEL_COMPILED")
+
+# Hot reload of the model file (0 disables the file watcher)
+MODEL_WATCH_INTERVAL_S = float(os.getenv("MODEL_WATCH_INTERVAL_S", "0"))
+
+# Token expected in "Authorization: Bearer <token>" by the /admin endpoints
+# (unset disables them)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Ground-truth feedback: store shared by the workers (SQLite file, defaults
+# to reports/feedback/feedback.sqlite), number of predictions kept for
+# joining labels, and lengths (s) of the sliding windows of live accuracy
+FEEDBACK_DB_FILE = os.getenv("FEEDBACK_DB_FILE")
+FEEDBACK_STORE_SIZE = int(os.getenv("FEEDBACK_STORE_SIZE", "100000"))
+FEEDBACK_WINDOWS_S = [float(d) for d in os.getenv("FEEDBACK_WINDOWS_S", "300,3600,86400").split(",") if d.strip()]
+
+# Live drift detection on the scored traffic
+DRIFT_MONITOR_ENABLED = _lire_bool("DRIFT_MONITOR_ENABLED", True)
+DRIFT_REFERENCE_FILE = os.getenv("DRIFT_REFERENCE_FILE", "titanic_train.csv")
+DRIFT_WINDOW_S = float(os.getenv("DRIFT_WINDOW_S", "3600"))
+DRIFT_FARE_BINS = int(os.getenv("DRIFT_FARE_BINS", "10"))
+# Directory of the reference profiles (defaults to models/profiles)
+REFERENCE_PROFILE_DIR = os.getenv("REFERENCE_PROFILE_DIR")
+DRIFT_PSI_THRESHOLD = float(os.getenv("DRIFT_PSI_THRESHOLD", "0.2"))
+DRIFT_MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", "100"))
+DRIFT_UPDATE_INTERVAL_S = float(os.getenv("DRIFT_UPDATE_INTERVAL_S", "10"))
+
+# In-memory history of recent predictions (number of passengers kept)
+RECENT_PREDICTIONS_SIZE = int(os.getenv("RECENT_PREDICTIONS_SIZE", "100000"))
+
+# Reservoir samples of the scored traffic: rows kept per window and
+# predicted class (0 disables them), window length (s) and windows kept
+SAMPLE_RESERVOIR_SIZE = int(os.getenv("SAMPLE_RESERVOIR_SIZE", "10000"))
+SAMPLE_WINDOW_S = float(os.getenv("SAMPLE_WINDOW_S", "3600"))
+SAMPLE_WINDOWS = int(os.getenv("SAMPLE_WINDOWS", "24"))
+# Directory where the workers share their reservoirs (defaults to
+# reports/samples) and time (s) between two writes of a worker's reservoirs
+SAMPLE_SHARED_DIR = os.getenv("SAMPLE_SHARED_DIR")
+SAMPLE_SHARE_INTERVAL_S = float(os.getenv("SAMPLE_SHARE_INTERVAL_S", "5"))
+
+# Application logs: file written by a background thread through a bounded
+# queue (records are dropped when it is full), as JSON lines or plain text,
+# rotated past LOG_ROTATION_MB and gzip-compressed, LOG_BACKUPS files kept
+LOG_FILE = os.getenv("LOG_FILE", "logs/api.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_JSON = _lire_bool("LOG_JSON", True)
+LOG_ROTATION_MB = float(os.getenv("LOG_ROTATION_MB", "500"))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "10"))
+LOG_COMPRESSION = _lire_bool("LOG_COMPRESSION", True)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# One log file per process (LOG_FILE with the PID before the extension), so
+# that gunicorn workers never rotate the same file; on by default with
+# several workers
+LOG_FILE_PER_PROCESS = _lire_bool("LOG_FILE_PER_PROCESS", int(os.getenv("WEB_CONCURRENCY", "1")) > 1)
+# Predictions are logged as a summary every LOG_SUMMARY_INTERVAL_S seconds
+# (0 disables it), and one by one for a share LOG_PREDICTION_SAMPLE_RATE
+LOG_SUMMARY_INTERVAL_S = float(os.getenv("LOG_SUMMARY_INTERVAL_S", "60"))
+LOG_PREDICTION_SAMPLE_RATE = float(os.getenv("LOG_PREDICTION_SAMPLE_RATE", "0"))
+
+# Durable prediction log, as hourly-partitioned Parquet files
+# (directory defaults to reports/predictions)
+PREDICTION_LOG_ENABLED = _lire_bool("PREDICTION_LOG_ENABLED", True)
+PREDICTION_LOG_DIR = os.getenv("PREDICTION_LOG_DIR")
+PREDICTION_LOG_FLUSH_S = float(os.getenv("PREDICTION_LOG_FLUSH_S", "5"))
+PREDICTION_LOG_BATCH_ROWS = int(os.getenv("PREDICTION_LOG_BATCH_ROWS", "50000"))
+PREDICTION_LOG_MAX_PENDING_ROWS = int(os.getenv("PREDICTION_LOG_MAX_PENDING_ROWS", "1000000"))
+
+# Process pool running the Evidently reports of generer_rapport_complet
+# concurrently (1 runs them one after another in the calling process)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+# On-disk cache of Evidently report results (directory defaults to
+# reports/cache/evidently, 0 MB disables the cache)
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR")
+REPORT_CACHE_MAX_MB = float(os.getenv("REPORT_CACHE_MAX_MB", "256"))
+
+# Cached evaluation of the model on the test dataset (defaults to
+# reports/cache/evaluation.json)
+EVALUATION_CACHE_FILE = os.getenv("EVALUATION_CACHE_FILE")
+
+# Maximum rows of each dataset given to a drift or classification report;
+# larger inputs are sampled down (0 disables sampling)
+REPORT_SAMPLE_SIZE = int(os.getenv("REPORT_SAMPLE_SIZE", "50000"))
+
+# Asynchronous report jobs of the API: directory of their results (defaults
+# to reports/jobs), processes running them, and pending or running jobs
+# accepted before new submissions are refused
+REPORT_JOBS_DIR = os.getenv("REPORT_JOBS_DIR")
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "1"))
+REPORT_JOB_MAX_ACTIVE = int(os.getenv("REPORT_JOB_MAX_ACTIVE", "8"))
+
+# Scheduled drift and classification monitoring in a separate process
+# (0 disables the scheduler)
+MONITOR_INTERVAL_S = float(os.getenv("MONITOR_INTERVAL_S", "0"))
+MONITOR_WINDOW_S = float(os.getenv("MONITOR_WINDOW_S", "3600"))
+MONITOR_MIN_ROWS = int(os.getenv("MONITOR_MIN_ROWS", "100"))
+# Lock file electing the worker that runs the scheduler (defaults to
+# reports/cache/monitoring.lock)
+MONITOR_LOCK_FILE = os.getenv("MONITOR_LOCK_FILE")
+MONITOR_LABELLED_FILE = os.getenv("MONITOR_LABELLED_FILE", "titanic_test.csv")
+# Drift engine of the scheduled monitoring: "evidently" or "numpy"
+MONITOR_DRIFT_ENGINE = os.getenv("MONITOR_DRIFT_ENGINE", "evidently")
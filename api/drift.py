@@ -0,0 +1,287 @@
+"""
+Streaming drift detection on live traffic.
+Every scored batch is binned into fixed histograms of Sex, Fare and the
+predicted class over a sliding time window; PSI, Kolmogorov-Smirnov and
+Jensen-Shannon statistics against the reference bins update the drift
+gauges continuously, without Evidently or DataFrames.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+from api import config
+from api.metrics import mettre_a_jour_drift_live
+from api.predict import DATA_DIR, FEATURES, MODEL_PATH, manager
+from api.reference import ProfilReference, charger_profil, dossier_profil
+
+# Live features: the two model inputs, then the predicted class
+VARIABLES = FEATURES + ("prediction",)
+
+# Smoothing of empty bins in PSI
+EPSILON = 1e-4
+
+
+def comparer_distributions(reference: np.ndarray, courant: np.ndarray) -> dict:
+    """
+    Compare two histograms over the same bins.
+
+    Args:
+        reference: Counts of the reference data
+        courant: Counts of the current window
+
+    Returns:
+        Dictionary with "psi" (population stability index), "ks" (largest
+        gap between the cumulative distributions) and "js" (Jensen-Shannon
+        distance, base 2, between 0 and 1)
+    """
+    p = reference / reference.sum()
+    q = courant / courant.sum()
+
+    p_lisse = np.clip(p, EPSILON, None)
+    q_lisse = np.clip(q, EPSILON, None)
+    psi = float(np.sum((q_lisse - p_lisse) * np.log(q_lisse / p_lisse)))
+
+    ks = float(np.max(np.abs(np.cumsum(p) - np.cumsum(q))))
+
+    m = (p + q) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_p = np.where(p > 0, p * np.log2(p / m), 0.0).sum()
+        kl_q = np.where(q > 0, q * np.log2(q / m), 0.0).sum()
+    js = float(np.sqrt(max(0.0, (kl_p + kl_q) / 2)))
+
+    return {"psi": psi, "ks": ks, "js": js}
+
+
+class FenetreGlissante:
+    """
+    Counts accumulated over a sliding time window.
+
+    The window is split into `nb_seaux` buckets of equal duration held in a
+    ring: adding counts touches one bucket, and reading sums the buckets
+    still inside the window, so both cost the same whatever the traffic.
+    The window slides by whole buckets.
+
+    Attributes:
+        duree: Length of the window in seconds
+        nb_compteurs: Number of counts kept per bucket
+        nb_seaux: Number of buckets the window is split into
+    """
+
+    def __init__(self, duree: float, nb_compteurs: int, nb_seaux: int = 60):
+        self.duree = duree
+        self.nb_compteurs = nb_compteurs
+        self.nb_seaux = nb_seaux
+        self._pas = duree / nb_seaux
+        self._comptes = np.zeros((nb_seaux, nb_compteurs), dtype=np.int64)
+        self._numeros = np.full(nb_seaux, -1, dtype=np.int64)
+
+    def ajouter_comptes(self, comptes: np.ndarray, maintenant: float) -> None:
+        """
+        Add counts to the current bucket.
+
+        Args:
+            comptes: Array of `nb_compteurs` counts
+            maintenant: Time of the counts (seconds since the epoch)
+        """
+        numero = int(maintenant // self._pas)
+        position = numero % self.nb_seaux
+        if self._numeros[position] != numero:
+            self._comptes[position] = 0
+            self._numeros[position] = numero
+        self._comptes[position] += comptes
+
+    def totaux(self, maintenant: float) -> np.ndarray:
+        """
+        Sum the counts of the buckets inside the window.
+
+        Returns:
+            Array of `nb_compteurs` counts
+        """
+        numero = int(maintenant // self._pas)
+        actifs = self._numeros > numero - self.nb_seaux
+        return self._comptes[actifs].sum(axis=0)
+
+
+class MoniteurDrift:
+    """
+    Compare live traffic with the reference data over a sliding window.
+
+    The Fare bins and the reference histograms come from the profile of the
+    reference dataset (see `api.reference`); Sex and the predicted class
+    have one bin per value. The
+    counts of all bins are kept in one `FenetreGlissante`, so an update is a
+    `bincount` of the batch added to one bucket.
+
+    A variable drifts when its PSI reaches `seuil_psi`; the dataset drift
+    score is the share of drifting variables, as in Evidently's
+    DatasetDriftMetric. Statistics are recomputed at most every
+    `intervalle` seconds, and only once the window holds `min_echantillons`
+    predictions.
+
+    The reference distribution of the predicted class is the prediction of
+    the served model on the reference data, recomputed after a model change.
+
+    Each process has its own window: with several workers, each one
+    publishes the drift of the traffic it served.
+
+    Attributes:
+        duree: Length of the sliding window in seconds
+        seuil_psi: PSI from which a variable is considered drifting
+        min_echantillons: Predictions needed in the window before testing
+        intervalle: Minimum time between two statistics updates in seconds
+    """
+
+    def __init__(
+        self,
+        profil: ProfilReference,
+        duree: float = 3600,
+        seuil_psi: float = 0.2,
+        min_echantillons: int = 100,
+        intervalle: float = 10.0
+    ):
+        self.duree = duree
+        self.seuil_psi = seuil_psi
+        self.min_echantillons = min_echantillons
+        self.intervalle = intervalle
+
+        reference = np.column_stack([profil.colonnes[nom] for nom in FEATURES])
+        self._reference = reference[~np.isnan(reference).any(axis=1)]
+        fare = profil.statistiques("Fare")
+        sex = profil.statistiques("Sex")
+        self._bornes_fare = np.asarray(fare["bin_edges"])
+        # Offsets of each variable in the concatenated bins: Sex (2), Fare, prediction (2)
+        self._tailles = (2, len(fare["histogram"]), 2)
+        self._debuts = np.cumsum((0,) + self._tailles[:-1])
+
+        self._comptes_reference = np.concatenate((
+            np.bincount(np.asarray(sex["categories"]) > 0.5, weights=sex["counts"], minlength=2),
+            fare["histogram"],
+            np.zeros(2),
+        ))
+        self._modele_reference = None
+
+        self._fenetre = FenetreGlissante(duree, nb_compteurs=sum(self._tailles))
+        self._verrou = threading.Lock()
+        self._verrou_calcul = threading.Lock()
+        self._derniere_mise_a_jour = 0.0
+        self._en_drift = set()
+        self.resultats = {}
+
+    def _compter(self, features: np.ndarray, survivants: np.ndarray) -> np.ndarray:
+        """
+        Bin a batch into the concatenated histograms.
+
+        Args:
+            features: Array of shape (n, 2) with columns `FEATURES`
+            survivants: True where "Survived" was predicted
+
+        Returns:
+            Counts of every bin
+        """
+        codes = np.concatenate((
+            self._debuts[0] + (features[:, 0] > 0.5),
+            self._debuts[1] + np.searchsorted(self._bornes_fare, features[:, 1], side="right"),
+            self._debuts[2] + np.asarray(survivants, dtype=np.int64),
+        ))
+        return np.bincount(codes, minlength=sum(self._tailles))
+
+    def observer(self, features: np.ndarray, survivants: np.ndarray, maintenant: Optional[float] = None) -> None:
+        """
+        Add a scored batch to the window and refresh the statistics if due.
+
+        Args:
+            features: Array of shape (n, 2) with columns `FEATURES`
+            survivants: True where "Survived" was predicted
+            maintenant: Time of the predictions, defaults to now
+        """
+        maintenant = time.time() if maintenant is None else maintenant
+        comptes = self._compter(np.asarray(features, dtype=np.float64).reshape(-1, 2), survivants)
+        with self._verrou:
+            self._fenetre.ajouter_comptes(comptes, maintenant)
+            if maintenant - self._derniere_mise_a_jour < self.intervalle:
+                return
+            self._derniere_mise_a_jour = maintenant
+        self.calculer(maintenant)
+
+    def _reference_predictions(self) -> np.ndarray:
+        """
+        Get the reference counts, with the predicted class of the served model.
+        """
+        modele = manager.engine
+        if modele is not self._modele_reference:
+            indices, _ = modele.predict(self._reference)
+            survivants = modele.labels[indices] == "Survived"
+            debut = self._debuts[2]
+            self._comptes_reference[debut:debut + 2] = np.bincount(survivants.astype(np.int64), minlength=2)
+            self._modele_reference = modele
+        return self._comptes_reference
+
+    def calculer(self, maintenant: Optional[float] = None) -> dict:
+        """
+        Compute the drift statistics of the window and update the gauges.
+
+        Returns:
+            Dictionary with "samples", "drift_score", "drift_detected" and
+            the statistics of each variable; only "samples" while the window
+            holds fewer than `min_echantillons` predictions
+        """
+        maintenant = time.time() if maintenant is None else maintenant
+        with self._verrou_calcul:
+            return self._calculer(maintenant)
+
+    def _calculer(self, maintenant: float) -> dict:
+        """
+        Body of `calculer`, run by one thread at a time.
+        """
+        with self._verrou:
+            totaux = self._fenetre.totaux(maintenant)
+        echantillons = int(totaux[:2].sum())
+        if echantillons < self.min_echantillons:
+            return {"samples": echantillons}
+
+        reference = self._reference_predictions()
+        variables = {}
+        for nom, debut, taille in zip(VARIABLES, self._debuts, self._tailles):
+            statistiques = comparer_distributions(reference[debut:debut + taille], totaux[debut:debut + taille])
+            statistiques["drift_detected"] = statistiques["psi"] >= self.seuil_psi
+            variables[nom] = statistiques
+
+        en_drift = {nom for nom, statistiques in variables.items() if statistiques["drift_detected"]}
+        score = len(en_drift) / len(variables)
+        with self._verrou:
+            nouveaux = en_drift - self._en_drift
+            self._en_drift = en_drift
+            self.resultats = {
+                "samples": echantillons,
+                "window": self.duree,
+                "drift_score": score,
+                "drift_detected": bool(en_drift),
+                "variables": variables,
+            }
+        mettre_a_jour_drift_live(score, variables, nouveaux)
+        return self.resultats
+
+
+moniteur = None
+if config.DRIFT_MONITOR_ENABLED:
+    chemin_reference = DATA_DIR / config.DRIFT_REFERENCE_FILE
+    try:
+        profil = charger_profil(
+            chemin_reference,
+            dossier_profil(chemin_reference, config.REFERENCE_PROFILE_DIR or MODEL_PATH.parent / "profiles"),
+            nb_bins=config.DRIFT_FARE_BINS,
+        )
+        moniteur = MoniteurDrift(
+            profil,
+            duree=config.DRIFT_WINDOW_S,
+            seuil_psi=config.DRIFT_PSI_THRESHOLD,
+            min_echantillons=config.DRIFT_MIN_SAMPLES,
+            intervalle=config.DRIFT_UPDATE_INTERVAL_S,
+        )
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Détection de drift en direct désactivée: référence {chemin_reference} illisible ({e})")
+
@@ -0,0 +1,401 @@
+"""
+Reservoir samples of the scored traffic, per time window.
+Each window of `SAMPLE_WINDOW_S` seconds keeps a fixed-size uniform sample
+of the Sex/Fare inputs for each predicted class, so a bounded sample of any
+recent span can be drawn for the reports whatever the traffic volume. The
+workers share their reservoirs through files, so a sample covers all of them.
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from api import config
+from api.reference import ProfilReference, comme_dataframe
+
+# Columns of the samples and their types
+COLONNES = {
+    "Sex": np.int8,
+    "Fare": np.float64,
+    "prediction": np.int8,
+    "timestamp": np.float64,
+}
+
+# Predicted classes, as stored in the "prediction" column
+CLASSES = {0: "Died", 1: "Survived"}
+
+
+def infos_echantillonnage(lignes: int, echantillon: int) -> dict:
+    """
+    Describe a sample of `echantillon` rows drawn from `lignes` rows.
+
+    Returns:
+        Dictionary with "rows", "sampled" and "fraction"
+    """
+    return {"rows": int(lignes), "sampled": int(echantillon), "fraction": echantillon / lignes if lignes else 1.0}
+
+
+def echantillonner(donnees, taille: int, graine: int = 0) -> tuple:
+    """
+    Draw a uniform sample of at most `taille` rows of report input data.
+
+    The sample is drawn with a fixed seed, so the same data always gives
+    the same sample (and the same report cache key). Data that already is
+    a sample, as returned by `ReservoirsPredictions.echantillon`, carries
+    its population in `attrs["echantillonnage"]`, which the returned
+    description accounts for.
+
+    Args:
+        donnees: DataFrame, or `ProfilReference`
+        taille: Maximum number of rows (0 or less keeps every row)
+        graine: Random seed
+
+    Returns:
+        Tuple (data or its sample, description from `infos_echantillonnage`)
+    """
+    n = donnees.nb_lignes if isinstance(donnees, ProfilReference) else len(donnees)
+    origine = getattr(donnees, "attrs", {}).get("echantillonnage")
+    lignes = origine["rows"] if origine else n
+    if taille <= 0 or n <= taille:
+        return donnees, infos_echantillonnage(lignes, n)
+    donnees = comme_dataframe(donnees)
+    positions = np.sort(np.random.default_rng(graine).choice(n, size=taille, replace=False))
+    echantillon = donnees.iloc[positions].reset_index(drop=True)
+    echantillon.attrs = {}
+    return echantillon, infos_echantillonnage(lignes, taille)
+
+
+class _Reservoir:
+    """
+    Uniform sample of fixed capacity of a stream of rows (algorithm R).
+
+    Attributes:
+        vus: Number of rows offered to the reservoir
+    """
+
+    def __init__(self, capacite: int):
+        self.capacite = capacite
+        self.colonnes = {nom: np.zeros(capacite, dtype=type_) for nom, type_ in COLONNES.items()}
+        self.vus = 0
+
+    def __len__(self) -> int:
+        return min(self.vus, self.capacite)
+
+    def ajouter(self, valeurs: dict, n: int, rng: np.random.Generator) -> None:
+        """
+        Offer a batch of `n` rows, vectorized over the batch.
+
+        Row number i of the stream fills an empty slot, or replaces a random
+        slot with probability capacite / (i + 1); when two rows of the batch
+        draw the same slot, the later one wins, as one row at a time.
+        """
+        rangs = self.vus + np.arange(n)
+        places = np.where(rangs < self.capacite, rangs, rng.integers(0, rangs + 1))
+        gardes = places < self.capacite
+        for nom, colonne in self.colonnes.items():
+            valeur = valeurs[nom]
+            colonne[places[gardes]] = valeur[gardes] if np.ndim(valeur) else valeur
+        self.vus += n
+
+
+class ReservoirsPredictions:
+    """
+    Reservoir samples of the scored passengers, per time window and predicted class.
+
+    Every window of `duree_fenetre` seconds has one reservoir of `taille`
+    rows per predicted class, kept for the last `nb_fenetres` windows:
+    memory is fixed whatever the traffic. `echantillon` combines them into
+    a sample of any span, stratified by predicted class.
+
+    With `dossier`, the reservoirs are shared between processes: a
+    background thread writes the windows changed in the last
+    `intervalle_partage` seconds to "<dossier>/fenetre=<n>/<process>.npz",
+    and `echantillon` combines the reservoirs of this process with the
+    files of the others, so with several workers a sample covers all the
+    traffic (the other workers' last `intervalle_partage` seconds excepted).
+    The files outlive their process until their window is dropped.
+
+    Attributes:
+        taille: Rows kept per window and predicted class
+        duree_fenetre: Length of a window in seconds
+        nb_fenetres: Number of windows kept
+        dossier: Directory of the shared reservoirs (None keeps them private)
+        intervalle_partage: Time between two writes of the changed windows in seconds
+    """
+
+    def __init__(
+        self,
+        taille: int,
+        duree_fenetre: float = 3600,
+        nb_fenetres: int = 24,
+        graine: Optional[int] = None,
+        dossier: Optional[Path] = None,
+        intervalle_partage: float = 5.0
+    ):
+        self.taille = max(1, taille)
+        self.duree_fenetre = duree_fenetre
+        self.nb_fenetres = max(1, nb_fenetres)
+        self.dossier = Path(dossier) if dossier else None
+        self.intervalle_partage = intervalle_partage
+        self._fenetres = {}
+        self._modifiees = set()
+        self._rng = np.random.default_rng(graine)
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._prefixe = None
+        self._pid_prefixe = None
+
+    def ajouter(self, features: np.ndarray, survivants: np.ndarray, maintenant: Optional[float] = None) -> None:
+        """
+        Offer a scored batch to the reservoirs of its window.
+
+        Args:
+            features: Array of shape (n, 2) with columns Sex, Fare
+            survivants: True where "Survived" was predicted
+            maintenant: Time of the predictions, defaults to now
+        """
+        maintenant = time.time() if maintenant is None else maintenant
+        features = np.asarray(features).reshape(-1, 2)
+        survivants = np.asarray(survivants, dtype=bool).reshape(-1)
+        if len(features) == 0:
+            return
+        self._demarrer()
+        fenetre = int(maintenant // self.duree_fenetre)
+        with self._verrou:
+            if fenetre not in self._fenetres:
+                self._fenetres[fenetre] = {classe: _Reservoir(self.taille) for classe in CLASSES}
+                for ancienne in sorted(self._fenetres)[:-self.nb_fenetres]:
+                    del self._fenetres[ancienne]
+            reservoirs = self._fenetres.get(fenetre)
+            if reservoirs is None:
+                return
+            self._modifiees.add(fenetre)
+            for classe, reservoir in reservoirs.items():
+                lignes = survivants == bool(classe)
+                n = int(lignes.sum())
+                if n:
+                    valeurs = {"Sex": features[lignes, 0], "Fare": features[lignes, 1], "prediction": classe, "timestamp": maintenant}
+                    reservoir.ajouter(valeurs, n, self._rng)
+
+    def _prefixe_processus(self) -> str:
+        """
+        Name of the files of this process, drawn again in every new process
+        (the caller holds the lock): with gunicorn's preload the instance is
+        built in the master, and each forked worker needs its own files.
+        """
+        if self._pid_prefixe != os.getpid():
+            self._prefixe = uuid.uuid4().hex[:12]
+            self._pid_prefixe = os.getpid()
+        return self._prefixe
+
+    def _demarrer(self) -> None:
+        """
+        Start the sharing thread if reservoirs are shared and it is not
+        running in this process; a forked process starts with empty reservoirs.
+        """
+        if self.dossier is None or self._pid == os.getpid():
+            return
+        with self._verrou:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._fenetres = {}
+                self._modifiees = set()
+            self._prefixe_processus()
+            self._arret.clear()
+            self._thread = threading.Thread(target=self._boucle, name="sample-share", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _boucle(self) -> None:
+        """
+        Sharing loop run by the background thread.
+        """
+        while not self._arret.wait(self.intervalle_partage):
+            self.partager()
+
+    def partager(self) -> int:
+        """
+        Write the windows changed since the last call and delete the files
+        of the windows dropped.
+
+        Returns:
+            Number of windows written
+        """
+        if self.dossier is None:
+            return 0
+        copies = {}
+        with self._verrou:
+            for fenetre in self._modifiees & set(self._fenetres):
+                tableaux = copies[fenetre] = {}
+                for classe, reservoir in self._fenetres[fenetre].items():
+                    tableaux[f"vus_{classe}"] = np.array(reservoir.vus)
+                    for nom, colonne in reservoir.colonnes.items():
+                        tableaux[f"{nom}_{classe}"] = colonne[:len(reservoir)].copy()
+            self._modifiees = set()
+            prefixe = self._prefixe_processus()
+        for fenetre, tableaux in copies.items():
+            dossier = self.dossier / f"fenetre={fenetre}"
+            dossier.mkdir(parents=True, exist_ok=True)
+            temporaire = dossier / f".{prefixe}.npz.tmp"
+            with open(temporaire, "wb") as fichier:
+                np.savez(fichier, **tableaux)
+            os.replace(temporaire, dossier / f"{prefixe}.npz")
+        if copies:
+            for fenetre, dossier in self._fenetres_partagees()[:-self.nb_fenetres]:
+                shutil.rmtree(dossier, ignore_errors=True)
+        return len(copies)
+
+    def _fenetres_partagees(self) -> list:
+        """
+        List the shared windows as (window number, directory), oldest first.
+        """
+        fenetres = []
+        for dossier in self.dossier.glob("fenetre=*"):
+            numero = dossier.name[len("fenetre="):]
+            if numero.lstrip("-").isdigit():
+                fenetres.append((int(numero), dossier))
+        return sorted(fenetres)
+
+    def arreter(self) -> None:
+        """
+        Stop the sharing thread after writing the changed windows.
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._arret.set()
+        self._thread.join(timeout=30)
+        self.partager()
+        self._thread = None
+        self._pid = None
+
+    def echantillon(self, depuis: Optional[float] = None, taille: Optional[int] = None, classe: Optional[int] = None) -> pd.DataFrame:
+        """
+        Draw a sample of the predictions made since `depuis`.
+
+        Every (window, class) reservoir, of this process or shared by
+        another one, is subsampled at the same rate, the highest one its
+        reservoirs allow within `taille` rows, so the sample is uniform over
+        the span and the predicted classes keep their proportions. For a
+        window partly before `depuis`, the number of predictions after it is
+        estimated from its reservoir.
+
+        Args:
+            depuis: Keep only the predictions made after this time
+            taille: Maximum number of rows (defaults to every row available)
+            classe: Keep only this predicted class (0 = Died, 1 = Survived)
+
+        Returns:
+            DataFrame with the columns of `COLONNES`, oldest window first;
+            `attrs["echantillonnage"]` describes the sample (see
+            `infos_echantillonnage`), with the same description per class
+            in "classes"
+        """
+        premiere = None if depuis is None else int(depuis // self.duree_fenetre)
+        cellules = []
+        with self._verrou:
+            prefixe = self._prefixe_processus()
+            for fenetre in sorted(self._fenetres):
+                for numero, reservoir in self._fenetres[fenetre].items():
+                    n = len(reservoir)
+                    cellules.append((fenetre, numero, reservoir.vus, {nom: c[:n] for nom, c in reservoir.colonnes.items()}))
+            cellules = list(self._filtrer(cellules, depuis, classe))
+        if self.dossier is not None:
+            partagees = []
+            for fenetre, dossier in self._fenetres_partagees()[-self.nb_fenetres:]:
+                if premiere is not None and fenetre < premiere:
+                    continue
+                for fichier in dossier.glob("*.npz"):
+                    if fichier.stem == prefixe:
+                        continue
+                    try:
+                        with np.load(fichier) as tableaux:
+                            for numero in CLASSES:
+                                colonnes = {nom: tableaux[f"{nom}_{numero}"] for nom in COLONNES}
+                                partagees.append((fenetre, numero, int(tableaux[f"vus_{numero}"]), colonnes))
+                    except (OSError, KeyError, ValueError):
+                        continue
+            cellules.extend(self._filtrer(partagees, depuis, classe))
+        cellules.sort(key=lambda cellule: cellule[0])
+
+        total = sum(population for _, _, population, _ in cellules)
+        taux = min([1.0] + [len(valeurs["Fare"]) / population for _, _, population, valeurs in cellules])
+        if taille is not None and total:
+            taux = min(taux, taille / total)
+
+        morceaux = []
+        classes = {}
+        for _, numero, population, valeurs in cellules:
+            n = len(valeurs["Fare"])
+            garder = min(n, int(round(taux * population)))
+            positions = np.sort(self._rng.choice(n, size=garder, replace=False)) if garder < n else slice(None)
+            morceaux.append(pd.DataFrame({nom: colonne[positions] for nom, colonne in valeurs.items()}))
+            lignes, echantillon = classes.get(CLASSES[numero], (0.0, 0))
+            classes[CLASSES[numero]] = (lignes + population, echantillon + garder)
+
+        if morceaux:
+            df = pd.concat(morceaux, ignore_index=True)
+        else:
+            df = pd.DataFrame({nom: np.zeros(0, dtype=type_) for nom, type_ in COLONNES.items()})
+        df.attrs["echantillonnage"] = {
+            **infos_echantillonnage(round(total), len(df)),
+            "classes": {nom: infos_echantillonnage(round(lignes), n) for nom, (lignes, n) in classes.items()},
+        }
+        return df
+
+    @staticmethod
+    def _filtrer(cellules: list, depuis: Optional[float], classe: Optional[int]):
+        """
+        Keep the rows of (window, class, seen, columns) reservoirs made since
+        `depuis`, with the estimated number of predictions they stand for.
+
+        Yields:
+            Tuples (window, class, population, columns of the rows kept)
+        """
+        for fenetre, numero, vus, colonnes in cellules:
+            n = len(colonnes["Fare"])
+            if classe is not None and numero != classe or not n:
+                continue
+            lignes = np.arange(n)
+            if depuis is not None:
+                lignes = lignes[colonnes["timestamp"] >= depuis]
+            if len(lignes):
+                yield fenetre, numero, vus * len(lignes) / n, {nom: c[lignes] for nom, c in colonnes.items()}
+
+    def etat(self) -> dict:
+        """
+        Describe the windows kept by this process.
+
+        Returns:
+            Dictionary with the sizes, and per window its start time and the
+            predictions seen and kept per class
+        """
+        with self._verrou:
+            fenetres = [
+                {
+                    "start": fenetre * self.duree_fenetre,
+                    "classes": {CLASSES[c]: {"seen": r.vus, "kept": len(r)} for c, r in reservoirs.items()},
+                }
+                for fenetre, reservoirs in sorted(self._fenetres.items())
+            ]
+        return {"size": self.taille, "window": self.duree_fenetre, "windows": fenetres}
+
+
+echantillons = None
+if config.SAMPLE_RESERVOIR_SIZE > 0:
+    echantillons = ReservoirsPredictions(
+        config.SAMPLE_RESERVOIR_SIZE,
+        config.SAMPLE_WINDOW_S,
+        config.SAMPLE_WINDOWS,
+        dossier=Path(config.SAMPLE_SHARED_DIR or Path(__file__).resolve().parent.parent / "reports" / "samples"),
+        intervalle_partage=config.SAMPLE_SHARE_INTERVAL_S,
+    )
@@ -0,0 +1,185 @@
+"""
+Background evaluation of the served model on the test split of the dataset.
+Results are cached on disk, keyed on the hashes of the model file and of the
+dataset, so restarts and repeated requests with unchanged inputs do not
+evaluate again. Readiness of the API is reported once the first evaluation
+has finished.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+from sklearn.metrics import accuracy_score
+
+from api import config
+from api.metrics import enregistrer_demarrage, enregistrer_evaluation, mettre_a_jour_accuracy
+from api.model_manager import calculer_empreinte
+from api.predict import BASE_DIR, DATA_DIR, manager
+
+DATASET_PATH = DATA_DIR / "titanic_cleaned_dataset.csv"
+CACHE_PATH = Path(config.EVALUATION_CACHE_FILE or BASE_DIR / "reports" / "cache" / "evaluation.json")
+
+# Share of the dataset used for training; the evaluation runs on the rest
+PART_ENTRAINEMENT = 0.7
+
+DEBUT = time.time()
+
+_etat = {"status": "pending", "resultat": None, "erreur": None}
+_pret = threading.Event()
+_verrou = threading.Lock()
+_thread = None
+
+
+def _lire_cache() -> dict:
+    """
+    Read the evaluation cache file.
+
+    Returns:
+        Dictionary of results keyed by "<model hash>:<dataset hash>"
+    """
+    try:
+        return json.loads(CACHE_PATH.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _ecrire_cache(cle: str, resultat: dict) -> None:
+    """
+    Add a result to the evaluation cache file.
+
+    The file is replaced atomically, so workers evaluating concurrently
+    never read a partial file.
+    """
+    try:
+        cache = _lire_cache()
+        cache[cle] = resultat
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        temporaire = CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        temporaire.write_text(json.dumps(cache, indent=2))
+        os.replace(temporaire, CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"Cache d'évaluation non écrit: {e}")
+
+
+def evaluer_modele(modele=None, chemin_donnees: Path = DATASET_PATH) -> dict:
+    """
+    Compute the accuracy of a model on the test split and update the metric.
+
+    The test split is the last 30% of the dataset, as at training time.
+
+    Args:
+        modele: Inference engine to evaluate (defaults to the served one)
+        chemin_donnees: Path of the cleaned dataset
+
+    Returns:
+        Dictionary with "model_version", "accuracy", "test_samples",
+        "correct_predictions" and "cached"
+
+    Raises:
+        FileNotFoundError: If the dataset does not exist
+    """
+    modele = modele or manager.engine
+    if not chemin_donnees.exists():
+        raise FileNotFoundError(f"Dataset introuvable: {chemin_donnees}")
+
+    empreinte_modele = modele.empreinte or calculer_empreinte(manager.chemin)
+    cle = f"{empreinte_modele}:{calculer_empreinte(chemin_donnees)}"
+    resultat = _lire_cache().get(cle)
+    en_cache = resultat is not None
+
+    if en_cache:
+        enregistrer_evaluation("cached")
+    else:
+        df = pd.read_csv(chemin_donnees)
+        test_data = df.iloc[int(len(df) * PART_ENTRAINEMENT):]
+
+        X_test = test_data[['Sex', 'Fare']].copy()
+        y_test = test_data['Survived']
+
+        if X_test['Sex'].dtype == 'object':
+            X_test['Sex'] = X_test['Sex'].apply(lambda x: 0 if x.upper() == 'M' else 1)
+
+        y_pred = modele.pipeline.predict(X_test)
+        resultat = {
+            "accuracy": float(accuracy_score(y_test, y_pred)),
+            "test_samples": len(test_data),
+            "correct_predictions": int((y_pred == y_test.to_numpy()).sum()),
+        }
+        _ecrire_cache(cle, resultat)
+        enregistrer_evaluation("computed")
+
+    mettre_a_jour_accuracy(model_version=modele.version, accuracy=resultat["accuracy"])
+    return {"model_version": modele.version, **resultat, "cached": en_cache}
+
+
+def _executer(modele) -> None:
+    """
+    Evaluation thread: evaluate the model and update the readiness state.
+    """
+    with _verrou:
+        _etat.update(status="running", erreur=None)
+    try:
+        resultat = evaluer_modele(modele)
+        with _verrou:
+            _etat.update(status="done", resultat=resultat)
+        logger.info(
+            f"✅ Accuracy {resultat['model_version']}: {resultat['accuracy']:.4f} "
+            f"sur {resultat['test_samples']} échantillons"
+        )
+    except FileNotFoundError as e:
+        with _verrou:
+            _etat.update(status="skipped", erreur=str(e))
+        logger.warning(f"⚠️  {e} - Accuracy non initialisée")
+    except Exception as e:
+        with _verrou:
+            _etat.update(status="failed", erreur=str(e))
+        logger.error(f"❌ Erreur lors du calcul automatique de l'accuracy: {e}")
+
+    if not _pret.is_set():
+        _pret.set()
+        enregistrer_demarrage("ready", time.time() - DEBUT)
+
+
+def lancer_evaluation(modele=None) -> None:
+    """
+    Evaluate a model in a background thread.
+
+    Also registered as an observer of the model manager, so every newly
+    loaded model is evaluated. An evaluation already running is not
+    interrupted; the new one starts right after it.
+
+    Args:
+        modele: Inference engine to evaluate (defaults to the served one)
+    """
+    global _thread
+    precedent = _thread
+
+    def executer():
+        if precedent is not None:
+            precedent.join()
+        _executer(modele or manager.engine)
+
+    _thread = threading.Thread(target=executer, name="evaluation", daemon=True)
+    _thread.start()
+
+
+def obtenir_etat() -> dict:
+    """
+    Describe the state of the model evaluation.
+
+    Returns:
+        Dictionary with "ready", "status" ("pending", "running", "done",
+        "skipped" or "failed"), the last result and the last error
+    """
+    with _verrou:
+        return {
+            "ready": _pret.is_set(),
+            "status": _etat["status"],
+            "result": _etat["resultat"],
+            "error": _etat["erreur"],
+        }
@@ -0,0 +1,68 @@
+"""
+Dedicated thread pool for CPU-bound model inference.
+Keeps model calls off the event loop and off Starlette's I/O threadpool,
+so health checks and /metrics scrapes stay responsive under load.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+
+from loguru import logger
+
+from api import config
+
+_executor = None
+_pid = None
+_verrou = threading.Lock()
+
+
+def obtenir_executor() -> ThreadPoolExecutor:
+    """
+    Get the inference executor, creating it on first use in this process.
+
+    Returns:
+        Thread pool sized by `INFERENCE_THREADS`
+    """
+    global _executor, _pid
+    if _pid != os.getpid():
+        with _verrou:
+            if _pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=config.INFERENCE_THREADS,
+                    thread_name_prefix="inference",
+                )
+                _pid = os.getpid()
+                logger.info(f"Pool d'inférence créé: {config.INFERENCE_THREADS} threads")
+    return _executor
+
+
+async def executer_inference(fonction: Callable, *args, **kwargs):
+    """
+    Run a CPU-bound function in the inference pool and await its result.
+
+    Args:
+        fonction: Function to run
+        *args: Positional arguments of the function
+        **kwargs: Keyword arguments of the function
+
+    Returns:
+        Result of the function
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(obtenir_executor(), partial(fonction, *args, **kwargs))
+
+
+def arreter_executor() -> None:
+    """
+    Shut down the inference pool, waiting for running inferences.
+    """
+    global _executor, _pid
+    with _verrou:
+        if _executor is not None and _pid == os.getpid():
+            _executor.shutdown(wait=True)
+        _executor = None
+        _pid = None
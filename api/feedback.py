@@ -0,0 +1,291 @@
+"""
+Ground-truth feedback on served predictions.
+Every prediction gets an ID and is kept in a bounded store shared by the
+workers (a SQLite file); true labels sent later to any worker are joined
+against it, and live accuracy, precision and recall are computed from
+confusion counts kept per bucket of sliding time windows.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from api import config
+from api.metrics import enregistrer_feedback, mettre_a_jour_accuracy, mettre_a_jour_performance_live
+
+# Positive class for precision and recall
+CLASSE_POSITIVE = "Survived"
+
+# Number of buckets each sliding window is split into
+NB_SEAUX = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lots (
+    numero INTEGER PRIMARY KEY AUTOINCREMENT,
+    prefixe TEXT NOT NULL,
+    origine INTEGER NOT NULL,
+    debut INTEGER NOT NULL,
+    fin INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    predits BLOB NOT NULL,
+    etiquetes BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lots_prefixe ON lots (prefixe, debut);
+CREATE TABLE IF NOT EXISTS comptes (
+    duree REAL NOT NULL,
+    seau INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    code INTEGER NOT NULL,
+    nombre INTEGER NOT NULL,
+    PRIMARY KEY (duree, seau, version, code)
+);
+CREATE TABLE IF NOT EXISTS etat (cle TEXT PRIMARY KEY, valeur INTEGER NOT NULL);
+"""
+
+
+def metriques_confusion(vn: int, fp: int, fn: int, vp: int) -> dict:
+    """
+    Compute accuracy, precision and recall from confusion counts.
+
+    Returns:
+        Dictionary with "samples", "accuracy", "precision" and "recall";
+        a ratio is None when its denominator is zero
+    """
+    total = vn + fp + fn + vp
+    return {
+        "samples": total,
+        "accuracy": (vp + vn) / total if total else None,
+        "precision": vp / (vp + fp) if vp + fp else None,
+        "recall": vp / (vp + fn) if vp + fn else None,
+    }
+
+
+class SuiviFeedback:
+    """
+    Join true labels to recent predictions and track live performance.
+
+    The store is a SQLite file shared by the workers, so a label is joined
+    whichever worker served the prediction or receives the label, and every
+    worker computes the same metrics. IDs are "<process prefix>-<n>", with
+    `n` counting the predictions of the process: each scored batch is one
+    row holding its range of IDs, its model version and its predicted
+    classes packed as bits, so storing a batch costs one insert whatever
+    its size. Past `capacite` predictions, the oldest ones are forgotten.
+
+    A label is counted once, for the model version that made the
+    prediction. Each window of `durees_fenetres` is split into `NB_SEAUX`
+    buckets holding the confusion counts of the labels received, as in
+    `api.drift.FenetreGlissante`: a batch of labels adds to one bucket per window, and
+    the metrics sum at most `NB_SEAUX` buckets per window and version,
+    whatever the number of labels. The windows slide by whole buckets.
+
+    Writes wait for the SQLite lock shared by all the workers: the API
+    calls these methods in the inference pool, never on the event loop.
+
+    Attributes:
+        chemin: SQLite file of the store
+        capacite: Number of predictions kept for joining
+        durees_fenetres: Lengths of the sliding windows in seconds
+    """
+
+    def __init__(self, chemin: Path, capacite: int, durees_fenetres: Iterable[float]):
+        self.chemin = Path(chemin)
+        self.capacite = max(1, capacite)
+        self.durees_fenetres = sorted(durees_fenetres)
+        self._verrou = threading.Lock()
+        self._pid = None
+        self._connexion = None
+
+    def _ouvrir(self) -> sqlite3.Connection:
+        """
+        Get the connection of this process, opening it and drawing a new ID
+        prefix on first use or after a fork (the caller holds the lock).
+        """
+        if self._pid == os.getpid():
+            return self._connexion
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        connexion = sqlite3.connect(self.chemin, timeout=30, isolation_level=None, check_same_thread=False)
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.execute("PRAGMA synchronous=NORMAL")
+        connexion.executescript(SCHEMA)
+        self._connexion = connexion
+        self._prefixe = uuid.uuid4().hex[:12]
+        self._suivant = 0
+        self._pid = os.getpid()
+        return connexion
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Run statements in a write transaction of this process's connection.
+        """
+        with self._verrou:
+            connexion = self._ouvrir()
+            connexion.execute("BEGIN IMMEDIATE")
+            try:
+                yield connexion
+            except BaseException:
+                connexion.execute("ROLLBACK")
+                raise
+            connexion.execute("COMMIT")
+
+    def enregistrer(self, model_version: str, predictions: Iterable[str]) -> list:
+        """
+        Store predictions and assign their IDs.
+
+        Args:
+            model_version: Version of the model that made the predictions
+            predictions: Predicted labels ("Survived" or "Died")
+
+        Returns:
+            List of prediction IDs, in order
+        """
+        predits = np.asarray(predictions) == CLASSE_POSITIVE
+        n = len(predits)
+        with self._transaction() as connexion:
+            prefixe = self._prefixe
+            debut = self._suivant
+            self._suivant += n
+            if n:
+                conserves = min(n, self.capacite)
+                connexion.execute(
+                    "INSERT INTO lots (prefixe, origine, debut, fin, version, predits, etiquetes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (prefixe, debut, debut + n - conserves, debut + n, model_version,
+                     np.packbits(predits).tobytes(), bytes((n + 7) // 8))
+                )
+                self._oublier(connexion, conserves)
+        return [f"{prefixe}-{numero}" for numero in range(debut, debut + n)]
+
+    def _oublier(self, connexion: sqlite3.Connection, ajoutes: int) -> None:
+        """
+        Forget the oldest predictions past `capacite` (in a transaction).
+        """
+        total = connexion.execute(
+            "INSERT INTO etat VALUES ('predictions', ?) ON CONFLICT (cle) DO UPDATE SET valeur = valeur + excluded.valeur "
+            "RETURNING valeur",
+            (ajoutes,)
+        ).fetchone()[0]
+        excedent = total - self.capacite
+        while excedent > 0:
+            numero, debut, fin = connexion.execute("SELECT numero, debut, fin FROM lots ORDER BY numero LIMIT 1").fetchone()
+            retires = min(fin - debut, excedent)
+            if retires == fin - debut:
+                connexion.execute("DELETE FROM lots WHERE numero = ?", (numero,))
+            else:
+                connexion.execute("UPDATE lots SET debut = debut + ? WHERE numero = ?", (retires, numero))
+            excedent -= retires
+            total -= retires
+        connexion.execute("UPDATE etat SET valeur = ? WHERE cle = 'predictions'", (total,))
+
+    def ajouter_verites(self, prediction_ids: list, labels: list, maintenant: Optional[float] = None) -> dict:
+        """
+        Join true labels to their predictions and store them.
+
+        Args:
+            prediction_ids: IDs returned with the predictions
+            labels: True label of each prediction ("Survived" or "Died")
+            maintenant: Arrival time of the labels, defaults to now
+
+        Returns:
+            Dictionary with "matched" (number of labels counted) and
+            "unknown" (IDs that are unknown, expired or already labelled)
+        """
+        maintenant = time.time() if maintenant is None else maintenant
+        lots, inconnus = {}, []
+        # Confusion counts per version: [true negatives, false positives, false negatives, true positives]
+        comptes = {}
+        nb_verites = 0
+        with self._transaction() as connexion:
+            for prediction_id, label in zip(prediction_ids, labels):
+                prefixe, _, numero = prediction_id.rpartition("-")
+                ligne = connexion.execute(
+                    "SELECT numero, origine, debut, fin, version, predits, etiquetes FROM lots "
+                    "WHERE prefixe = ? AND debut <= ? ORDER BY debut DESC LIMIT 1",
+                    (prefixe, int(numero) if numero.isdigit() else -1)
+                ).fetchone()
+                if ligne is None or int(numero) >= ligne[3]:
+                    inconnus.append(prediction_id)
+                    continue
+                lot = lots.setdefault(ligne[0], [ligne[1], ligne[4], ligne[5], bytearray(ligne[6])])
+                decalage = int(numero) - lot[0]
+                octet, masque = decalage // 8, 0x80 >> (decalage % 8)
+                if lot[3][octet] & masque:
+                    inconnus.append(prediction_id)
+                    continue
+                lot[3][octet] |= masque
+                code = 2 * int(label == CLASSE_POSITIVE) + int(bool(lot[2][octet] & masque))
+                comptes.setdefault(lot[1], [0, 0, 0, 0])[code] += 1
+                nb_verites += 1
+
+            connexion.executemany("UPDATE lots SET etiquetes = ? WHERE numero = ?", [(bytes(lot[3]), numero) for numero, lot in lots.items()])
+            for duree in self.durees_fenetres:
+                seau = int(maintenant // (duree / NB_SEAUX))
+                connexion.executemany(
+                    "INSERT INTO comptes VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (duree, seau, version, code) DO UPDATE SET nombre = nombre + excluded.nombre",
+                    [(duree, seau, version, code, nombre)
+                     for version, nombres in comptes.items() for code, nombre in enumerate(nombres) if nombre]
+                )
+                connexion.execute("DELETE FROM comptes WHERE duree = ? AND seau <= ?", (duree, seau - NB_SEAUX))
+
+        enregistrer_feedback(nb_verites, len(inconnus))
+        return {"matched": nb_verites, "unknown": inconnus}
+
+    def metriques(self, maintenant: Optional[float] = None) -> dict:
+        """
+        Compute the live performance of every model version that received labels.
+
+        Returns:
+            Dictionary {model version: {"<duration>s": window metrics}}
+        """
+        maintenant = time.time() if maintenant is None else maintenant
+        comptes = []
+        with self._verrou:
+            connexion = self._ouvrir()
+            for duree in self.durees_fenetres:
+                comptes.append({})
+                for version, code, nombre in connexion.execute(
+                    "SELECT version, code, SUM(nombre) FROM comptes WHERE duree = ? AND seau > ? GROUP BY version, code",
+                    (duree, int(maintenant // (duree / NB_SEAUX)) - NB_SEAUX)
+                ):
+                    comptes[-1].setdefault(version, [0, 0, 0, 0])[code] = nombre
+        # Confusion counts: [true negatives, false positives, false negatives, true positives]
+        return {
+            version: {
+                f"{duree:g}s": metriques_confusion(*fenetre.get(version, [0, 0, 0, 0]))
+                for duree, fenetre in zip(self.durees_fenetres, comptes)
+            }
+            for version in sorted(set().union(*comptes))
+        }
+
+    def publier(self, maintenant: Optional[float] = None) -> dict:
+        """
+        Push the live performance into the Prometheus gauges.
+
+        `ml_model_accuracy` receives the accuracy over the longest window.
+
+        Returns:
+            Metrics as returned by `metriques`
+        """
+        performances = self.metriques(maintenant)
+        for version, fenetres in performances.items():
+            for fenetre, valeurs in fenetres.items():
+                mettre_a_jour_performance_live(version, fenetre, **valeurs)
+            accuracy = list(fenetres.values())[-1]["accuracy"] if fenetres else None
+            if accuracy is not None:
+                mettre_a_jour_accuracy(model_version=version, accuracy=accuracy)
+        return performances
+
+
+suivi = SuiviFeedback(
+    Path(config.FEEDBACK_DB_FILE or Path(__file__).resolve().parent.parent / "reports" / "feedback" / "feedback.sqlite"),
+    config.FEEDBACK_STORE_SIZE,
+    config.FEEDBACK_WINDOWS_S,
+)
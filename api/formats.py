@@ -0,0 +1,261 @@
+"""
+Binary formats for batch scoring.
+Decodes Arrow IPC streams and .npy buffers of Sex/Fare into the feature
+matrix of the inference engine, and encodes predictions back in the same
+format. JSON columnar bodies are handled too, so one endpoint serves every
+client through content negotiation.
+"""
+
+import io
+import json
+
+import numpy as np
+
+from api.predict import FEATURES
+
+FORMAT_JSON = "application/json"
+FORMAT_ARROW = "application/vnd.apache.arrow.stream"
+FORMAT_NPY = "application/x-npy"
+
+FORMATS = (FORMAT_JSON, FORMAT_ARROW, FORMAT_NPY)
+
+
+class FormatError(ValueError):
+    """
+    Raised when a request body cannot be decoded into passengers.
+    """
+
+
+def _importer_pyarrow():
+    """
+    Import pyarrow, which is only needed for the Arrow format.
+
+    Raises:
+        FormatError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise FormatError("The Arrow format requires the pyarrow package")
+    return pyarrow
+
+
+def _colonne_sex(valeurs: np.ndarray) -> np.ndarray:
+    """
+    Encode and validate a Sex column given as 'M'/'F' strings or 0/1 codes.
+
+    Args:
+        valeurs: Sex column
+
+    Returns:
+        Column of 0.0 (male) / 1.0 (female)
+
+    Raises:
+        FormatError: If a value is neither 'M'/'F' nor 0/1
+    """
+    if valeurs.dtype.kind in ("U", "S", "O"):
+        majuscules = np.char.upper(valeurs.astype(str))
+        if not np.isin(majuscules, ("M", "F")).all():
+            raise FormatError("Sex must be 'M' or 'F'")
+        return (majuscules == "F").astype(np.float64)
+
+    codes = valeurs.astype(np.float64, copy=False)
+    if not np.isin(codes, (0.0, 1.0)).all():
+        raise FormatError("Sex must be encoded as 0 (M) or 1 (F)")
+    return codes
+
+
+def _assembler(sex: np.ndarray, fare: np.ndarray) -> np.ndarray:
+    """
+    Fill the (n, 2) feature matrix from decoded columns.
+
+    Raises:
+        FormatError: If the columns are empty, of different lengths or
+            contain non-finite fares
+    """
+    if len(sex) == 0:
+        raise FormatError("Columns must not be empty")
+    if len(sex) != len(fare):
+        raise FormatError(f"Sex and Fare must have the same length ({len(sex)} != {len(fare)})")
+
+    features = np.empty((len(sex), 2), dtype=np.float64)
+    features[:, 0] = _colonne_sex(np.asarray(sex))
+    features[:, 1] = fare
+    if not np.isfinite(features[:, 1]).all():
+        raise FormatError("Fare must be a finite number")
+    return features
+
+
+def _decoder_arrow(corps: bytes) -> np.ndarray:
+    """
+    Decode an Arrow IPC stream with "Sex" and "Fare" columns.
+
+    Columns are read from the request buffer without copy when their type
+    allows it (no nulls, numeric).
+    """
+    pa = _importer_pyarrow()
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(corps)).read_all()
+        sex = table.column("Sex").combine_chunks()
+        fare = table.column("Fare").combine_chunks()
+    except (pa.ArrowInvalid, KeyError) as e:
+        raise FormatError(f"Invalid Arrow stream: {e}")
+    if sex.null_count or fare.null_count:
+        raise FormatError("Sex and Fare must not contain nulls")
+    if not pa.types.is_floating(fare.type) and not pa.types.is_integer(fare.type):
+        raise FormatError("Fare must be numeric")
+    return _assembler(sex.to_numpy(zero_copy_only=False), fare.to_numpy(zero_copy_only=False))
+
+
+def _decoder_npy(corps: bytes) -> np.ndarray:
+    """
+    Decode a .npy buffer, viewed in place over the request body.
+
+    Accepted layouts are a structured array with "Sex" and "Fare" fields,
+    or a 2D numeric array whose columns are `FEATURES`.
+    """
+    flux = io.BytesIO(corps)
+    try:
+        version = np.lib.format.read_magic(flux)
+        if version == (1, 0):
+            entete = np.lib.format.read_array_header_1_0(flux)
+        else:
+            entete = np.lib.format.read_array_header_2_0(flux)
+    except ValueError as e:
+        raise FormatError(f"Invalid .npy buffer: {e}")
+    forme, ordre_fortran, dtype = entete
+    if dtype.hasobject:
+        raise FormatError(".npy arrays of objects are not accepted")
+
+    nb_elements = int(np.prod(forme))
+    try:
+        tableau = np.frombuffer(corps, dtype=dtype, count=nb_elements, offset=flux.tell())
+    except ValueError as e:
+        raise FormatError(f"Truncated .npy buffer: {e}")
+    tableau = tableau.reshape(forme, order="F" if ordre_fortran else "C")
+
+    if dtype.names:
+        if not set(FEATURES) <= set(dtype.names):
+            raise FormatError(f"Expected fields {list(FEATURES)}, got {list(dtype.names)}")
+        sex, fare = tableau["Sex"], tableau["Fare"]
+        if tableau.ndim != 1 or sex.ndim != 1 or fare.ndim != 1:
+            raise FormatError("Structured arrays must be 1-D with scalar Sex and Fare fields")
+        if sex.dtype.kind not in "biufUS" or fare.dtype.kind not in "biuf":
+            raise FormatError("Fare must be numeric, Sex numeric or 'M'/'F'")
+        return _assembler(sex, fare.astype(np.float64, copy=False))
+    if tableau.ndim != 2 or tableau.shape[1] != len(FEATURES) or dtype.kind not in "biuf":
+        raise FormatError(f"Expected an array of shape (n, 2) with columns {list(FEATURES)}")
+    return _assembler(tableau[:, 0], tableau[:, 1].astype(np.float64, copy=False))
+
+
+def _decoder_json(corps: bytes) -> np.ndarray:
+    """
+    Decode a columnar JSON body {"Sex": [...], "Fare": [...]}.
+    """
+    try:
+        colonnes = json.loads(corps)
+        sex = np.asarray(colonnes["Sex"])
+        fare = np.asarray(colonnes["Fare"], dtype=np.float64)
+    except (ValueError, KeyError, TypeError) as e:
+        raise FormatError(f"Invalid JSON body: {e}")
+    if sex.ndim != 1 or fare.ndim != 1:
+        raise FormatError("Sex and Fare must be flat arrays")
+    return _assembler(sex, fare)
+
+
+def decoder_passagers(corps: bytes, format_entree: str) -> np.ndarray:
+    """
+    Decode a request body into the feature matrix of the inference engine.
+
+    Args:
+        corps: Raw request body
+        format_entree: One of `FORMATS`
+
+    Returns:
+        Array of shape (n, 2) with columns `FEATURES`
+
+    Raises:
+        FormatError: If the body is invalid for the format
+    """
+    if format_entree == FORMAT_ARROW:
+        return _decoder_arrow(corps)
+    if format_entree == FORMAT_NPY:
+        return _decoder_npy(corps)
+    return _decoder_json(corps)
+
+
+def encoder_predictions(labels: np.ndarray, indices: np.ndarray, probas: np.ndarray, format_sortie: str) -> bytes:
+    """
+    Encode predictions and class probabilities.
+
+    Every format carries the predicted label, its confidence and one
+    probability column per class ("probability_<label>").
+
+    Args:
+        labels: Label of each probability column (e.g. ["Died", "Survived"])
+        indices: Index of the predicted class of each row
+        probas: Probabilities, shape (n, n_classes)
+        format_sortie: One of `FORMATS`
+
+    Returns:
+        Encoded response body
+    """
+    confidences = probas[np.arange(len(indices)), indices]
+
+    if format_sortie == FORMAT_ARROW:
+        pa = _importer_pyarrow()
+        colonnes = {
+            "prediction": pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int8()), pa.array(labels)),
+            "confidence": pa.array(confidences),
+        }
+        for i, label in enumerate(labels):
+            colonnes[f"probability_{label}"] = pa.array(probas[:, i])
+        table = pa.table(colonnes)
+        puits = pa.BufferOutputStream()
+        with pa.ipc.new_stream(puits, table.schema) as ecrivain:
+            ecrivain.write_table(table)
+        return puits.getvalue().to_pybytes()
+
+    if format_sortie == FORMAT_NPY:
+        dtype = [("prediction", f"U{max(len(label) for label in labels)}"), ("confidence", "f8")]
+        dtype += [(f"probability_{label}", "f8") for label in labels]
+        sortie = np.empty(len(indices), dtype=dtype)
+        sortie["prediction"] = labels[indices]
+        sortie["confidence"] = confidences
+        for i, label in enumerate(labels):
+            sortie[f"probability_{label}"] = probas[:, i]
+        flux = io.BytesIO()
+        np.save(flux, sortie, allow_pickle=False)
+        return flux.getvalue()
+
+    return json.dumps({
+        "prediction": labels[indices].tolist(),
+        "confidence": confidences.tolist(),
+        "probabilities": {label: probas[:, i].tolist() for i, label in enumerate(labels)},
+    }).encode()
+
+
+def negocier_format(content_type: str, accept: str) -> tuple:
+    """
+    Choose the input and output formats of a batch request.
+
+    The output defaults to the input format; an explicit Accept header
+    listing a supported format overrides it.
+
+    Args:
+        content_type: Content-Type header of the request
+        accept: Accept header of the request
+
+    Returns:
+        Tuple (input format, output format), output None if not acceptable
+    """
+    format_entree = (content_type or FORMAT_JSON).split(";")[0].strip().lower()
+
+    acceptes = [a.split(";")[0].strip().lower() for a in (accept or "").split(",") if a.strip()]
+    if not acceptes or "*/*" in acceptes or format_entree in acceptes:
+        return format_entree, format_entree
+    for format_sortie in acceptes:
+        if format_sortie in FORMATS:
+            return format_entree, format_sortie
+    return format_entree, None
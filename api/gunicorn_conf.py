@@ -0,0 +1,42 @@
+"""
+Gunicorn configuration for multi-worker serving of the Titanic ML API.
+
+The application (and the model) is loaded once in the master process and
+shared by the forked Uvicorn workers. Prometheus metrics are kept in the
+multiprocess directory `PROMETHEUS_MULTIPROC_DIR`, so /metrics aggregates
+every worker whichever one answers the scrape.
+
+Usage:
+    gunicorn -c api/gunicorn_conf.py api.main:app
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+# Metric files of a previous run would be aggregated with the new ones:
+# empty the directory before the application (and its metrics) is preloaded.
+shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+Path(PROMETHEUS_MULTIPROC_DIR).mkdir(parents=True, exist_ok=True)
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))
+
+
+def child_exit(server, worker):
+    """
+    Mark the metrics of a dead worker so that live gauges drop its values.
+
+    Args:
+        server: Gunicorn arbiter
+        worker: Exiting worker
+    """
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
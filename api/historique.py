@@ -0,0 +1,117 @@
+"""
+Memory-bounded history of recent predictions.
+Inputs and outputs of every scored passenger are written into preallocated
+NumPy columns used as a ring buffer, so memory stays fixed whatever the
+traffic and the history can be turned into a DataFrame for the reports.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from api import config
+
+# Columns of the history and their types
+COLONNES = {
+    "Sex": np.int8,
+    "Fare": np.float64,
+    "prediction": np.int8,
+    "confidence": np.float64,
+    "latency": np.float64,
+    "timestamp": np.float64,
+}
+
+
+class HistoriquePredictions:
+    """
+    Fixed-capacity ring buffer of recent predictions, stored by column.
+
+    Appending a batch writes it into the preallocated columns; once
+    `capacite` predictions have been stored, the oldest ones are
+    overwritten. "prediction" is 1 for "Survived" and 0 for "Died", as in
+    the datasets; "latency" is the per-passenger share of the model call.
+
+    Each process has its own history: with several workers, a snapshot only
+    holds the traffic of the worker that answers.
+
+    Attributes:
+        capacite: Maximum number of predictions kept
+    """
+
+    def __init__(self, capacite: int):
+        self.capacite = max(1, capacite)
+        self._colonnes = {nom: np.zeros(self.capacite, dtype=type_) for nom, type_ in COLONNES.items()}
+        self._total = 0
+        self._verrou = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._total, self.capacite)
+
+    def ajouter(
+        self,
+        features: np.ndarray,
+        survivants: np.ndarray,
+        confidences: np.ndarray,
+        latence: float,
+        maintenant: Optional[float] = None
+    ) -> None:
+        """
+        Append a scored batch.
+
+        Args:
+            features: Array of shape (n, 2) with columns Sex, Fare
+            survivants: True where "Survived" was predicted
+            confidences: Confidence of each prediction
+            latence: Duration of the model call for the whole batch, in seconds
+            maintenant: Time of the predictions, defaults to now
+        """
+        maintenant = time.time() if maintenant is None else maintenant
+        features = np.asarray(features).reshape(-1, 2)
+        n = len(features)
+        if n == 0:
+            return
+        conserves = slice(max(0, n - self.capacite), n)
+        valeurs = {
+            "Sex": features[conserves, 0],
+            "Fare": features[conserves, 1],
+            "prediction": np.asarray(survivants)[conserves],
+            "confidence": np.asarray(confidences)[conserves],
+            "latency": latence / n,
+            "timestamp": maintenant,
+        }
+        with self._verrou:
+            positions = (self._total + np.arange(conserves.start, n)) % self.capacite
+            self._total += n
+            for nom, colonne in self._colonnes.items():
+                colonne[positions] = valeurs[nom]
+
+    def dataframe(self, limite: Optional[int] = None, depuis: Optional[float] = None) -> pd.DataFrame:
+        """
+        Copy the history into a DataFrame, oldest prediction first.
+
+        The columns "Sex", "Fare" and "prediction" can be passed as
+        `current_data` to `generer_rapport_drift`.
+
+        Args:
+            limite: Keep only the most recent predictions
+            depuis: Keep only the predictions made after this time
+
+        Returns:
+            DataFrame with the columns of `COLONNES`
+        """
+        with self._verrou:
+            n = len(self)
+            fin = self._total % self.capacite
+            ordre = np.arange(fin - n, fin) % self.capacite
+            if limite is not None:
+                ordre = ordre[max(0, len(ordre) - limite):]
+            df = pd.DataFrame({nom: colonne[ordre] for nom, colonne in self._colonnes.items()})
+        if depuis is not None:
+            df = df[df["timestamp"] >= depuis].reset_index(drop=True)
+        return df
+
+
+historique = HistoriquePredictions(config.RECENT_PREDICTIONS_SIZE)
@@ -0,0 +1,326 @@
+"""
+Durable log of the predictions, as hourly-partitioned Parquet files.
+The request path only enqueues its scored batch; a background thread
+drains the queue, groups the batches and writes them under
+"date=YYYY-MM-DD/hour=HH/", so logging adds no file I/O to the requests.
+"""
+
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from api import config
+from api.metrics import enregistrer_journal
+
+
+def _importer_parquet():
+    """
+    Import pyarrow and its Parquet module.
+
+    Returns:
+        Tuple (pyarrow, pyarrow.parquet), or None if pyarrow is not installed
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow, pyarrow.parquet
+
+
+class JournalPredictions:
+    """
+    Asynchronous, batched writer of prediction logs.
+
+    `ajouter` puts the batch on a queue and returns; nothing is copied or
+    converted on the request path. A background thread wakes up every
+    `intervalle` seconds, or as soon as `taille_lot` rows are waiting, and
+    writes one Parquet file per hour partition present in what it drained.
+
+    When `max_en_attente` rows are already waiting, new batches are dropped
+    and counted rather than slowing the requests down.
+
+    The thread is started lazily on first use, and restarted if the process
+    was forked after it started; file names carry the process ID so
+    workers never write to the same file.
+
+    Attributes:
+        dossier: Root directory of the partitions
+        intervalle: Maximum time between two writes in seconds
+        taille_lot: Number of waiting rows that triggers a write
+        max_en_attente: Maximum number of waiting rows
+    """
+
+    def __init__(self, dossier: Path, intervalle: float = 5.0, taille_lot: int = 50000, max_en_attente: int = 1000000):
+        self.dossier = Path(dossier)
+        self.intervalle = intervalle
+        self.taille_lot = taille_lot
+        self.max_en_attente = max_en_attente
+        self._file = queue.SimpleQueue()
+        self._en_attente = 0
+        self._verrou = threading.Lock()
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._numero = 0
+
+    def ajouter(
+        self,
+        model_version: str,
+        features: np.ndarray,
+        survivants: np.ndarray,
+        confidences: np.ndarray,
+        latence: float,
+        maintenant: Optional[float] = None
+    ) -> bool:
+        """
+        Enqueue a scored batch for writing.
+
+        Args:
+            model_version: Version of the model that scored the batch
+            features: Array of shape (n, 2) with columns Sex, Fare
+            survivants: True where "Survived" was predicted
+            confidences: Confidence of each prediction
+            latence: Duration of the model call for the whole batch, in seconds
+            maintenant: Time of the predictions, defaults to now
+
+        Returns:
+            False if the batch was dropped because the queue is full
+        """
+        self._demarrer()
+        maintenant = time.time() if maintenant is None else maintenant
+        n = len(features)
+        with self._verrou:
+            if self._en_attente + n > self.max_en_attente:
+                accepte = False
+            else:
+                self._en_attente += n
+                accepte = True
+                en_attente = self._en_attente
+        if not accepte:
+            enregistrer_journal("dropped", n)
+            return False
+        self._file.put((maintenant, model_version, features, survivants, confidences, latence))
+        enregistrer_journal("queued", n, en_attente)
+        if en_attente >= self.taille_lot:
+            self._reveil.set()
+        return True
+
+    def _demarrer(self) -> None:
+        """
+        Start the writer thread if it is not running in this process.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._verrou:
+            if self._pid == os.getpid():
+                return
+            self._file = queue.SimpleQueue()
+            self._en_attente = 0
+            self._arret.clear()
+            self._thread = threading.Thread(target=self._boucle, name="prediction-log", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            logger.info(f"Journal des prédictions: {self.dossier}, écriture toutes les {self.intervalle}s")
+
+    def _vider(self) -> list:
+        """
+        Take every batch waiting in the queue.
+        """
+        lots = []
+        while True:
+            try:
+                lots.append(self._file.get_nowait())
+            except queue.Empty:
+                return lots
+
+    def _boucle(self) -> None:
+        """
+        Writer loop run by the background thread.
+        """
+        while not self._arret.is_set():
+            self._reveil.wait(self.intervalle)
+            self._reveil.clear()
+            self.ecrire()
+
+    def ecrire(self) -> int:
+        """
+        Write the waiting batches, one Parquet file per hour partition.
+
+        Returns:
+            Number of rows written
+        """
+        lots = self._vider()
+        if not lots:
+            return 0
+        n = sum(len(lot[2]) for lot in lots)
+        with self._verrou:
+            self._en_attente -= n
+            en_attente = self._en_attente
+
+        try:
+            table = _assembler(lots)
+            for heure, partie in table.groupby("_heure", sort=True):
+                self._ecrire_partition(heure, partie.drop(columns="_heure"))
+            enregistrer_journal("written", n, en_attente)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture du journal des prédictions: {e}")
+            enregistrer_journal("error", n, en_attente)
+            return 0
+        return n
+
+    def _ecrire_partition(self, heure: int, partie: pd.DataFrame) -> None:
+        """
+        Write the rows of one hour into a new file of its partition.
+
+        The file is written under a temporary name and renamed, so readers
+        never see a partial file.
+        """
+        debut = datetime.fromtimestamp(heure * 3600, tz=timezone.utc)
+        dossier = self.dossier / f"date={debut:%Y-%m-%d}" / f"hour={debut:%H}"
+        dossier.mkdir(parents=True, exist_ok=True)
+        with self._verrou:
+            self._numero += 1
+            numero = self._numero
+        nom = f"part-{os.getpid()}-{int(time.time() * 1000)}-{numero}.parquet"
+
+        pyarrow, parquet = _importer_parquet()
+        temporaire = dossier / f".{nom}.tmp"
+        parquet.write_table(pyarrow.Table.from_pandas(partie, preserve_index=False), temporaire)
+        os.replace(temporaire, dossier / nom)
+
+    def arreter(self) -> None:
+        """
+        Stop the writer thread after writing the waiting batches.
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._arret.set()
+        self._reveil.set()
+        self._thread.join(timeout=30)
+        self.ecrire()
+        self._thread = None
+        self._pid = None
+
+
+def _assembler(lots: list) -> pd.DataFrame:
+    """
+    Concatenate queued batches into one table with an hour key per row.
+
+    Args:
+        lots: Tuples (time, model version, features, survivants, confidences, latency)
+
+    Returns:
+        DataFrame with the logged columns and "_heure" (hours since the epoch, UTC)
+    """
+    tailles = [len(lot[2]) for lot in lots]
+    features = np.concatenate([np.asarray(lot[2], dtype=np.float64).reshape(-1, 2) for lot in lots])
+    horodatages = np.repeat([lot[0] for lot in lots], tailles)
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(horodatages, unit="s", utc=True),
+        "model_version": pd.Categorical(np.repeat([lot[1] for lot in lots], tailles)),
+        "Sex": features[:, 0].astype(np.int8),
+        "Fare": features[:, 1],
+        "prediction": np.concatenate([np.asarray(lot[3], dtype=np.int8) for lot in lots]),
+        "confidence": np.concatenate([np.asarray(lot[4], dtype=np.float64) for lot in lots]),
+        "latency": np.repeat([lot[5] / max(1, taille) for lot, taille in zip(lots, tailles)], tailles),
+        "_heure": (horodatages // 3600).astype(np.int64),
+    })
+
+
+def lire_predictions(
+    dossier: Optional[Path] = None,
+    debut: Optional[datetime] = None,
+    fin: Optional[datetime] = None,
+    limite: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Read the prediction logs, e.g. as `current_data` of a drift report.
+
+    Only the partitions overlapping [debut, fin) are opened; with `limite`,
+    they are opened from the most recent one until enough rows are read.
+
+    Args:
+        dossier: Root directory of the partitions (defaults to the configured one)
+        debut: Keep predictions made at or after this time (UTC if naive)
+        fin: Keep predictions made before this time (UTC if naive)
+        limite: Keep only the most recent predictions
+
+    Returns:
+        DataFrame with timestamp, model_version, Sex, Fare, prediction
+        (1 = Survived), confidence and latency, sorted by time
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    if _importer_parquet() is None:
+        raise ImportError("La lecture du journal des prédictions nécessite le paquet pyarrow")
+    dossier = Path(dossier or DOSSIER_JOURNAL)
+    debut = _en_utc(debut)
+    fin = _en_utc(fin)
+
+    partitions = []
+    for partition in sorted(dossier.glob("date=*/hour=*")):
+        heure = datetime.strptime(
+            f"{partition.parent.name[5:]} {partition.name[5:]}", "%Y-%m-%d %H"
+        ).replace(tzinfo=timezone.utc)
+        if debut is not None and heure.timestamp() + 3600 <= debut.timestamp():
+            continue
+        if fin is not None and heure >= fin:
+            continue
+        partitions.append(partition)
+
+    colonnes = ["timestamp", "model_version", "Sex", "Fare", "prediction", "confidence", "latency"]
+    tables, lignes = [], 0
+    for partition in reversed(partitions):
+        for fichier in sorted(partition.glob("*.parquet")):
+            table = pd.read_parquet(fichier)
+            if debut is not None:
+                table = table[table["timestamp"] >= debut]
+            if fin is not None:
+                table = table[table["timestamp"] < fin]
+            tables.append(table)
+            lignes += len(table)
+        if limite is not None and lignes >= limite:
+            break
+    if not tables:
+        return pd.DataFrame(columns=colonnes)
+    df = pd.concat(tables[::-1], ignore_index=True)
+    df["model_version"] = df["model_version"].astype(str)
+    df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)[colonnes]
+    if limite is not None:
+        df = df.iloc[len(df) - min(limite, len(df)):].reset_index(drop=True)
+    return df
+
+
+def _en_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """
+    Make a datetime timezone-aware, naive values being taken as UTC.
+    """
+    if moment is None or moment.tzinfo is not None:
+        return moment
+    return moment.replace(tzinfo=timezone.utc)
+
+
+DOSSIER_JOURNAL = Path(config.PREDICTION_LOG_DIR or Path(__file__).resolve().parent.parent / "reports" / "predictions")
+
+journal = None
+if config.PREDICTION_LOG_ENABLED:
+    if _importer_parquet() is None:
+        logger.warning("Journal des prédictions désactivé: le paquet pyarrow est absent")
+    else:
+        journal = JournalPredictions(
+            DOSSIER_JOURNAL,
+            intervalle=config.PREDICTION_LOG_FLUSH_S,
+            taille_lot=config.PREDICTION_LOG_BATCH_ROWS,
+            max_en_attente=config.PREDICTION_LOG_MAX_PENDING_ROWS,
+        )
@@ -0,0 +1,223 @@
+"""
+Non-blocking file logging.
+The loguru file sink only puts the formatted record on a bounded queue; a
+background thread writes the queued records to the log file, rotating and
+gzip-compressing it, so logging adds no file I/O to the requests.
+"""
+
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from api import config
+from api.metrics import enregistrer_logs, resume_predictions
+
+# Maximum number of records written at once by the writer thread
+TAILLE_ECRITURE = 1000
+
+
+def _compresser(source: str, destination: str) -> None:
+    """
+    Rotator of the log file: gzip the file that was just closed.
+    """
+    with open(source, "rb") as entree, gzip.open(destination, "wb") as sortie:
+        shutil.copyfileobj(entree, sortie)
+    os.remove(source)
+
+
+class SinkAsynchrone:
+    """
+    Loguru sink writing to a rotating file from a background thread.
+
+    Calling the sink (what loguru does for each record) only puts the
+    formatted line on a queue of `taille_file` records: when the queue is
+    full, the record is dropped and counted rather than slowing the caller
+    down. The writer thread drains the queue in chunks and appends them to
+    `chemin`; past `taille_max` bytes the file is rotated, keeping
+    `nb_archives` archives, gzip-compressed if `compression`. With
+    `par_processus`, each process writes and rotates its own file, named
+    after its PID ("api.log" becomes "api.<pid>.log"): rotating a file
+    shared by several workers would lose or mix their records.
+
+    The thread is started by `demarrer`, and restarted on the next record if
+    the process was forked after it started.
+
+    Attributes:
+        chemin: Log file
+        taille_max: Size of the file that triggers a rotation, in bytes (0 never rotates)
+        nb_archives: Number of rotated files kept
+        compression: Gzip the rotated files
+        taille_file: Maximum number of records waiting to be written
+        par_processus: Write one file per process
+    """
+
+    def __init__(
+        self,
+        chemin: Path,
+        taille_max: int,
+        nb_archives: int = 10,
+        compression: bool = True,
+        taille_file: int = 10000,
+        par_processus: bool = False
+    ):
+        self.chemin = Path(chemin)
+        self.taille_max = taille_max
+        self.nb_archives = nb_archives
+        self.compression = compression
+        self.taille_file = max(1, taille_file)
+        self.par_processus = par_processus
+        self._file = queue.Queue(maxsize=self.taille_file)
+        self._pid = None
+        self._thread = None
+        self._verrou = threading.Lock()
+
+    def __call__(self, message) -> None:
+        """
+        Queue a formatted record (called by loguru).
+        """
+        if self._pid is not None and self._pid != os.getpid():
+            self.demarrer()
+        try:
+            self._file.put_nowait(str(message))
+        except queue.Full:
+            enregistrer_logs("dropped", 1, self._file.qsize())
+
+    def demarrer(self) -> None:
+        """
+        Start the writer thread if it is not running in this process.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._verrou:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the records queued by the parent are its own
+                self._file = queue.Queue(maxsize=self.taille_file)
+            self._thread = threading.Thread(target=self._boucle, name="log-writer", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def fichier(self) -> Path:
+        """
+        Log file written by this process.
+        """
+        if not self.par_processus:
+            return self.chemin
+        return self.chemin.with_name(f"{self.chemin.stem}.{os.getpid()}{self.chemin.suffix}")
+
+    def _ouvrir(self) -> logging.handlers.RotatingFileHandler:
+        """
+        Open the log file, with the rotation and compression settings.
+        """
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        fichier = logging.handlers.RotatingFileHandler(
+            self.fichier(), maxBytes=self.taille_max, backupCount=self.nb_archives, encoding="utf-8"
+        )
+        fichier.terminator = ""
+        if self.compression:
+            fichier.namer = lambda nom: f"{nom}.gz"
+            fichier.rotator = _compresser
+        return fichier
+
+    def _boucle(self) -> None:
+        """
+        Writer loop run by the background thread, until it takes None.
+        """
+        fichier = self._ouvrir()
+        try:
+            termine = False
+            while not termine:
+                lignes = [self._file.get()]
+                while len(lignes) < TAILLE_ECRITURE:
+                    try:
+                        lignes.append(self._file.get_nowait())
+                    except queue.Empty:
+                        break
+                if lignes[-1] is None:
+                    lignes.pop()
+                    termine = True
+                if lignes:
+                    self._ecrire(fichier, lignes)
+        finally:
+            fichier.close()
+
+    def _ecrire(self, fichier: logging.handlers.RotatingFileHandler, lignes: list) -> None:
+        """
+        Append records to the file, rotating it first if it is full.
+        """
+        try:
+            fichier.emit(logging.makeLogRecord({"msg": "".join(lignes)}))
+            enregistrer_logs("written", len(lignes), self._file.qsize())
+        except Exception:
+            enregistrer_logs("error", len(lignes), self._file.qsize())
+
+    def arreter(self, delai: float = 5.0) -> None:
+        """
+        Stop the writer thread after writing the queued records.
+
+        Args:
+            delai: Maximum time to wait for the thread in seconds
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._file.put(None, timeout=delai)
+        except queue.Full:
+            return
+        self._thread.join(timeout=delai)
+        self._thread = None
+        self._pid = None
+
+
+sink = None
+_identifiant_sink = None
+
+
+def configurer_journalisation() -> Optional[SinkAsynchrone]:
+    """
+    Add the asynchronous file sink to loguru.
+
+    Records are written as JSON lines (one object with the message, level,
+    time, source and bound fields such as the prediction summaries) when
+    `LOG_JSON` is set, as text otherwise.
+
+    Returns:
+        The sink, or None if `LOG_FILE` is empty
+    """
+    global sink, _identifiant_sink
+    if sink is not None or not config.LOG_FILE:
+        return sink
+    sink = SinkAsynchrone(
+        Path(config.LOG_FILE),
+        taille_max=int(config.LOG_ROTATION_MB * 1024 * 1024),
+        nb_archives=config.LOG_BACKUPS,
+        compression=config.LOG_COMPRESSION,
+        taille_file=config.LOG_QUEUE_SIZE,
+        par_processus=config.LOG_FILE_PER_PROCESS,
+    )
+    sink.demarrer()
+    _identifiant_sink = logger.add(sink, level=config.LOG_LEVEL, serialize=config.LOG_JSON)
+    return sink
+
+
+def arreter_journalisation() -> None:
+    """
+    Log the pending prediction summary, then flush and remove the file sink.
+    """
+    global sink, _identifiant_sink
+    resume_predictions.publier()
+    if sink is None:
+        return
+    logger.remove(_identifiant_sink)
+    sink.arreter()
+    sink = None
+    _identifiant_sink = None
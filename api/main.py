@@ -1,17 +1,46 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import RedirectResponse
-from api.models import Passenger, Passengers
-from api.predict import predict_passenger, predict_passengers
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import FileResponse, RedirectResponse, Response
+from api import config
+from api.models import DemandeRapport, Feedback, Feedbacks, Passenger, Passengers, PassengersColumns
+from api.executor import executer_inference, arreter_executor
+from api.predict import (
+    columns_to_array,
+    manager,
+    passengers_to_array,
+    predict_columns,
+    predict_passenger_with_proba_async,
+    predict_passengers_with_proba,
+)
+from api.streaming import ReponseNDJSON, generer_predictions_ndjson
+from api.feedback import suivi
+from api.drift import moniteur
+from api.historique import historique
+from api.echantillons import echantillons
+from api.journal import journal, lire_predictions
+from api.journalisation import arreter_journalisation, configurer_journalisation
+from api.observation import observer_predictions
+from api.planificateur import planificateur
+from api.taches import TachesSaturees, taches
+from api.evaluation import DEBUT, evaluer_modele, lancer_evaluation, obtenir_etat
+from api.formats import FORMATS, FormatError, decoder_passagers, encoder_predictions, negocier_format
 from prometheus_fastapi_instrumentator import Instrumentator
 from loguru import logger
+import asyncio
+import os
+import secrets
 import time
-from typing import Dict
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
 
 from api.metrics import (
     enregistrer_prediction,
+    enregistrer_predictions_lot,
     enregistrer_erreur,
+    enregistrer_demarrage,
     obtenir_statistiques_metriques,
-    mettre_a_jour_accuracy,
+    arreter_pool_rapports,
 )
 
 app = FastAPI(
@@ -24,6 +53,16 @@ app = FastAPI(
 
     - `/predict_many`: prediction for multiple passengers.
 
+    - `/predict_many/columnar`: prediction for large batches sent as columns.
+
+    - `/predict_many/stream`: streaming NDJSON prediction for very large batches.
+
+    - `/predict_batch`: batch prediction in JSON, Arrow IPC or .npy.
+
+    - `/feedback`, `/feedback_many`: true labels of served predictions.
+
+    - `/admin/model/reload`: hot reload of the model file (requires `ADMIN_TOKEN`).
+
     The inputs must be:
     - Sex: 'M' or 'F'
     - Fare: float
@@ -35,7 +74,7 @@ app = FastAPI(
 
 
 @app.post("/predict", summary="Prediction for one Titanic passenger", response_description="Response of the prediction")
-def predict(passenger: Passenger):
+async def predict(passenger: Passenger):
     """
     Predict survival for a single Titanic passenger.
 
@@ -55,43 +94,104 @@ def predict(passenger: Passenger):
 
     Example response:
     {
-        "prediction": "Survived"
+        "prediction": "Survived",
+        "probabilities": {"Died": 0.2, "Survived": 0.8},
+        "confidence": 0.8,
+        "model_version": "sha256-3f1a9c0b2d4e",
+        "prediction_id": "3f1a9c0b2d4e-42"
     }
-    """
-    import time
 
-    start_time = time.time()
+    The prediction_id can be sent later to `/feedback` with the true outcome.
+    """
+    start_time = time.perf_counter()
 
     try:
-        prediction = predict_passenger(passenger.dict())
-        latency = time.time() - start_time
-
-        from api.predict import encode_sex, pipeline
-        import pandas as pd
-
-        passenger_encoded = passenger.dict()
-        passenger_encoded["Sex"] = encode_sex(passenger.Sex)
-        df = pd.DataFrame([passenger_encoded])
-        proba = pipeline.predict_proba(df)[0]
-
-        confidence = float(max(proba))
+        resultat = await predict_passenger_with_proba_async(passenger)
+        latency = time.perf_counter() - start_time
 
         enregistrer_prediction(
-            model_version="v1.0",
-            prediction_class=prediction.lower(),
-            confidence=confidence,
+            model_version=resultat["model_version"],
+            prediction_class=resultat["prediction"].lower(),
+            confidence=resultat["confidence"],
             latency=latency
         )
 
-        return {"prediction": prediction}
+        observer_predictions(
+            resultat["model_version"],
+            np.array([[passenger.Sex == "F", passenger.Fare]]),
+            [resultat["prediction"]],
+            [resultat["confidence"]],
+            latency
+        )
+        identifiants = await executer_inference(suivi.enregistrer, resultat["model_version"], [resultat["prediction"]])
+        resultat["prediction_id"] = identifiants[0]
+        return resultat
 
     except Exception as e:
         enregistrer_erreur("prediction_error")
         raise
 
 
+def _predire_passagers(passengers: list) -> tuple:
+    """
+    Score passengers, record their metrics and feed the in-process monitors.
+
+    The engine is read once, so a reload during the call cannot label the
+    predictions with the version of another model.
+
+    Args:
+        passengers: List of Passenger objects
+
+    Returns:
+        Tuple (results of `predict_passengers_with_proba`, model version)
+    """
+    modele = manager.engine
+    start_time = time.perf_counter()
+    resultats = predict_passengers_with_proba(passengers, modele)
+    latency = time.perf_counter() - start_time
+    predictions = [r["prediction"] for r in resultats]
+    confidences = [r["confidence"] for r in resultats]
+    enregistrer_predictions_lot(
+        model_version=modele.version,
+        prediction_classes=np.char.lower(np.array(predictions, dtype=str)),
+        confidences=confidences,
+        latency=latency,
+        endpoint="predict_many"
+    )
+    observer_predictions(modele.version, passengers_to_array(passengers), predictions, confidences, latency)
+    return resultats, modele.version
+
+
+def _predire_colonnes(sex: list, fare: list) -> tuple:
+    """
+    Score passengers given as columns, record their metrics and feed the in-process monitors.
+
+    The engine is read once, as in `_predire_passagers`.
+
+    Args:
+        sex: Sex column
+        fare: Fare column
+
+    Returns:
+        Tuple (result of `predict_columns`, model version)
+    """
+    modele = manager.engine
+    start_time = time.perf_counter()
+    resultat = predict_columns(sex, fare, modele)
+    latency = time.perf_counter() - start_time
+    enregistrer_predictions_lot(
+        model_version=modele.version,
+        prediction_classes=np.char.lower(np.array(resultat["prediction"], dtype=str)),
+        confidences=resultat["confidence"],
+        latency=latency,
+        endpoint="predict_many_columnar"
+    )
+    observer_predictions(modele.version, columns_to_array(sex, fare), resultat["prediction"], resultat["confidence"], latency)
+    return resultat, modele.version
+
+
 @app.post("/predict_many", summary="Prediction for multiple Titanic passengers", response_description="List of predictions")
-def predict_many(passengers: Passengers):
+async def predict_many(passengers: Passengers):
     """
     Predict survival for multiple Titanic passengers in a single request.
 
@@ -114,17 +214,143 @@ def predict_many(passengers: Passengers):
         "predictions": [
             "Died",
             "Survived"
+        ],
+        "confidences": [
+            0.87,
+            0.93
+        ],
+        "prediction_ids": [
+            "3f1a9c0b2d4e-43",
+            "3f1a9c0b2d4e-44"
         ]
     }
     """
-    passenger_list = [p.dict() for p in passengers.passengers]
-    predictions = predict_passengers(passenger_list)
-    return {"predictions": predictions}
+    resultats, version = await executer_inference(_predire_passagers, passengers.passengers)
+    predictions = [r["prediction"] for r in resultats]
+    return {
+        "predictions": predictions,
+        "confidences": [r["confidence"] for r in resultats],
+        "prediction_ids": await executer_inference(suivi.enregistrer, version, predictions),
+    }
+
+
+@app.post("/predict_many/columnar", summary="Columnar prediction for many Titanic passengers", response_description="Columnar predictions")
+async def predict_many_columnar(columns: PassengersColumns):
+    """
+    Predict survival for a large batch of passengers sent as columns.
+
+    Columns are validated as whole arrays and converted directly into a
+    NumPy matrix, avoiding one Passenger object per row. Prefer this
+    endpoint over `/predict_many` for batches of thousands of rows.
+
+    Example request:
+    {
+        "Sex": ["M", "F"],
+        "Fare": [10.0, 50.0]
+    }
+
+    Example response:
+    {
+        "prediction": ["Died", "Survived"],
+        "confidence": [0.87, 0.93],
+        "prediction_id": ["3f1a9c0b2d4e-45", "3f1a9c0b2d4e-46"]
+    }
+    """
+    resultat, version = await executer_inference(_predire_colonnes, columns.Sex, columns.Fare)
+    resultat["prediction_id"] = await executer_inference(suivi.enregistrer, version, resultat["prediction"])
+    return resultat
+
+@app.post("/predict_many/stream", summary="Streaming NDJSON prediction for very large batches", response_description="NDJSON predictions")
+async def predict_many_stream(request: Request):
+    """
+    Predict survival for an unbounded stream of passengers.
+
+    The request body is NDJSON (one passenger per line) and is read
+    incrementally; passengers are scored in fixed-size chunks and the
+    predictions are streamed back as NDJSON, one line per input line.
+    Memory stays flat regardless of the input size.
+
+    Example request body:
+    {"Sex": "M", "Fare": 10.0}
+    {"Sex": "F", "Fare": 50.0}
+
+    Example response body:
+    {"prediction": "Died", "confidence": 0.87}
+    {"prediction": "Survived", "confidence": 0.93}
+
+    Invalid lines produce {"error": "..."} at their position.
+    """
+    return ReponseNDJSON(generer_predictions_ndjson(request.stream()))
+
+def _predire_lot(features):
+    """
+    Score a decoded batch, record its metrics and feed the in-process monitors.
+
+    Args:
+        features: Array of shape (n, 2) with columns Sex, Fare
+
+    Returns:
+        Tuple (class labels of the model, class indices, probabilities)
+    """
+    modele = manager.engine
+    start_time = time.perf_counter()
+    indices, probas = modele.predict(features)
+    latency = time.perf_counter() - start_time
+
+    confidences = probas[np.arange(len(indices)), indices]
+    enregistrer_predictions_lot(
+        model_version=modele.version,
+        prediction_classes=np.char.lower(modele.labels[indices]),
+        confidences=confidences,
+        latency=latency,
+        endpoint="predict_batch"
+    )
+    observer_predictions(modele.version, features, modele.labels[indices], confidences, latency)
+    return modele.labels, indices, probas
+
+
+@app.post("/predict_batch", summary="Batch prediction in JSON, Arrow IPC or .npy", response_description="Predictions and probabilities")
+async def predict_batch(request: Request):
+    """
+    Predict survival for a batch of passengers in a binary or JSON format.
+
+    The input format is read from `Content-Type`:
+    - `application/json`: columnar JSON {"Sex": [...], "Fare": [...]}
+    - `application/vnd.apache.arrow.stream`: Arrow IPC stream with "Sex"
+      ('M'/'F' or 0/1) and "Fare" columns
+    - `application/x-npy`: .npy buffer, either a structured array with
+      "Sex" and "Fare" fields or a (n, 2) array of [Sex, Fare] rows
+
+    The response uses the same format unless `Accept` asks for another
+    supported one. It contains the predicted label, its confidence and one
+    "probability_<label>" column per class (nested under "probabilities"
+    in JSON).
+    """
+    format_entree, format_sortie = negocier_format(
+        request.headers.get("content-type"),
+        request.headers.get("accept")
+    )
+    if format_entree not in FORMATS:
+        raise HTTPException(status_code=415, detail=f"Formats acceptés: {list(FORMATS)}")
+    if format_sortie is None:
+        raise HTTPException(status_code=406, detail=f"Formats disponibles: {list(FORMATS)}")
 
+    try:
+        features = decoder_passagers(await request.body(), format_entree)
+    except FormatError as e:
+        enregistrer_erreur("batch_format_error")
+        raise HTTPException(status_code=422, detail=str(e))
+
+    labels, indices, probas = await executer_inference(_predire_lot, features)
+    return Response(
+        content=encoder_predictions(labels, indices, probas, format_sortie),
+        media_type=format_sortie
+    )
 
 
 Instrumentator().instrument(app).expose(app)
-logger.add("logs/api.log", rotation="500 MB", level="INFO")
+manager.ajouter_observateur(lancer_evaluation)
+configurer_journalisation()
 
 
 @app.get("/")
@@ -161,6 +387,341 @@ def health_check() -> Dict:
     }
 
 
+@app.get("/ready")
+def readiness_check(response: Response) -> Dict:
+    """
+    Readiness endpoint, distinct from the `/health` liveness check.
+
+    The API is ready once the startup evaluation of the model has finished
+    (successfully or not); until then it answers 503.
+
+    Returns:
+        Readiness and state of the model evaluation
+    """
+    etat = obtenir_etat()
+    if not etat["ready"]:
+        response.status_code = 503
+    return {
+        "status": "ready" if etat["ready"] else "starting",
+        "model_version": manager.version,
+        "evaluation": etat
+    }
+
+
+@app.post("/feedback", summary="True label of a served prediction", response_description="Join result and live performance")
+async def feedback(retour: Feedback) -> Dict:
+    """
+    Send the true outcome of a prediction made earlier.
+
+    The label is joined to the prediction through its ID and counted in the
+    sliding windows of live accuracy, precision and recall.
+
+    Example request:
+    {
+        "prediction_id": "3f1a9c0b2d4e-42",
+        "label": "Survived"
+    }
+
+    Example response:
+    {
+        "matched": 1,
+        "unknown": [],
+        "performance": {"sha256-3f1a9c0b2d4e": {"300s": {"samples": 1, "accuracy": 1.0, ...}}}
+    }
+
+    IDs that are unknown, too old to be kept, or already labelled are
+    returned in "unknown" and not counted.
+    """
+    resultat = await executer_inference(suivi.ajouter_verites, [retour.prediction_id], [retour.label])
+    return {**resultat, "performance": await executer_inference(suivi.publier)}
+
+
+@app.post("/feedback_many", summary="True labels of multiple served predictions", response_description="Join result and live performance")
+async def feedback_many(retours: Feedbacks) -> Dict:
+    """
+    Send the true outcomes of multiple predictions made earlier.
+
+    Example request:
+    {
+        "feedbacks": [
+            {"prediction_id": "3f1a9c0b2d4e-43", "label": "Died"},
+            {"prediction_id": "3f1a9c0b2d4e-44", "label": "Survived"}
+        ]
+    }
+
+    The response has the same shape as `/feedback`.
+    """
+    resultat = await executer_inference(
+        suivi.ajouter_verites,
+        [r.prediction_id for r in retours.feedbacks],
+        [r.label for r in retours.feedbacks]
+    )
+    return {**resultat, "performance": await executer_inference(suivi.publier)}
+
+
+@app.get("/monitoring/live-performance")
+def obtenir_performance_live() -> Dict:
+    """
+    Get the live accuracy, precision and recall computed from the true labels.
+
+    Returns:
+        Metrics of each sliding window, per model version
+    """
+    return {
+        "status": "success",
+        "data": suivi.publier()
+    }
+
+
+@app.get("/monitoring/drift")
+def obtenir_drift_live() -> Dict:
+    """
+    Get the drift of the recent traffic against the reference data.
+
+    Returns:
+        Drift score and PSI / KS / Jensen-Shannon statistics of Sex, Fare
+        and the predicted class over the sliding window
+    """
+    if moniteur is None:
+        raise HTTPException(status_code=404, detail="Détection de drift en direct désactivée")
+    return {
+        "status": "success",
+        "data": moniteur.calculer()
+    }
+
+
+@app.get("/monitoring/recent-predictions")
+def obtenir_predictions_recentes(limit: Optional[int] = None, since: Optional[float] = None) -> Dict:
+    """
+    Snapshot the recent predictions.
+
+    With the prediction log enabled, the snapshot is read from it and holds
+    the traffic of all the workers: this worker first writes its pending
+    batches, the batches of the other workers appear within
+    `PREDICTION_LOG_FLUSH_S` seconds. Otherwise it is the in-memory history
+    of this worker only ("scope": "worker"). At most `RECENT_PREDICTIONS_SIZE`
+    predictions are returned. The columns can be loaded with
+    `pd.DataFrame(response["data"])` and passed as `current_data` to
+    `generer_rapport_drift`.
+
+    Args:
+        limit: Return only the most recent predictions
+        since: Return only the predictions made after this Unix time
+
+    Returns:
+        Columns Sex, Fare, prediction (1 = Survived), confidence, latency
+        and timestamp, oldest prediction first, and the scope of the
+        snapshot: "all_workers" or "worker" (with its PID)
+    """
+    limite = min(limit, historique.capacite) if limit is not None else historique.capacite
+    if journal is not None:
+        journal.ecrire()
+        df = lire_predictions(
+            journal.dossier,
+            debut=datetime.fromtimestamp(since, tz=timezone.utc) if since is not None else None,
+            limite=limite
+        )
+        if len(df):
+            df["timestamp"] = (df["timestamp"] - pd.Timestamp(0, tz="UTC")).dt.total_seconds()
+        df = df[["Sex", "Fare", "prediction", "confidence", "latency", "timestamp"]]
+        portee = {"scope": "all_workers"}
+    else:
+        df = historique.dataframe(limite=limite, depuis=since)
+        portee = {"scope": "worker", "worker_pid": os.getpid()}
+    return {
+        "status": "success",
+        "count": len(df),
+        "capacity": historique.capacite,
+        **portee,
+        "data": df.to_dict(orient="list")
+    }
+
+
+@app.get("/monitoring/sample")
+def obtenir_echantillon(
+    since: Optional[float] = None,
+    size: Optional[int] = None,
+    predicted_class: Optional[int] = None
+) -> Dict:
+    """
+    Draw a sample of the scored traffic from the reservoir samples.
+
+    Unlike the history of recent predictions, the sample covers the last
+    `SAMPLE_WINDOWS` windows of `SAMPLE_WINDOW_S` seconds whatever the
+    traffic, with the predicted classes in their proportions.
+
+    Args:
+        since: Sample only the predictions made after this Unix time
+        size: Maximum number of rows
+        predicted_class: Sample only this class (1 = Survived, 0 = Died)
+
+    Returns:
+        Columns Sex, Fare, prediction and timestamp, and the sampled
+        fraction of the predictions, overall and per class
+    """
+    if echantillons is None:
+        raise HTTPException(status_code=404, detail="Échantillons désactivés (SAMPLE_RESERVOIR_SIZE=0)")
+    df = echantillons.echantillon(depuis=since, taille=size, classe=predicted_class)
+    return {
+        "status": "success",
+        "count": len(df),
+        "sampling": df.attrs["echantillonnage"],
+        "data": df.to_dict(orient="list")
+    }
+
+
+@app.get("/monitoring/scheduled")
+def obtenir_surveillance_planifiee() -> Dict:
+    """
+    Get the state of the scheduled drift and classification monitoring.
+
+    With several workers, only the worker running the scheduler has its
+    results; the others answer with an empty "last_run".
+
+    Returns:
+        Schedule, staleness and results of the last run
+    """
+    if planificateur is None:
+        raise HTTPException(status_code=404, detail="Surveillance planifiée désactivée (MONITOR_INTERVAL_S=0)")
+    return {
+        "status": "success",
+        "data": planificateur.etat()
+    }
+
+
+@app.post("/reports/jobs", status_code=202)
+def soumettre_rapport(demande: DemandeRapport) -> Dict:
+    """
+    Submit a report job and return its ID without waiting for the report.
+
+    The drift report compares the predictions of the window with the
+    reference data; the classification and complete reports evaluate the
+    served model on the labelled dataset `MONITOR_LABELLED_FILE`. If an
+    identical job is already pending or running, its ID is returned.
+
+    Args:
+        demande: Report, window and sample size
+
+    Returns:
+        Job ("id", "status", ...) and whether it was an existing one
+    """
+    try:
+        tache, dedupliquee = taches.soumettre(demande.report, demande.since, demande.until, demande.sample_size)
+    except TachesSaturees as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {
+        "status": "success",
+        "deduplicated": dedupliquee,
+        "data": tache
+    }
+
+
+@app.get("/reports/jobs/{job_id}")
+def obtenir_tache_rapport(job_id: str) -> Dict:
+    """
+    Get the state of a report job.
+
+    Returns:
+        Job with its status ("pending", "running", "success" or "error")
+        and, once done, the summary of the report or the error
+    """
+    tache = taches.obtenir(job_id)
+    if tache is None:
+        raise HTTPException(status_code=404, detail=f"Tâche de rapport inconnue: {job_id}")
+    return {
+        "status": "success",
+        "data": tache
+    }
+
+
+@app.get("/reports/jobs/{job_id}/result")
+def obtenir_resultat_rapport(job_id: str, format: str = "json", report: Optional[str] = None):
+    """
+    Fetch the result of a finished report job.
+
+    Args:
+        job_id: Job ID
+        format: "json" (results of the report) or "html"
+        report: HTML report of a complete job ("drift" or "classification")
+
+    Returns:
+        JSON results, or the HTML file of the report
+    """
+    tache = taches.obtenir(job_id)
+    if tache is None:
+        raise HTTPException(status_code=404, detail=f"Tâche de rapport inconnue: {job_id}")
+    if tache["status"] != "success":
+        raise HTTPException(status_code=409, detail=f"Tâche de rapport {tache['status']}: {tache.get('error', 'pas encore terminée')}")
+    if format not in ("json", "html"):
+        raise HTTPException(status_code=406, detail="Formats disponibles: ['json', 'html']")
+    if format == "json":
+        fichier = taches.fichier_resultat(job_id)
+    else:
+        fichier = taches.fichier_resultat(job_id, report or next(iter(tache["result"]["files"]), None))
+    if fichier is None:
+        raise HTTPException(status_code=404, detail=f"Pas de résultat {format} pour cette tâche")
+    return FileResponse(fichier, media_type="application/json" if format == "json" else "text/html")
+
+
+def verifier_jeton_admin(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Check the token of a request to the /admin endpoints.
+
+    Args:
+        authorization: "Authorization" header, "Bearer <ADMIN_TOKEN>"
+
+    Raises:
+        HTTPException: 403 if `ADMIN_TOKEN` is not set, 401 if the header
+            does not carry it
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Endpoints d'administration désactivés: ADMIN_TOKEN non défini")
+    attendu = f"Bearer {config.ADMIN_TOKEN}".encode()
+    if authorization is None or not secrets.compare_digest(authorization.encode(), attendu):
+        raise HTTPException(status_code=401, detail="Jeton d'administration invalide", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/admin/model", dependencies=[Depends(verifier_jeton_admin)])
+def obtenir_modele() -> Dict:
+    """
+    Describe the model currently served.
+
+    Returns:
+        Version, path, load time and inference mode of the model
+    """
+    return {
+        "status": "success",
+        "data": manager.informations()
+    }
+
+
+@app.post("/admin/model/reload", dependencies=[Depends(verifier_jeton_admin)])
+async def recharger_modele() -> Dict:
+    """
+    Reload the model file and swap it with the model being served.
+
+    The new model is loaded and warmed in a background thread while
+    requests keep being served by the current one; the swap is atomic.
+    If loading fails, the current model is kept.
+
+    With several workers, only the worker receiving this request reloads;
+    set `MODEL_WATCH_INTERVAL_S` to reload every worker on file change.
+
+    Returns:
+        New and previous model versions and the loading time
+    """
+    try:
+        resultat = await asyncio.to_thread(manager.recharger)
+        return {
+            "status": "success",
+            "message": "Modèle rechargé",
+            "data": resultat
+        }
+    except Exception as e:
+        enregistrer_erreur("model_reload_error")
+        raise HTTPException(status_code=500, detail=f"Rechargement du modèle impossible: {e}")
+
+
 @app.get("/monitoring/stats")
 def obtenir_stats() -> Dict:
     """
@@ -182,8 +743,8 @@ def obtenir_stats() -> Dict:
 
 
 @app.post("/monitoring/test/prediction")
-def test_enregistrer_prediction(
-    model_version: str = "v1.0",
+async def test_enregistrer_prediction(
+    model_version: Optional[str] = None,
     prediction_class: str = "survived",
     confidence: float = 0.85
 ) -> Dict:
@@ -191,7 +752,7 @@ def test_enregistrer_prediction(
     Test endpoint to register a prediction.
 
     Args:
-        model_version: Model version
+        model_version: Model version (defaults to the model currently served)
         prediction_class: Predicted class (survived/not_survived)
         confidence: Confidence level (0-1)
 
@@ -199,9 +760,10 @@ def test_enregistrer_prediction(
         Registration confirmation
     """
     try:
-        start_time = time.time()
-        time.sleep(0.01)
-        latency = time.time() - start_time
+        model_version = model_version or manager.version
+        start_time = time.perf_counter()
+        await asyncio.sleep(0.01)
+        latency = time.perf_counter() - start_time
 
         enregistrer_prediction(
             model_version=model_version,
@@ -227,56 +789,31 @@ def test_enregistrer_prediction(
 
 
 @app.post("/monitoring/calculate-accuracy")
-def calculer_accuracy_reelle() -> Dict:
+async def calculer_accuracy_reelle() -> Dict:
     """
     Automatically calculate the model's actual accuracy on the test dataset.
 
+    The result is cached for an unchanged model file and dataset, so
+    repeated calls are answered without evaluating the model again.
+
     Returns:
         Calculated accuracy and updated metric
     """
     try:
-        from pathlib import Path
-        import pandas as pd
-        from sklearn.metrics import accuracy_score
-        from api.predict import pipeline, encode_sex
-
-        model_version: str = "v1.0"
-        BASE_DIR = Path("/app")
-        data_path = BASE_DIR / "data" / "titanic_cleaned_dataset.csv"
-
-        if not data_path.exists():
-            raise FileNotFoundError(f"Dataset introuvable: {data_path}")
-
-        df = pd.read_csv(data_path)
-
-        split_idx = int(len(df) * 0.7)
-        test_data = df.iloc[split_idx:].copy()
+        resultat = await asyncio.to_thread(evaluer_modele)
 
-        X_test = test_data[['Sex', 'Fare']].copy()
-        y_test = test_data['Survived'].copy()
-
-        if X_test['Sex'].dtype == 'object':
-            X_test['Sex'] = X_test['Sex'].apply(lambda x: 0 if x.upper() == 'M' else 1)
-
-        y_pred = pipeline.predict(X_test)
-        accuracy = float(accuracy_score(y_test, y_pred))
-
-        mettre_a_jour_accuracy(
-            model_version=model_version,
-            accuracy=accuracy
-        )
-
-        logger.info(f"Accuracy calculée et mise à jour: {accuracy:.4f} ({accuracy*100:.2f}%)")
+        logger.info(f"Accuracy calculée et mise à jour: {resultat['accuracy']:.4f} ({resultat['accuracy']*100:.2f}%)")
 
         return {
             "status": "success",
             "message": "Accuracy calculée automatiquement sur le dataset de test",
             "data": {
-                "model_version": model_version,
-                "accuracy": accuracy,
-                "accuracy_percentage": f"{accuracy*100:.2f}%",
-                "test_samples": len(test_data),
-                "correct_predictions": int(accuracy * len(test_data))
+                "model_version": resultat["model_version"],
+                "accuracy": resultat["accuracy"],
+                "accuracy_percentage": f"{resultat['accuracy']*100:.2f}%",
+                "test_samples": resultat["test_samples"],
+                "correct_predictions": resultat["correct_predictions"],
+                "cached": resultat["cached"]
             }
         }
 
@@ -290,45 +827,22 @@ def calculer_accuracy_reelle() -> Dict:
 async def startup_event():
     """
     Event executed at application startup.
+
+    The accuracy of the model is evaluated in the background: the API
+    serves requests right away and `/ready` reports when the evaluation
+    has finished.
     """
     logger.info("Démarrage de l'API Titanic ML Monitoring")
     logger.info("Instrumentation Prometheus activée")
     logger.info("Endpoints de monitoring disponibles")
+    logger.info(f"Modèle servi: {manager.version}")
+    manager.demarrer_surveillance()
 
-    try:
-        logger.info("Calcul automatique de l'accuracy du modèle...")
-        from pathlib import Path
-        import pandas as pd
-        from sklearn.metrics import accuracy_score
-        from api.predict import pipeline
-
-        BASE_DIR = Path("/app")
-        data_path = BASE_DIR / "data" / "titanic_cleaned_dataset.csv"
-
-        if data_path.exists():
-            df = pd.read_csv(data_path)
-
-            split_idx = int(len(df) * 0.7)
-            test_data = df.iloc[split_idx:].copy()
-
-            X_test = test_data[['Sex', 'Fare']].copy()
-            y_test = test_data['Survived'].copy()
-
-            if X_test['Sex'].dtype == 'object':
-                X_test['Sex'] = X_test['Sex'].apply(lambda x: 0 if x.upper() == 'M' else 1)
-
-            y_pred = pipeline.predict(X_test)
-            accuracy = float(accuracy_score(y_test, y_pred))
-
-            mettre_a_jour_accuracy(model_version="v1.0", accuracy=accuracy)
-
-            logger.info(f"✅ Accuracy calculée et initialisée: {accuracy:.4f} ({accuracy*100:.2f}%) sur {len(test_data)} échantillons")
-        else:
-            logger.warning(f"⚠️  Dataset introuvable: {data_path} - Accuracy non initialisée")
-
-    except Exception as e:
-        logger.error(f"❌ Erreur lors du calcul automatique de l'accuracy: {e}")
-
+    logger.info("Calcul automatique de l'accuracy du modèle en arrière-plan...")
+    lancer_evaluation()
+    if planificateur is not None:
+        planificateur.demarrer()
+    enregistrer_demarrage("serving", time.time() - DEBUT)
 
 
 @app.on_event("shutdown")
@@ -336,4 +850,15 @@ async def shutdown_event():
     """
     Event executed at application shutdown.
     """
-    logger.info("Arrêt de l'API Titanic ML Monitoring")
\ No newline at end of file
+    manager.arreter_surveillance()
+    if planificateur is not None:
+        planificateur.arreter()
+    arreter_executor()
+    arreter_pool_rapports()
+    taches.arreter()
+    if echantillons is not None:
+        echantillons.arreter()
+    if journal is not None:
+        journal.arreter()
+    logger.info("Arrêt de l'API Titanic ML Monitoring")
+    arreter_journalisation()
\ No newline at end of file
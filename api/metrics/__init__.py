@@ -6,20 +6,79 @@ Exposes main monitoring functions and Prometheus metrics.
 from .monitoring import (
     predictions_total,
     prediction_latency,
+    prediction_batch_size,
+    prediction_request_batch_size,
+    prediction_batch_latency,
+    prediction_item_latency,
+    prediction_queue_wait,
+    prediction_cache_hits,
+    prediction_cache_misses,
+    prediction_cache_evictions,
+    prediction_cache_size,
+    prediction_log_rows,
+    prediction_log_queue,
+    log_records,
+    log_queue,
     prediction_errors,
     prediction_confidence,
     prediction_confidence_summary,
+    prediction_confidence_distribution,
     data_drift_detected,
     data_drift_score,
+    live_drift_statistic,
     model_accuracy,
+    model_reloads,
+    model_load_duration,
+    startup_duration,
+    model_evaluations,
+    live_accuracy,
+    live_precision,
+    live_recall,
+    live_labelled_samples,
+    feedback_labels,
+    report_cache_hits,
+    report_cache_misses,
+    report_cache_evictions,
+    report_cache_size,
+    report_jobs,
+    report_job_duration,
+    report_job_wait,
+    report_jobs_active,
+    monitoring_runs,
+    monitoring_run_duration,
+    monitoring_last_success,
+    monitoring_staleness,
     monitoring_requests,
     enregistrer_prediction,
+    enregistrer_predictions_lot,
+    enregistrer_micro_lot,
+    enregistrer_cache_prediction,
+    enregistrer_cache_rapport,
+    enregistrer_journal,
+    enregistrer_logs,
+    ResumePredictions,
+    resume_predictions,
+    enregistrer_chargement_modele,
+    enregistrer_demarrage,
+    enregistrer_evaluation,
     enregistrer_erreur,
     mettre_a_jour_accuracy,
+    enregistrer_feedback,
+    mettre_a_jour_performance_live,
+    mettre_a_jour_drift_live,
+    mettre_a_jour_drift,
+    enregistrer_surveillance,
+    mettre_a_jour_fraicheur_surveillance,
+    enregistrer_tache_rapport,
+    mettre_a_jour_taches_rapports,
     enregistrer_requete_monitoring,
     generer_rapport_classification,
     generer_rapport_drift,
+    calculer_drift_numpy,
     generer_rapport_complet,
+    arreter_pool_rapports,
+    resumer_rapport_drift,
+    resumer_rapport_classification,
     obtenir_statistiques_metriques,
     reinitialiser_metriques,
 )
@@ -27,20 +86,79 @@ from .monitoring import (
 __all__ = [
     "predictions_total",
     "prediction_latency",
+    "prediction_batch_size",
+    "prediction_request_batch_size",
+    "prediction_batch_latency",
+    "prediction_item_latency",
+    "prediction_queue_wait",
+    "prediction_cache_hits",
+    "prediction_cache_misses",
+    "prediction_cache_evictions",
+    "prediction_cache_size",
+    "prediction_log_rows",
+    "prediction_log_queue",
+    "log_records",
+    "log_queue",
     "prediction_errors",
     "prediction_confidence",
     "prediction_confidence_summary",
+    "prediction_confidence_distribution",
     "data_drift_detected",
     "data_drift_score",
+    "live_drift_statistic",
     "model_accuracy",
+    "model_reloads",
+    "model_load_duration",
+    "startup_duration",
+    "model_evaluations",
+    "live_accuracy",
+    "live_precision",
+    "live_recall",
+    "live_labelled_samples",
+    "feedback_labels",
+    "report_cache_hits",
+    "report_cache_misses",
+    "report_cache_evictions",
+    "report_cache_size",
+    "report_jobs",
+    "report_job_duration",
+    "report_job_wait",
+    "report_jobs_active",
+    "monitoring_runs",
+    "monitoring_run_duration",
+    "monitoring_last_success",
+    "monitoring_staleness",
     "monitoring_requests",
     "enregistrer_prediction",
+    "enregistrer_predictions_lot",
+    "enregistrer_micro_lot",
+    "enregistrer_cache_prediction",
+    "enregistrer_cache_rapport",
+    "enregistrer_journal",
+    "enregistrer_logs",
+    "ResumePredictions",
+    "resume_predictions",
+    "enregistrer_chargement_modele",
+    "enregistrer_demarrage",
+    "enregistrer_evaluation",
     "enregistrer_erreur",
     "mettre_a_jour_accuracy",
+    "enregistrer_feedback",
+    "mettre_a_jour_performance_live",
+    "mettre_a_jour_drift_live",
+    "mettre_a_jour_drift",
+    "enregistrer_surveillance",
+    "mettre_a_jour_fraicheur_surveillance",
+    "enregistrer_tache_rapport",
+    "mettre_a_jour_taches_rapports",
     "enregistrer_requete_monitoring",
     "generer_rapport_classification",
     "generer_rapport_drift",
+    "calculer_drift_numpy",
     "generer_rapport_complet",
+    "arreter_pool_rapports",
+    "resumer_rapport_drift",
+    "resumer_rapport_classification",
     "obtenir_statistiques_metriques",
     "reinitialiser_metriques",
 ]
\ No newline at end of file
@@ -3,16 +3,31 @@ Monitoring module for Titanic ML API.
 Contains custom Prometheus metrics and Evidently reports.
 """
 
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
+import numpy as np
 import pandas as pd
 from prometheus_client import Counter, Histogram, Gauge, Summary
-from evidently import Report
+from scipy.special import chdtrc, kolmogorov
+from evidently import BinaryClassification, DataDefinition, Dataset, Report
 from evidently.presets import ClassificationPreset, DataDriftPreset
 from evidently.legacy.pipeline.column_mapping import ColumnMapping
 from loguru import logger
 
+from api import config
+from api.cache_rapports import cache_rapports, cle_rapport
+from api.echantillons import echantillonner
+from api.reference import MAX_CATEGORIES, ProfilReference, comme_dataframe
+
 
 predictions_total = Counter(
     'ml_predictions_total',
@@ -27,6 +42,85 @@ prediction_latency = Histogram(
     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0)
 )
 
+prediction_batch_size = Histogram(
+    'ml_prediction_batch_size',
+    'Nombre de prédictions regroupées par appel au modèle (micro-batching)',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+
+prediction_request_batch_size = Histogram(
+    'ml_prediction_request_batch_size',
+    'Nombre de passagers par requête des endpoints de prédiction en lot',
+    ['endpoint'],
+    buckets=(1, 10, 100, 1000, 10000, 100000, 1000000)
+)
+
+prediction_batch_latency = Histogram(
+    'ml_prediction_batch_latency_seconds',
+    'Latence des appels au modèle des prédictions en lot (lot entier)',
+    ['model_version', 'endpoint'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+prediction_item_latency = Histogram(
+    'ml_prediction_item_latency_seconds',
+    'Latence amortie par prédiction des lots (latence du lot / taille du lot)',
+    ['model_version', 'endpoint'],
+    buckets=(0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01)
+)
+
+prediction_queue_wait = Histogram(
+    'ml_prediction_queue_wait_seconds',
+    'Temps d\'attente des prédictions dans la file du micro-batching',
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+prediction_cache_hits = Counter(
+    'ml_prediction_cache_hits_total',
+    'Nombre de prédictions servies par le cache'
+)
+
+prediction_cache_misses = Counter(
+    'ml_prediction_cache_misses_total',
+    'Nombre de prédictions absentes du cache'
+)
+
+prediction_cache_evictions = Counter(
+    'ml_prediction_cache_evictions_total',
+    'Nombre d\'entrées évincées du cache de prédictions',
+    ['reason']
+)
+
+prediction_cache_size = Gauge(
+    'ml_prediction_cache_size',
+    'Nombre d\'entrées dans le cache de prédictions',
+    multiprocess_mode='livesum'
+)
+
+prediction_log_rows = Counter(
+    'ml_prediction_log_rows_total',
+    'Nombre de prédictions traitées par le journal Parquet',
+    ['status']
+)
+
+prediction_log_queue = Gauge(
+    'ml_prediction_log_queue_rows',
+    'Nombre de prédictions en attente d\'écriture dans le journal Parquet',
+    multiprocess_mode='livesum'
+)
+
+log_records = Counter(
+    'ml_log_records_total',
+    'Nombre de lignes de log traitées par le sink asynchrone',
+    ['status']
+)
+
+log_queue = Gauge(
+    'ml_log_queue_records',
+    'Nombre de lignes de log en attente d\'écriture',
+    multiprocess_mode='livesum'
+)
+
 prediction_errors = Counter(
     'ml_prediction_errors_total',
     'Nombre total d\'erreurs lors des prédictions',
@@ -36,7 +130,8 @@ prediction_errors = Counter(
 prediction_confidence = Gauge(
     'ml_prediction_confidence',
     'Confiance moyenne des prédictions (probabilité)',
-    ['prediction_class']
+    ['prediction_class'],
+    multiprocess_mode='mostrecent'
 )
 
 prediction_confidence_summary = Summary(
@@ -45,6 +140,13 @@ prediction_confidence_summary = Summary(
     ['model_version']
 )
 
+prediction_confidence_distribution = Histogram(
+    'ml_prediction_confidence_distribution',
+    'Distribution de la confiance des prédictions par classe',
+    ['prediction_class'],
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99, 1.0)
+)
+
 data_drift_detected = Counter(
     'ml_data_drift_detected_total',
     'Nombre de fois où un drift de données a été détecté',
@@ -54,12 +156,154 @@ data_drift_detected = Counter(
 data_drift_score = Gauge(
     'ml_data_drift_score',
     'Score de drift global du dataset (0-1)',
+    multiprocess_mode='mostrecent'
+)
+
+live_drift_statistic = Gauge(
+    'ml_live_drift_statistic',
+    'Statistique de drift du trafic récent par rapport à la référence (psi, ks, js)',
+    ['feature_name', 'statistic'],
+    multiprocess_mode='mostrecent'
 )
 
 model_accuracy = Gauge(
     'ml_model_accuracy',
     'Précision actuelle du modèle',
-    ['model_version']
+    ['model_version'],
+    multiprocess_mode='mostrecent'
+)
+
+model_reloads = Counter(
+    'ml_model_reloads_total',
+    'Nombre de chargements du modèle',
+    ['status']
+)
+
+model_load_duration = Histogram(
+    'ml_model_load_duration_seconds',
+    'Durée de chargement et de préchauffage du modèle',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+startup_duration = Gauge(
+    'ml_startup_duration_seconds',
+    'Temps écoulé entre le lancement du processus et chaque étape du démarrage',
+    ['phase'],
+    multiprocess_mode='max'
+)
+
+model_evaluations = Counter(
+    'ml_model_evaluations_total',
+    'Nombre d\'évaluations du modèle sur le dataset de test',
+    ['source']
+)
+
+live_accuracy = Gauge(
+    'ml_live_accuracy',
+    'Précision du modèle sur les vrais labels reçus, par fenêtre glissante',
+    ['model_version', 'window'],
+    multiprocess_mode='mostrecent'
+)
+
+live_precision = Gauge(
+    'ml_live_precision',
+    'Précision (classe Survived) sur les vrais labels reçus, par fenêtre glissante',
+    ['model_version', 'window'],
+    multiprocess_mode='mostrecent'
+)
+
+live_recall = Gauge(
+    'ml_live_recall',
+    'Rappel (classe Survived) sur les vrais labels reçus, par fenêtre glissante',
+    ['model_version', 'window'],
+    multiprocess_mode='mostrecent'
+)
+
+live_labelled_samples = Gauge(
+    'ml_live_labelled_samples',
+    'Nombre de prédictions labellisées dans la fenêtre glissante',
+    ['model_version', 'window'],
+    multiprocess_mode='mostrecent'
+)
+
+feedback_labels = Counter(
+    'ml_feedback_labels_total',
+    'Nombre de vrais labels reçus',
+    ['status']
+)
+
+report_cache_hits = Counter(
+    'ml_report_cache_hits_total',
+    'Nombre de rapports Evidently servis par le cache',
+    ['report']
+)
+
+report_cache_misses = Counter(
+    'ml_report_cache_misses_total',
+    'Nombre de rapports Evidently absents du cache',
+    ['report']
+)
+
+report_cache_evictions = Counter(
+    'ml_report_cache_evictions_total',
+    'Nombre de rapports évincés du cache (LRU sur la taille)'
+)
+
+report_cache_size = Gauge(
+    'ml_report_cache_size_bytes',
+    'Taille du cache des rapports Evidently sur disque',
+    multiprocess_mode='mostrecent'
+)
+
+report_jobs = Counter(
+    'ml_report_jobs_total',
+    'Nombre de tâches de rapport soumises par l\'API, par issue',
+    ['report', 'status']
+)
+
+report_job_duration = Histogram(
+    'ml_report_job_duration_seconds',
+    'Durée d\'exécution des tâches de rapport',
+    ['report', 'status'],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+)
+
+report_job_wait = Histogram(
+    'ml_report_job_wait_seconds',
+    'Attente des tâches de rapport avant leur exécution',
+    ['report'],
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+report_jobs_active = Gauge(
+    'ml_report_jobs_active',
+    'Tâches de rapport en attente ou en cours',
+    multiprocess_mode='livesum'
+)
+
+monitoring_runs = Counter(
+    'ml_monitoring_runs_total',
+    'Nombre d\'exécutions de la surveillance planifiée (drift et classification)',
+    ['status']
+)
+
+monitoring_run_duration = Histogram(
+    'ml_monitoring_run_duration_seconds',
+    'Durée des exécutions de la surveillance planifiée',
+    ['status'],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+)
+
+monitoring_last_success = Gauge(
+    'ml_monitoring_last_success_timestamp_seconds',
+    'Horodatage de la dernière surveillance planifiée réussie',
+    multiprocess_mode='max'
+)
+
+monitoring_staleness = Gauge(
+    'ml_monitoring_staleness_seconds',
+    'Temps écoulé depuis la dernière surveillance planifiée réussie',
+    multiprocess_mode='mostrecent'
 )
 
 monitoring_requests = Counter(
@@ -69,6 +313,151 @@ monitoring_requests = Counter(
 )
 
 
+class ResumePredictions:
+    """
+    Aggregate of the predictions registered since the last summary log line.
+
+    Logging every prediction costs more than scoring it at high traffic:
+    `enregistrer_prediction` and `enregistrer_predictions_lot` only add to
+    this aggregate, and a summary (counts per class, model calls, latency
+    quantiles) is logged every `intervalle` seconds, by the first
+    registration past the interval. A share `taux_echantillonnage` of the
+    registrations is still logged one by one.
+
+    The latencies of an interval are kept in a reservoir of `capacite`
+    values, so memory is fixed whatever the traffic.
+
+    Attributes:
+        intervalle: Time between two summaries in seconds (0 disables them)
+        taux_echantillonnage: Share of registrations logged individually (0-1)
+        capacite: Number of latencies kept per interval for the quantiles
+    """
+
+    def __init__(self, intervalle: float, taux_echantillonnage: float = 0.0, capacite: int = 10000):
+        self.intervalle = intervalle
+        self.taux_echantillonnage = taux_echantillonnage
+        self.capacite = max(1, capacite)
+        self._latences = np.zeros(self.capacite)
+        self._verrou = threading.Lock()
+        self._reinitialiser(time.time())
+
+    def _reinitialiser(self, debut: float) -> None:
+        """
+        Start a new interval (the caller holds the lock or owns the object).
+        """
+        self._debut = debut
+        self._classes = {}
+        self._appels = 0
+
+    def echantillonner(self) -> bool:
+        """
+        Draw whether a registration is logged individually.
+        """
+        return self.taux_echantillonnage > 0 and random.random() < self.taux_echantillonnage
+
+    def ajouter(self, classes: Dict, latence: float, maintenant: Optional[float] = None) -> None:
+        """
+        Add a model call to the aggregate, and log the summary if it is due.
+
+        Args:
+            classes: Number of predictions of the call per predicted class
+            latence: Duration of the model call in seconds
+            maintenant: Time of the call, defaults to now
+        """
+        if self.intervalle <= 0:
+            return
+        maintenant = time.time() if maintenant is None else maintenant
+        resume = None
+        with self._verrou:
+            if self._appels < self.capacite:
+                self._latences[self._appels] = latence
+            else:
+                place = random.randrange(self._appels + 1)
+                if place < self.capacite:
+                    self._latences[place] = latence
+            self._appels += 1
+            for classe, nombre in classes.items():
+                self._classes[classe] = self._classes.get(classe, 0) + nombre
+            if maintenant - self._debut >= self.intervalle:
+                resume = self._resumer(maintenant)
+        if resume is not None:
+            self._journaliser(resume)
+
+    def _resumer(self, maintenant: float) -> Optional[Dict]:
+        """
+        Summarize the current interval and start a new one (the caller holds the lock).
+        """
+        if not self._appels:
+            self._reinitialiser(maintenant)
+            return None
+        latences = self._latences[:min(self._appels, self.capacite)]
+        p50, p95, p99 = np.percentile(latences, [50, 95, 99]).tolist()
+        resume = {
+            "start": self._debut,
+            "duration": maintenant - self._debut,
+            "predictions": sum(self._classes.values()),
+            "calls": self._appels,
+            "classes": dict(self._classes),
+            "latency_p50": p50,
+            "latency_p95": p95,
+            "latency_p99": p99,
+            "latency_max": float(latences.max()),
+        }
+        self._reinitialiser(maintenant)
+        return resume
+
+    def _journaliser(self, resume: Dict) -> None:
+        """
+        Log a summary as one line, with its values as structured fields.
+        """
+        logger.bind(resume=resume).info(
+            f"Résumé des prédictions sur {resume['duration']:.0f}s: "
+            f"{resume['predictions']} prédictions en {resume['calls']} appels, classes={resume['classes']}, "
+            f"latence p50={resume['latency_p50'] * 1000:.2f}ms p95={resume['latency_p95'] * 1000:.2f}ms "
+            f"p99={resume['latency_p99'] * 1000:.2f}ms"
+        )
+
+    def publier(self) -> Optional[Dict]:
+        """
+        Log the summary of the current interval now, e.g. at shutdown.
+
+        Returns:
+            Summary logged, or None if no prediction was registered
+        """
+        with self._verrou:
+            resume = self._resumer(time.time())
+        if resume is not None:
+            self._journaliser(resume)
+        return resume
+
+
+resume_predictions = ResumePredictions(config.LOG_SUMMARY_INTERVAL_S, config.LOG_PREDICTION_SAMPLE_RATE)
+
+
+def _observer_valeurs(enfant, valeurs: np.ndarray) -> None:
+    """
+    Observe the values of a batch in a histogram or summary child.
+
+    Every value goes through the public `observe`, so the samples are those
+    of one call per prediction whatever the prometheus_client version.
+    Non-finite values (e.g. NaN confidences) would turn the sum into NaN:
+    they are not observed, and counted as "non_finite_value" errors.
+
+    Args:
+        enfant: Histogram or Summary child (with its labels set)
+        valeurs: Observed values
+    """
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    finies = np.isfinite(valeurs)
+    if not finies.all():
+        prediction_errors.labels(error_type="non_finite_value").inc(int((~finies).sum()))
+        logger.warning(f"{int((~finies).sum())} valeurs non finies ignorées")
+        valeurs = valeurs[finies]
+    observer = enfant.observe
+    for valeur in valeurs.tolist():
+        observer(valeur)
+
+
 def enregistrer_prediction(
     model_version: str,
     prediction_class: str,
@@ -93,17 +482,226 @@ def enregistrer_prediction(
         prediction_latency.labels(model_version=model_version).observe(latency)
         prediction_confidence.labels(prediction_class=prediction_class).set(confidence)
         prediction_confidence_summary.labels(model_version=model_version).observe(confidence)
-
-        logger.info(
-            f"Prédiction enregistrée: version={model_version}, "
-            f"classe={prediction_class}, confiance={confidence:.3f}, "
-            f"latence={latency:.3f}s"
-        )
+        prediction_confidence_distribution.labels(prediction_class=prediction_class).observe(confidence)
+
+        resume_predictions.ajouter({prediction_class: 1}, latency)
+        if resume_predictions.echantillonner():
+            logger.info(
+                f"Prédiction enregistrée: version={model_version}, "
+                f"classe={prediction_class}, confiance={confidence:.3f}, "
+                f"latence={latency:.3f}s"
+            )
     except Exception as e:
         logger.error(f"Erreur lors de l'enregistrement de la prédiction: {e}")
         enregistrer_erreur("enregistrement_prediction")
 
 
+def enregistrer_predictions_lot(
+    model_version: str,
+    prediction_classes: np.ndarray,
+    confidences: np.ndarray,
+    latency: float,
+    endpoint: str = "predict_batch"
+) -> None:
+    """
+    Register a batch of predictions scored in one model call.
+
+    Counters are incremented once per class and the confidences are
+    observed one by one (see `_observer_valeurs`). The latency of the whole
+    batch is observed once in `ml_prediction_batch_latency_seconds`, apart
+    from the latency of single predictions, along with the batch size and
+    the latency per prediction (batch latency / batch size).
+
+    Args:
+        model_version: Model version used (e.g., "v1.0")
+        prediction_classes: Predicted class of each row (e.g., "survived", "died")
+        confidences: Prediction confidence of each row (0-1)
+        latency: Processing time of the whole batch in seconds
+        endpoint: Endpoint that scored the batch (e.g., "predict_many")
+    """
+    try:
+        prediction_classes = np.asarray(prediction_classes)
+        confidences = np.asarray(confidences, dtype=np.float64)
+        taille = len(confidences)
+        prediction_request_batch_size.labels(endpoint=endpoint).observe(taille)
+        if taille == 0:
+            return
+
+        classes, inverse, comptes = np.unique(prediction_classes, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        sommes = np.bincount(inverse, weights=confidences)
+        for indice, (prediction_class, compte, somme) in enumerate(zip(classes.tolist(), comptes.tolist(), sommes.tolist())):
+            predictions_total.labels(
+                model_version=model_version,
+                prediction_class=prediction_class
+            ).inc(compte)
+            prediction_confidence.labels(prediction_class=prediction_class).set(somme / compte)
+            _observer_valeurs(
+                prediction_confidence_distribution.labels(prediction_class=prediction_class),
+                confidences[inverse == indice]
+            )
+
+        _observer_valeurs(prediction_confidence_summary.labels(model_version=model_version), confidences)
+
+        prediction_batch_latency.labels(model_version=model_version, endpoint=endpoint).observe(latency)
+        prediction_item_latency.labels(model_version=model_version, endpoint=endpoint).observe(latency / taille)
+
+        resume_predictions.ajouter(dict(zip(classes.tolist(), comptes.tolist())), latency)
+        if resume_predictions.echantillonner():
+            logger.info(
+                f"Lot de prédictions enregistré: version={model_version}, endpoint={endpoint}, "
+                f"taille={taille}, latence={latency:.3f}s"
+            )
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement du lot de prédictions: {e}")
+        enregistrer_erreur("enregistrement_lot_predictions")
+
+
+def enregistrer_logs(evenement: str, nombre: int, en_attente: Optional[int] = None) -> None:
+    """
+    Register an event of the asynchronous log sink in Prometheus metrics.
+
+    The sink calls it from its writer thread, or when it drops a record:
+    nothing is logged here, even on error, so a full sink cannot loop.
+
+    Args:
+        evenement: "written", "dropped" (queue full) or "error" (write failed)
+        nombre: Number of log records concerned
+        en_attente: Number of records waiting to be written after the event (optional)
+    """
+    try:
+        log_records.labels(status=evenement).inc(nombre)
+        if en_attente is not None:
+            log_queue.set(en_attente)
+    except Exception:
+        pass
+
+
+def enregistrer_micro_lot(taille: int, attentes: list) -> None:
+    """
+    Register a micro-batch in Prometheus metrics.
+
+    Args:
+        taille: Number of predictions grouped in the model call
+        attentes: Time spent in the queue by each prediction, in seconds
+    """
+    try:
+        prediction_batch_size.observe(taille)
+        for attente in attentes:
+            prediction_queue_wait.observe(attente)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement du micro-lot: {e}")
+
+
+def enregistrer_cache_prediction(evenement: str, taille: Optional[int] = None) -> None:
+    """
+    Register a prediction cache event in Prometheus metrics.
+
+    Args:
+        evenement: "hit", "miss", "eviction" (LRU) or "invalidation" (model change)
+        taille: Number of entries in the cache after the event (optional)
+    """
+    try:
+        if evenement == "hit":
+            prediction_cache_hits.inc()
+        elif evenement == "miss":
+            prediction_cache_misses.inc()
+        elif evenement == "eviction":
+            prediction_cache_evictions.labels(reason="lru").inc()
+        elif evenement == "invalidation":
+            prediction_cache_evictions.labels(reason="model_change").inc()
+
+        if taille is not None:
+            prediction_cache_size.set(taille)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement de l'événement de cache: {e}")
+
+
+def enregistrer_cache_rapport(rapport: str, evenement: str, nombre: int = 1, taille: Optional[int] = None) -> None:
+    """
+    Register an event of the Evidently report cache in Prometheus metrics.
+
+    Args:
+        rapport: Report name ("drift" or "classification")
+        evenement: "hit", "miss" or "eviction"
+        nombre: Number of reports concerned
+        taille: Size of the cache in bytes after the event (optional)
+    """
+    try:
+        if evenement == "hit":
+            report_cache_hits.labels(report=rapport).inc(nombre)
+        elif evenement == "miss":
+            report_cache_misses.labels(report=rapport).inc(nombre)
+        elif evenement == "eviction":
+            report_cache_evictions.inc(nombre)
+
+        if taille is not None:
+            report_cache_size.set(taille)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement de l'événement du cache de rapports: {e}")
+
+
+def enregistrer_journal(evenement: str, nombre: int, en_attente: Optional[int] = None) -> None:
+    """
+    Register an event of the Parquet prediction log in Prometheus metrics.
+
+    Args:
+        evenement: "queued", "written", "dropped" (queue full) or "error" (write failed)
+        nombre: Number of predictions concerned
+        en_attente: Number of predictions waiting to be written after the event (optional)
+    """
+    try:
+        if evenement != "queued":
+            prediction_log_rows.labels(status=evenement).inc(nombre)
+        if en_attente is not None:
+            prediction_log_queue.set(en_attente)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement de l'événement du journal: {e}")
+
+
+def enregistrer_chargement_modele(statut: str, duree: float) -> None:
+    """
+    Register a model (re)load in Prometheus metrics.
+
+    Args:
+        statut: "success" or "error"
+        duree: Loading and warm-up time in seconds
+    """
+    try:
+        model_reloads.labels(status=statut).inc()
+        model_load_duration.observe(duree)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement du chargement du modèle: {e}")
+
+
+def enregistrer_demarrage(phase: str, duree: float) -> None:
+    """
+    Register the time taken to reach a startup phase.
+
+    Args:
+        phase: "serving" (requests accepted) or "ready" (evaluation done)
+        duree: Seconds since the process started
+    """
+    try:
+        startup_duration.labels(phase=phase).set(duree)
+        logger.info(f"Démarrage: phase {phase} atteinte en {duree:.2f}s")
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement du démarrage: {e}")
+
+
+def enregistrer_evaluation(source: str) -> None:
+    """
+    Register a model evaluation.
+
+    Args:
+        source: "computed" or "cached"
+    """
+    try:
+        model_evaluations.labels(source=source).inc()
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement de l'évaluation: {e}")
+
+
 def enregistrer_erreur(error_type: str) -> None:
     """
     Register an error in Prometheus metrics.
@@ -133,6 +731,121 @@ def mettre_a_jour_accuracy(model_version: str, accuracy: float) -> None:
         logger.error(f"Erreur lors de la mise à jour de l'accuracy: {e}")
 
 
+def enregistrer_feedback(associes: int, inconnus: int) -> None:
+    """
+    Register true labels received on the feedback endpoints.
+
+    Args:
+        associes: Number of labels joined to a stored prediction
+        inconnus: Number of labels whose prediction is unknown, expired or already labelled
+    """
+    try:
+        feedback_labels.labels(status="matched").inc(associes)
+        feedback_labels.labels(status="unknown").inc(inconnus)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement du feedback: {e}")
+
+
+def mettre_a_jour_performance_live(
+    model_version: str,
+    window: str,
+    samples: int,
+    accuracy: Optional[float],
+    precision: Optional[float],
+    recall: Optional[float]
+) -> None:
+    """
+    Update the live performance gauges of a sliding window.
+
+    Ratios that are undefined (None) leave their gauge unchanged.
+
+    Args:
+        model_version: Model version
+        window: Window label, e.g. "300s"
+        samples: Number of labelled predictions in the window
+        accuracy: Accuracy over the window (0-1)
+        precision: Precision of the "Survived" class (0-1)
+        recall: Recall of the "Survived" class (0-1)
+    """
+    try:
+        live_labelled_samples.labels(model_version=model_version, window=window).set(samples)
+        for gauge, valeur in ((live_accuracy, accuracy), (live_precision, precision), (live_recall, recall)):
+            if valeur is not None:
+                gauge.labels(model_version=model_version, window=window).set(valeur)
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour de la performance live: {e}")
+
+
+def enregistrer_tache_rapport(
+    rapport: str,
+    statut: str,
+    duree: Optional[float] = None,
+    attente: Optional[float] = None
+) -> None:
+    """
+    Register an event of a report job.
+
+    Args:
+        rapport: Report of the job ("drift", "classification" or "complet")
+        statut: "submitted", "deduplicated", "rejected", "success" or "error"
+        duree: Run time of a finished job in seconds (optional)
+        attente: Time the job waited for a worker in seconds (optional)
+    """
+    try:
+        report_jobs.labels(report=rapport, status=statut).inc()
+        if duree is not None:
+            report_job_duration.labels(report=rapport, status=statut).observe(duree)
+        if attente is not None:
+            report_job_wait.labels(report=rapport).observe(attente)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement de la tâche de rapport: {e}")
+
+
+def mettre_a_jour_taches_rapports(actives: int) -> None:
+    """
+    Update the number of pending or running report jobs.
+
+    Args:
+        actives: Jobs pending or running in this process
+    """
+    try:
+        report_jobs_active.set(actives)
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour des tâches de rapport: {e}")
+
+
+def enregistrer_surveillance(statut: str, duree: float, fin: Optional[float] = None) -> None:
+    """
+    Register a run of the scheduled monitoring.
+
+    Args:
+        statut: "success" or "error"
+        duree: Duration of the run in seconds
+        fin: End time of a successful run (seconds since the epoch, optional)
+    """
+    try:
+        monitoring_runs.labels(status=statut).inc()
+        monitoring_run_duration.labels(status=statut).observe(duree)
+        if fin is not None:
+            monitoring_last_success.set(fin)
+            monitoring_staleness.set(0)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement de la surveillance planifiée: {e}")
+
+
+def mettre_a_jour_fraicheur_surveillance(age: float) -> None:
+    """
+    Update the time elapsed since the last successful scheduled monitoring.
+
+    Args:
+        age: Seconds since the last successful run
+    """
+    try:
+        monitoring_staleness.set(age)
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour de la fraîcheur de la surveillance: {e}")
+
+
 def enregistrer_requete_monitoring(endpoint: str) -> None:
     """
     Register a request to a monitoring endpoint.
@@ -146,51 +859,92 @@ def enregistrer_requete_monitoring(endpoint: str) -> None:
         logger.error(f"Erreur lors de l'enregistrement de la requête monitoring: {e}")
 
 
+def mettre_a_jour_drift_live(
+    drift_score: float,
+    statistiques: Dict[str, Dict],
+    nouveaux_drifts: set
+) -> None:
+    """
+    Update the drift metrics with the statistics of the live traffic.
+
+    Args:
+        drift_score: Share of drifting variables (0-1)
+        statistiques: Statistics of each variable ("psi", "ks", "js")
+        nouveaux_drifts: Variables that started drifting since the last update
+    """
+    try:
+        data_drift_score.set(drift_score)
+        for feature_name, valeurs in statistiques.items():
+            for statistic in ("psi", "ks", "js"):
+                live_drift_statistic.labels(feature_name=feature_name, statistic=statistic).set(valeurs[statistic])
+        for feature_name in nouveaux_drifts:
+            data_drift_detected.labels(feature_name=feature_name).inc()
+        if nouveaux_drifts:
+            logger.warning(f"Drift détecté en direct: {sorted(nouveaux_drifts)}, score={drift_score:.3f}")
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour du drift en direct: {e}")
+
+
 def generer_rapport_classification(
     reference_data: pd.DataFrame,
     current_data: pd.DataFrame,
     target_column: str,
     prediction_column: str,
-    output_path: Optional[Path] = None
+    output_path: Optional[Path] = None,
+    taille_echantillon: Optional[int] = None
 ) -> Dict:
     """
     Generate a classification performance report with Evidently.
 
+    Identical reports are served from the report cache (see `api.cache_rapports`).
+
     Args:
-        reference_data: Reference data (training data)
+        reference_data: Reference data (training data), or its `ProfilReference`
         current_data: Current data (production data)
         target_column: Target column name
         prediction_column: Predictions column name
         output_path: Path to save HTML report (optional)
+        taille_echantillon: Maximum rows of each dataset, see `_echantillonner_entrees`
 
     Returns:
-        Dictionary containing report results
+        Dictionary containing report results, with the sampling of the
+        inputs in "echantillonnage"
     """
     try:
         logger.info("Génération du rapport de classification...")
-
-        reference_df = reference_data.copy()
-        current_df = current_data.copy()
-
-        reference_df = reference_df.rename(columns={target_column: 'target', prediction_column: 'prediction'})
-        current_df = current_df.rename(columns={target_column: 'target', prediction_column: 'prediction'})
-
-        report = Report(metrics=[
-            ClassificationPreset(),
-        ])
-
-        report_result = report.run(
-            reference_data=reference_df,
-            current_data=current_df
+        preset = ClassificationPreset()
+        reference_data, current_data, echantillonnage = _echantillonner_entrees(reference_data, current_data, taille_echantillon)
+
+        def executer():
+            # rename returns new frames: the inputs are left untouched without copying them first
+            reference_df = comme_dataframe(reference_data).rename(columns={target_column: 'target', prediction_column: 'prediction'})
+            current_df = current_data.rename(columns={target_column: 'target', prediction_column: 'prediction'})
+            # Profiles store every column as float64: align the labels on the current data
+            reference_df = reference_df.astype({
+                colonne: current_df[colonne].dtype for colonne in ('target', 'prediction')
+                if reference_df[colonne].dtype != current_df[colonne].dtype
+            })
+
+            definition = DataDefinition(
+                classification=[BinaryClassification(target='target', prediction_labels='prediction')],
+                numerical_columns=[c for c in current_df.columns if c not in ('target', 'prediction')]
+            )
+
+            return Report(metrics=[preset]).run(
+                reference_data=Dataset.from_pandas(reference_df, data_definition=definition),
+                current_data=Dataset.from_pandas(current_df, data_definition=definition)
+            )
+
+        resultats = _generer_avec_cache(
+            "classification",
+            preset,
+            reference_data,
+            current_data,
+            {"target_column": target_column, "prediction_column": prediction_column},
+            output_path,
+            executer
         )
-
-        if output_path:
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            report_result.save_html(str(output_path))
-            logger.info(f"Rapport de classification sauvegardé: {output_path}")
-
-        resultats = report_result.as_dict() if hasattr(report_result, 'as_dict') else {}
+        resultats["echantillonnage"] = echantillonnage
 
         logger.info("Rapport de classification généré avec succès")
         return resultats
@@ -201,43 +955,349 @@ def generer_rapport_classification(
         raise
 
 
-def generer_rapport_drift(
-    reference_data: pd.DataFrame,
+def _echantillonner_entrees(reference_data, current_data: pd.DataFrame, taille: Optional[int]) -> tuple:
+    """
+    Sample the inputs of a report down to a row budget.
+
+    The statistical answer of the reports barely changes past a few tens
+    of thousands of rows, while their cost grows with the data: each
+    dataset larger than the budget is replaced by a uniform sample of it
+    (see `api.echantillons.echantillonner`).
+
+    Args:
+        reference_data: Reference data, or its `ProfilReference`
+        current_data: Current data
+        taille: Maximum rows of each dataset, `REPORT_SAMPLE_SIZE` if None
+            (0 keeps every row)
+
+    Returns:
+        Tuple (reference data, current data, description of the sampling
+        with "reference" and "current")
+    """
+    taille = config.REPORT_SAMPLE_SIZE if taille is None else taille
+    reference_data, reference = echantillonner(reference_data, taille)
+    current_data, courant = echantillonner(current_data, taille)
+    if reference["fraction"] < 1 or courant["fraction"] < 1:
+        logger.info(
+            f"Rapport sur échantillons: référence {reference['sampled']}/{reference['rows']}, "
+            f"courant {courant['sampled']}/{courant['rows']}"
+        )
+    return reference_data, current_data, {"reference": reference, "current": courant}
+
+
+def _resultats_rapport(report_result) -> Dict:
+    """
+    Get the results of an Evidently report as a dictionary.
+
+    Args:
+        report_result: Result of `Report.run`
+
+    Returns:
+        Dictionary with the "metrics" of the report
+    """
+    if hasattr(report_result, 'as_dict'):
+        return report_result.as_dict()
+    if hasattr(report_result, 'dict'):
+        return report_result.dict()
+    return {}
+
+
+def _generer_avec_cache(
+    rapport: str,
+    preset,
+    reference_data,
     current_data: pd.DataFrame,
-    output_path: Optional[Path] = None
+    parametres: Dict,
+    output_path: Optional[Path],
+    executer
 ) -> Dict:
     """
-    Generate a drift detection report with Evidently.
+    Get the results of a report from the report cache, or run it and cache them.
+
+    A cached report only answers a request for an HTML file if its HTML
+    was cached too; the file is then copied to `output_path`.
 
     Args:
-        reference_data: Reference data (training data)
-        current_data: Current data (production data)
+        rapport: Report name ("drift" or "classification")
+        preset: Evidently preset of the report
+        reference_data: Reference data, or its `ProfilReference`
+        current_data: Current data
+        parametres: Other arguments changing the results
         output_path: Path to save HTML report (optional)
+        executer: Function running the report and returning its result
 
     Returns:
         Dictionary containing report results
     """
-    try:
-        logger.info("Génération du rapport de drift...")
+    cle = None
+    if cache_rapports is not None:
+        cle = cle_rapport(rapport, preset, reference_data, current_data, parametres)
+
+    if cle is not None:
+        entree = cache_rapports.lire(cle, avec_html=bool(output_path))
+        if entree is not None:
+            resultats, html = entree
+            enregistrer_cache_rapport(rapport, "hit")
+            if output_path:
+                output_path = Path(output_path)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(html, output_path)
+                logger.info(f"Rapport {rapport} sauvegardé depuis le cache: {output_path}")
+            return resultats
+        enregistrer_cache_rapport(rapport, "miss")
+
+    report_result = executer()
+
+    if output_path:
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        report_result.save_html(str(output_path))
+        logger.info(f"Rapport {rapport} sauvegardé: {output_path}")
+
+    resultats = _resultats_rapport(report_result)
+
+    if cle is not None:
+        evinces = cache_rapports.ecrire(cle, resultats, Path(output_path) if output_path else None)
+        enregistrer_cache_rapport(rapport, "eviction", evinces, cache_rapports.taille())
+    return resultats
+
+
+# Drift tests of the NumPy engine: method -> (name in the results, default threshold)
+METHODES_DRIFT = {
+    "ks": ("K-S p_value", 0.05),
+    "chi2": ("chi-square p_value", 0.05),
+    "wasserstein": ("Wasserstein distance (normed)", 0.1),
+    "psi": ("PSI", 0.1),
+    "jensenshannon": ("Jensen-Shannon distance", 0.1),
+}
+
+# Reference size above which the default tests switch from KS and chi-square
+# to Wasserstein and Jensen-Shannon, as in Evidently: p-values of large
+# samples flag even negligible shifts
+TAILLE_TESTS_STATISTIQUES = 1000
+
+# Quantile bins of the numeric columns in PSI and chi-square
+NB_BINS_DRIFT = 10
+
+# Smoothing of empty bins in PSI
+EPSILON_PSI = 1e-4
+
+
+def _valeurs_triees(donnees, colonne: str) -> np.ndarray:
+    """
+    Get the sorted values of a column, without missing values.
 
-        report = Report(metrics=[
-            DataDriftPreset(),
-        ])
+    A profile already stores them sorted; a DataFrame column is sorted here.
+    """
+    if isinstance(donnees, ProfilReference):
+        return donnees.valeurs_triees[colonne]
+    valeurs = donnees[colonne].to_numpy(dtype=np.float64)
+    return np.sort(valeurs[~np.isnan(valeurs)])
 
-        report_result = report.run(
-            reference_data=reference_data,
-            current_data=current_data
-        )
 
-        if output_path:
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            report_result.save_html(str(output_path))
-            logger.info(f"Rapport de drift sauvegardé: {output_path}")
+def _statistiques_drift(reference: np.ndarray, courant: np.ndarray) -> Dict:
+    """
+    Compare two sorted samples of a numeric column.
 
-        resultats = report_result.as_dict() if hasattr(report_result, 'as_dict') else {}
+    KS and Wasserstein are computed exactly by merging the two sorted
+    samples: each sample's cumulative distribution at every distinct value
+    is one `searchsorted`. PSI, Jensen-Shannon and chi-square compare histograms: one bin per
+    value for discrete columns (at most `MAX_CATEGORIES` distinct reference
+    values), reference quantile bins otherwise.
 
-        _mettre_a_jour_metriques_drift(resultats)
+    Args:
+        reference: Sorted reference values
+        courant: Sorted current values
+
+    Returns:
+        Dictionary with "ks", "ks_p_value", "wasserstein" (normed by the
+        reference standard deviation), "psi", "jensenshannon", "chi2",
+        "chi2_p_value" and "discrete"
+    """
+    n, m = len(reference), len(courant)
+    valeurs = np.union1d(reference, courant)
+    cdf_reference = np.searchsorted(reference, valeurs, side="right") / n
+    cdf_courant = np.searchsorted(courant, valeurs, side="right") / m
+    ecarts = np.abs(cdf_reference - cdf_courant)
+
+    ks = float(ecarts.max())
+    en = np.sqrt(n * m / (n + m))
+    ks_p_value = float(kolmogorov((en + 0.12 + 0.11 / en) * ks))
+
+    ecart_type = float(reference.std())
+    wasserstein = float(np.sum(ecarts[:-1] * np.diff(valeurs)))
+    wasserstein = wasserstein / ecart_type if ecart_type > 0 else wasserstein
+
+    categories = np.unique(reference)
+    discret = len(categories) <= MAX_CATEGORIES
+    if discret:
+        bornes = (categories[:-1] + categories[1:]) / 2
+    else:
+        bornes = np.unique(reference[(np.arange(1, NB_BINS_DRIFT) * n) // NB_BINS_DRIFT])
+    comptes_reference = np.bincount(np.searchsorted(bornes, reference, side="right"), minlength=len(bornes) + 1)
+    comptes_courant = np.bincount(np.searchsorted(bornes, courant, side="right"), minlength=len(bornes) + 1)
+
+    p = np.clip(comptes_reference / n, EPSILON_PSI, None)
+    q = np.clip(comptes_courant / m, EPSILON_PSI, None)
+    psi = float(np.sum((q - p) * np.log(q / p)))
+
+    p, q = comptes_reference / n, comptes_courant / m
+    milieu = (p + q) / 2
+    divergence = np.sum(p[p > 0] * np.log(p[p > 0] / milieu[p > 0])) + np.sum(q[q > 0] * np.log(q[q > 0] / milieu[q > 0]))
+    jensenshannon = float(np.sqrt(max(0.0, divergence / 2)))
+
+    attendus = comptes_reference / n * m
+    presents = attendus > 0
+    chi2 = float(np.sum((comptes_courant[presents] - attendus[presents]) ** 2 / attendus[presents]))
+    chi2_p_value = float(chdtrc(max(1, presents.sum() - 1), chi2))
+
+    return {
+        "ks": ks,
+        "ks_p_value": ks_p_value,
+        "wasserstein": wasserstein,
+        "psi": psi,
+        "jensenshannon": jensenshannon,
+        "chi2": chi2,
+        "chi2_p_value": chi2_p_value,
+        "discrete": bool(discret),
+    }
+
+
+def calculer_drift_numpy(
+    reference_data,
+    current_data: pd.DataFrame,
+    colonnes: Optional[list] = None,
+    methode: Optional[str] = None,
+    seuil: Optional[float] = None,
+    drift_share: float = 0.5
+) -> Dict:
+    """
+    Compute the drift of each column with vectorized NumPy, without Evidently.
+
+    Every column gets the four statistics of `_statistiques_drift`; its
+    drift is decided by `methode` ("ks", "chi2", "wasserstein", "psi" or
+    "jensenshannon"). By default it picks the test as Evidently does: KS for
+    numeric columns and chi-square for discrete ones, or Wasserstein and
+    Jensen-Shannon when the reference has more than
+    `TAILLE_TESTS_STATISTIQUES` rows. The results have the shape of an Evidently DataDriftPreset
+    report (DriftedColumnsCount and one ValueDrift per column), so they can
+    be passed to `resumer_rapport_drift` and `_mettre_a_jour_metriques_drift`.
+
+    Args:
+        reference_data: Reference data, or its `ProfilReference` (whose
+            sorted values are used as stored)
+        current_data: Current data
+        colonnes: Columns to compare, by default the numeric columns present
+            in both datasets (e.g. Sex, Fare and prediction)
+        methode: Test deciding the drift of every column (optional)
+        seuil: Threshold of that test, defaults to the one of `METHODES_DRIFT`
+        drift_share: Share of drifting columns from which the dataset drifts
+
+    Returns:
+        Dictionary with "metrics" (Evidently format) and "engine": "numpy"
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if methode is not None and methode not in METHODES_DRIFT:
+        raise ValueError(f"Méthode de drift inconnue: {methode} (attendu: {list(METHODES_DRIFT)})")
+    if colonnes is None:
+        disponibles = reference_data.colonnes if isinstance(reference_data, ProfilReference) else reference_data.columns
+        numeriques = current_data.select_dtypes("number").columns
+        colonnes = [c for c in numeriques if c in disponibles]
+
+    metriques = []
+    en_drift = 0
+    for colonne in colonnes:
+        reference = _valeurs_triees(reference_data, colonne)
+        statistiques = _statistiques_drift(reference, _valeurs_triees(current_data, colonne))
+        if methode is not None:
+            methode_colonne = methode
+        elif len(reference) <= TAILLE_TESTS_STATISTIQUES:
+            methode_colonne = "chi2" if statistiques["discrete"] else "ks"
+        else:
+            methode_colonne = "jensenshannon" if statistiques["discrete"] else "wasserstein"
+        nom, seuil_defaut = METHODES_DRIFT[methode_colonne]
+        seuil_colonne = seuil if seuil is not None else seuil_defaut
+        valeur = statistiques[f"{methode_colonne}_p_value"] if "p_value" in nom else statistiques[methode_colonne]
+        en_drift += valeur < seuil_colonne if "p_value" in nom else valeur >= seuil_colonne
+        metriques.append({
+            "metric_name": f"ValueDrift(column={colonne},method={nom},threshold={seuil_colonne})",
+            "config": {"type": "evidently:metric_v2:ValueDrift", "column": colonne, "method": nom, "threshold": seuil_colonne},
+            "value": valeur,
+            "statistics": statistiques,
+        })
+
+    part = en_drift / len(colonnes) if colonnes else 0.0
+    metriques.insert(0, {
+        "metric_name": f"DriftedColumnsCount(drift_share={drift_share})",
+        "config": {"type": "evidently:metric_v2:DriftedColumnsCount", "drift_share": drift_share},
+        "value": {"count": float(en_drift), "share": part},
+    })
+    return {"metrics": metriques, "engine": "numpy"}
+
+
+def generer_rapport_drift(
+    reference_data: pd.DataFrame,
+    current_data: pd.DataFrame,
+    output_path: Optional[Path] = None,
+    mettre_a_jour_metriques: bool = True,
+    moteur: str = "evidently",
+    taille_echantillon: Optional[int] = None
+) -> Dict:
+    """
+    Generate a drift detection report with Evidently or the NumPy engine.
+
+    Identical Evidently reports are served from the report cache (see
+    `api.cache_rapports`). The NumPy engine (`calculer_drift_numpy`) returns
+    results of the same shape much faster on large windows, but no HTML.
+
+    Args:
+        reference_data: Reference data (training data), or its `ProfilReference`
+        current_data: Current data (production data)
+        output_path: Path to save HTML report (optional, Evidently only)
+        mettre_a_jour_metriques: Update the drift metrics with the results
+            (disabled when the report runs outside the API process)
+        moteur: "evidently" or "numpy"
+        taille_echantillon: Maximum rows of each dataset, see `_echantillonner_entrees`
+
+    Returns:
+        Dictionary containing report results, with the sampling of the
+        inputs in "echantillonnage"
+    """
+    try:
+        logger.info(f"Génération du rapport de drift ({moteur})...")
+        reference_data, current_data, echantillonnage = _echantillonner_entrees(reference_data, current_data, taille_echantillon)
+
+        if moteur == "numpy":
+            if output_path:
+                logger.warning("Le moteur de drift numpy ne produit pas de rapport HTML")
+            resultats = calculer_drift_numpy(reference_data, current_data)
+            resultats["echantillonnage"] = echantillonnage
+            if mettre_a_jour_metriques:
+                _mettre_a_jour_metriques_drift(resultats)
+            logger.info("Rapport de drift généré avec succès")
+            return resultats
+        if moteur != "evidently":
+            raise ValueError(f"Moteur de drift inconnu: {moteur} (attendu: evidently ou numpy)")
+
+        preset = DataDriftPreset()
+        resultats = _generer_avec_cache(
+            "drift",
+            preset,
+            reference_data,
+            current_data,
+            {},
+            output_path,
+            lambda: Report(metrics=[preset]).run(
+                reference_data=comme_dataframe(reference_data),
+                current_data=current_data
+            )
+        )
+        resultats["echantillonnage"] = echantillonnage
+
+        if mettre_a_jour_metriques:
+            _mettre_a_jour_metriques_drift(resultats)
 
         logger.info("Rapport de drift généré avec succès")
         return resultats
@@ -248,6 +1308,81 @@ def generer_rapport_drift(
         raise
 
 
+def resumer_rapport_drift(resultats_drift: Dict) -> Dict:
+    """
+    Summarize the results of a drift report.
+
+    Both the legacy format (DatasetDriftMetric) and the current one
+    (DriftedColumnsCount and one ValueDrift per column) are understood. For
+    a ValueDrift, a p-value test detects drift below its threshold and a
+    distance at or above it.
+
+    Args:
+        resultats_drift: Dictionary containing drift report results
+
+    Returns:
+        Dictionary with "drift_score" (share of drifting columns),
+        "drift_detected" and "columns" (value and drift of each column);
+        empty if the results hold no drift metric
+    """
+    resume = {}
+    colonnes = {}
+    for metric in resultats_drift.get('metrics', []):
+        if metric.get('metric') == 'DatasetDriftMetric':
+            result = metric.get('result', {})
+            resume["drift_score"] = result.get('dataset_drift_score', 0)
+            resume["drift_detected"] = result.get('drift_detected', False)
+            for feature_name, feature_drift in result.get('drift_by_columns', {}).items():
+                colonnes[feature_name] = {"drift_detected": feature_drift.get('drift_detected', False)}
+            break
+
+        configuration = metric.get('config', {})
+        type_metrique = configuration.get('type', '')
+        if type_metrique.endswith(':DriftedColumnsCount'):
+            resume["drift_score"] = metric['value']['share']
+            resume["drift_detected"] = metric['value']['share'] >= configuration.get('drift_share', 0.5)
+        elif type_metrique.endswith(':ValueDrift'):
+            methode = configuration.get('method', '')
+            seuil = configuration.get('threshold')
+            valeur = metric['value']
+            if seuil is None:
+                detecte = False
+            elif 'p_value' in methode:
+                detecte = valeur < seuil
+            else:
+                detecte = valeur >= seuil
+            colonnes[configuration['column']] = {
+                "method": methode,
+                "value": valeur,
+                "threshold": seuil,
+                "drift_detected": bool(detecte),
+            }
+
+    if resume:
+        resume["columns"] = colonnes
+    return resume
+
+
+def resumer_rapport_classification(resultats_classification: Dict) -> Dict:
+    """
+    Get the scores of a classification report.
+
+    Args:
+        resultats_classification: Dictionary containing classification report results
+
+    Returns:
+        Dictionary with the "accuracy", "precision", "recall" and "f1" of
+        the current data, for those present in the results
+    """
+    noms = {'Accuracy': 'accuracy', 'Precision': 'precision', 'Recall': 'recall', 'F1Score': 'f1'}
+    scores = {}
+    for metric in resultats_classification.get('metrics', []):
+        nom = noms.get(metric.get('metric_name', '').split('(')[0])
+        if nom is not None and isinstance(metric.get('value'), (int, float)):
+            scores[nom] = float(metric['value'])
+    return scores
+
+
 def _mettre_a_jour_metriques_drift(resultats_drift: Dict) -> None:
     """
     Update Prometheus metrics with drift results.
@@ -256,86 +1391,238 @@ def _mettre_a_jour_metriques_drift(resultats_drift: Dict) -> None:
         resultats_drift: Dictionary containing drift report results
     """
     try:
-        metrics = resultats_drift.get('metrics', [])
+        mettre_a_jour_drift(resumer_rapport_drift(resultats_drift))
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour des métriques de drift: {e}")
 
-        for metric in metrics:
-            if metric.get('metric') == 'DatasetDriftMetric':
-                result = metric.get('result', {})
-                drift_score = result.get('dataset_drift_score', 0)
-                drift_detected = result.get('drift_detected', False)
 
-                data_drift_score.set(drift_score)
+def mettre_a_jour_drift(resume: Dict) -> None:
+    """
+    Update Prometheus metrics with the summary of a drift report.
 
-                drift_by_columns = result.get('drift_by_columns', {})
-                for feature_name, feature_drift in drift_by_columns.items():
-                    if feature_drift.get('drift_detected', False):
-                        data_drift_detected.labels(feature_name=feature_name).inc()
+    Args:
+        resume: Summary returned by `resumer_rapport_drift` (nothing is
+            updated if it is empty)
+    """
+    try:
+        if not resume:
+            return
 
-                logger.info(
-                    f"Métriques de drift mises à jour: "
-                    f"score={drift_score:.3f}, détecté={drift_detected}"
-                )
-                break
+        data_drift_score.set(resume["drift_score"])
+        for feature_name, feature_drift in resume["columns"].items():
+            if feature_drift["drift_detected"]:
+                data_drift_detected.labels(feature_name=feature_name).inc()
+
+        logger.info(
+            f"Métriques de drift mises à jour: "
+            f"score={resume['drift_score']:.3f}, détecté={resume['drift_detected']}"
+        )
 
     except Exception as e:
         logger.error(f"Erreur lors de la mise à jour des métriques de drift: {e}")
 
 
+_pool_rapports = None
+_pid_pool_rapports = None
+_verrou_pool_rapports = threading.Lock()
+
+
+def _obtenir_pool_rapports() -> ProcessPoolExecutor:
+    """
+    Get the report process pool, creating it on first use in this process.
+
+    The processes are started with "spawn" and kept between calls, so
+    Evidently is imported once per process rather than once per report.
+
+    Returns:
+        Process pool sized by `REPORT_WORKERS`
+    """
+    global _pool_rapports, _pid_pool_rapports
+    if _pid_pool_rapports != os.getpid():
+        with _verrou_pool_rapports:
+            if _pid_pool_rapports != os.getpid():
+                _pool_rapports = ProcessPoolExecutor(
+                    max_workers=config.REPORT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                _pid_pool_rapports = os.getpid()
+                logger.info(f"Pool de rapports créé: {config.REPORT_WORKERS} processus")
+    return _pool_rapports
+
+
+def arreter_pool_rapports() -> None:
+    """
+    Shut down the report process pool.
+    """
+    global _pool_rapports, _pid_pool_rapports
+    with _verrou_pool_rapports:
+        if _pool_rapports is not None and _pid_pool_rapports == os.getpid():
+            _pool_rapports.shutdown(wait=True)
+        _pool_rapports = None
+        _pid_pool_rapports = None
+
+
+def _partager(donnees, dossier: Path) -> Dict:
+    """
+    Write report input data once so every report process can map it.
+
+    A `ProfilReference` is already on disk and is passed by directory. A
+    DataFrame is written as one .npy file per column, memory-mapped by the
+    readers; columns of Python objects (e.g. strings) are pickled instead.
+
+    Args:
+        donnees: DataFrame or `ProfilReference`
+        dossier: Empty directory receiving the columns
+
+    Returns:
+        Picklable description read back by `_charger_partage`
+    """
+    if isinstance(donnees, ProfilReference):
+        return {"profil": str(donnees.dossier), "meta": donnees.meta}
+    dossier.mkdir(parents=True, exist_ok=True)
+    colonnes = []
+    for numero, (nom, serie) in enumerate(donnees.items()):
+        valeurs = serie.to_numpy()
+        fichier = dossier / f"{numero}.npy"
+        objets = valeurs.dtype == object
+        np.save(fichier, valeurs, allow_pickle=objets)
+        colonnes.append((nom, str(fichier), objets))
+    return {"colonnes": colonnes}
+
+
+def _charger_partage(partage: Dict):
+    """
+    Read back data written by `_partager`.
+
+    Returns:
+        `ProfilReference` or DataFrame over the memory-mapped columns
+    """
+    if "profil" in partage:
+        return ProfilReference(Path(partage["profil"]), partage["meta"])
+    return pd.DataFrame({
+        nom: np.load(fichier, allow_pickle=True) if objets else np.load(fichier, mmap_mode="r")
+        for nom, fichier, objets in partage["colonnes"]
+    }, copy=False)
+
+
+def _executer_rapport(fonction, reference: Dict, courant: Dict, parametres: Dict) -> tuple:
+    """
+    Run one report in a pool process on shared input data.
+
+    Returns:
+        Tuple (report results, duration of the report in seconds)
+    """
+    debut = time.perf_counter()
+    resultats = fonction(
+        reference_data=_charger_partage(reference),
+        current_data=_charger_partage(courant),
+        **parametres
+    )
+    return resultats, time.perf_counter() - debut
+
+
 def generer_rapport_complet(
     reference_data: pd.DataFrame,
     current_data: pd.DataFrame,
     target_column: str,
     prediction_column: str,
-    report_dir: Path = Path("/app/reports")
+    report_dir: Path = Path("/app/reports"),
+    taille_echantillon: Optional[int] = None,
+    en_parallele: bool = True
 ) -> Dict:
     """
     Generate a complete report including classification and drift.
 
+    The reports run concurrently in the report process pool
+    (`REPORT_WORKERS` processes, sequentially in this process if 1). The
+    input data is written once to a temporary directory and memory-mapped by
+    every report, rather than copied into each of them. The inputs are
+    sampled down to `taille_echantillon` rows once, before the reports.
+
     Args:
-        reference_data: Reference data
+        reference_data: Reference data, or its `ProfilReference`
         current_data: Current data
         target_column: Target column name
         prediction_column: Predictions column name
         report_dir: Directory to save reports
+        taille_echantillon: Maximum rows of each dataset, see `_echantillonner_entrees`
+        en_parallele: Use the report process pool (disabled when the
+            caller already runs in a pool process)
 
     Returns:
-        Dictionary containing all results
+        Dictionary containing all results, with the duration of each report
+        and of the whole generation in "durees" (seconds) and the sampling
+        of the inputs in "echantillonnage"
     """
     try:
         logger.info("Génération du rapport complet...")
+        debut = time.perf_counter()
+        reference_data, current_data, echantillonnage = _echantillonner_entrees(reference_data, current_data, taille_echantillon)
 
         report_dir = Path(report_dir)
         report_dir.mkdir(parents=True, exist_ok=True)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        classification_path = report_dir / f"classification_report_{timestamp}.html"
-        resultats_classification = generer_rapport_classification(
-            reference_data=reference_data,
-            current_data=current_data,
-            target_column=target_column,
-            prediction_column=prediction_column,
-            output_path=classification_path
-        )
+        fichiers = {
+            "classification": report_dir / f"classification_report_{timestamp}.html",
+            "drift": report_dir / f"drift_report_{timestamp}.html",
+        }
+        # Report name -> (function, arguments besides the data); the drift
+        # metrics are updated here, from the results of the pool process
+        rapports = {
+            "classification": (generer_rapport_classification, {
+                "target_column": target_column,
+                "prediction_column": prediction_column,
+                "output_path": fichiers["classification"],
+                "taille_echantillon": 0,
+            }),
+            "drift": (generer_rapport_drift, {
+                "output_path": fichiers["drift"],
+                "mettre_a_jour_metriques": False,
+                "taille_echantillon": 0,
+            }),
+        }
 
-        drift_path = report_dir / f"drift_report_{timestamp}.html"
-        resultats_drift = generer_rapport_drift(
-            reference_data=reference_data,
-            current_data=current_data,
-            output_path=drift_path
-        )
+        resultats = {}
+        durees = {}
+        if config.REPORT_WORKERS <= 1 or not en_parallele:
+            for nom, (fonction, parametres) in rapports.items():
+                debut_rapport = time.perf_counter()
+                resultats[nom] = fonction(reference_data=reference_data, current_data=current_data, **parametres)
+                durees[nom] = time.perf_counter() - debut_rapport
+        else:
+            dossier = Path(tempfile.mkdtemp(prefix="rapport_complet_"))
+            try:
+                reference = _partager(reference_data, dossier / "reference")
+                courant = _partager(current_data, dossier / "current")
+                pool = _obtenir_pool_rapports()
+                taches = {
+                    nom: pool.submit(_executer_rapport, fonction, reference, courant, parametres)
+                    for nom, (fonction, parametres) in rapports.items()
+                }
+                for nom, tache in taches.items():
+                    resultats[nom], durees[nom] = tache.result()
+            finally:
+                shutil.rmtree(dossier, ignore_errors=True)
+
+        for nom in rapports:
+            resultats[nom]["echantillonnage"] = echantillonnage
+        _mettre_a_jour_metriques_drift(resultats["drift"])
+        durees["total"] = time.perf_counter() - debut
 
         rapport_complet = {
             "timestamp": timestamp,
-            "classification": resultats_classification,
-            "drift": resultats_drift,
-            "fichiers": {
-                "classification": str(classification_path),
-                "drift": str(drift_path)
-            }
+            **resultats,
+            "fichiers": {nom: str(chemin) for nom, chemin in fichiers.items()},
+            "durees": durees,
+            "echantillonnage": echantillonnage
         }
 
-        logger.info("Rapport complet généré avec succès")
+        logger.info(
+            "Rapport complet généré avec succès en "
+            + ", ".join(f"{nom}={duree:.2f}s" for nom, duree in durees.items())
+        )
         return rapport_complet
 
     except Exception as e:
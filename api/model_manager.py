@@ -0,0 +1,267 @@
+"""
+Model manager with hot reload.
+Loads the model file into an inference engine, warms it and swaps it
+atomically with the engine being served, so a new model can be deployed
+without restarting the API or dropping in-flight requests.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import joblib
+import numpy as np
+from loguru import logger
+
+from api.metrics import enregistrer_chargement_modele
+
+
+def calculer_empreinte(chemin: Path) -> str:
+    """
+    Compute the SHA-256 hash of a file's content.
+
+    Args:
+        chemin: Path of the file
+
+    Returns:
+        Hexadecimal digest
+    """
+    empreinte = hashlib.sha256()
+    with open(chemin, "rb") as fichier:
+        for bloc in iter(lambda: fichier.read(1 << 20), b""):
+            empreinte.update(bloc)
+    return empreinte.hexdigest()
+
+
+def calculer_version_modele(chemin: Path, empreinte: Optional[str] = None) -> str:
+    """
+    Compute the version label of a model file.
+
+    The version is read from a sidecar JSON file next to the model
+    (`model.json` for `model.pkl`, key "version") when it exists, otherwise
+    derived from the content hash of the model file.
+
+    Args:
+        chemin: Path of the model file
+        empreinte: Content hash of the model file, computed if not given
+
+    Returns:
+        Version label, e.g. "v1.2" or "sha256-3f1a9c0b2d4e"
+    """
+    sidecar = chemin.with_suffix(".json")
+    if sidecar.exists():
+        try:
+            version = json.loads(sidecar.read_text()).get("version")
+            if version:
+                return str(version)
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Fichier de version illisible {sidecar}: {e}")
+
+    if empreinte is None:
+        empreinte = calculer_empreinte(chemin)
+    return f"sha256-{empreinte[:12]}"
+
+
+def _signature_fichiers(chemin: Path) -> tuple:
+    """
+    Summarize the state of the model file and its sidecar for change detection.
+
+    Returns:
+        Tuple of (mtime_ns, size) pairs, None for a missing file
+    """
+    signature = []
+    for fichier in (chemin, chemin.with_suffix(".json")):
+        try:
+            etat = fichier.stat()
+            signature.append((etat.st_mtime_ns, etat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class ModelManager:
+    """
+    Serve the current inference engine and replace it on reload.
+
+    Readers take `manager.engine` once per request and use that engine for
+    the whole request; a reload builds and warms the new engine on the side
+    and then replaces the reference, which is atomic. A failed reload keeps
+    the engine being served.
+
+    Engines built by the manager carry the content hash of their model
+    file as `empreinte`, and observers registered with
+    `ajouter_observateur` are called with each newly served engine.
+
+    Each process has its own manager: with several workers, a reload
+    request only reaches one of them, so the file watcher
+    (`MODEL_WATCH_INTERVAL_S`) is the way to roll a model out to all workers.
+
+    Attributes:
+        chemin: Path of the model file
+        fabrique: Function building an engine from (pipeline, version)
+        intervalle_surveillance: Polling period of the file watcher in seconds, 0 to disable
+    """
+
+    def __init__(self, chemin: Path, fabrique: Callable, intervalle_surveillance: float = 0.0):
+        self.chemin = Path(chemin)
+        self.fabrique = fabrique
+        self.intervalle_surveillance = intervalle_surveillance
+        self.charge_le = None
+        self._engine = None
+        self._signature = None
+        self._observateurs = []
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def engine(self):
+        """
+        Engine currently served, loaded on first access.
+        """
+        engine = self._engine
+        if engine is None:
+            self.recharger()
+            engine = self._engine
+        return engine
+
+    @property
+    def version(self) -> str:
+        """
+        Version label of the model currently served.
+        """
+        return self.engine.version
+
+    def _construire(self):
+        """
+        Load the model file and build a warmed engine.
+
+        Returns:
+            Tuple (engine, file signature before loading)
+        """
+        signature = _signature_fichiers(self.chemin)
+        empreinte = calculer_empreinte(self.chemin)
+        engine = self.fabrique(joblib.load(self.chemin), calculer_version_modele(self.chemin, empreinte))
+        engine.empreinte = empreinte
+
+        sondes = np.array([[sex, fare] for sex in (0.0, 1.0) for fare in np.linspace(0.0, 512.0, 32)])
+        engine.predict(sondes)
+        engine.predict(sondes[:1])
+        return engine, signature
+
+    def recharger(self) -> dict:
+        """
+        Load the model file and swap it with the engine being served.
+
+        Concurrent reloads are serialized; requests keep being served by the
+        previous engine until the new one is ready.
+
+        Returns:
+            Dictionary with "model_version", "previous_version" and "duration"
+
+        Raises:
+            Exception: If the model cannot be loaded; the previous engine is kept
+        """
+        with self._verrou:
+            ancien = self._engine
+            debut = time.perf_counter()
+            try:
+                nouveau, signature = self._construire()
+            except Exception as e:
+                logger.error(f"Échec du chargement du modèle {self.chemin}: {e}")
+                enregistrer_chargement_modele("error", time.perf_counter() - debut)
+                raise
+            duree = time.perf_counter() - debut
+
+            self._engine = nouveau
+            self._signature = signature
+            self.charge_le = time.time()
+
+        enregistrer_chargement_modele("success", duree)
+        version_precedente = ancien.version if ancien is not None else None
+        logger.info(f"Modèle {nouveau.version} chargé en {duree:.2f}s (précédent: {version_precedente})")
+        for observateur in list(self._observateurs):
+            try:
+                observateur(nouveau)
+            except Exception as e:
+                logger.error(f"Erreur d'un observateur du chargement du modèle: {e}")
+        return {
+            "model_version": nouveau.version,
+            "previous_version": version_precedente,
+            "duration": duree,
+        }
+
+    def ajouter_observateur(self, observateur: Callable) -> None:
+        """
+        Register a function called with the new engine after each successful load.
+
+        Args:
+            observateur: Function taking the engine; it runs in the loading
+                thread and should hand long work off to another thread
+        """
+        if observateur not in self._observateurs:
+            self._observateurs.append(observateur)
+
+    def fichier_modifie(self) -> bool:
+        """
+        Check whether the model file or its sidecar changed since the last load.
+        """
+        return _signature_fichiers(self.chemin) != self._signature
+
+    def _surveiller(self) -> None:
+        """
+        Watcher loop: reload the model whenever its files change.
+        """
+        while not self._arret.wait(self.intervalle_surveillance):
+            if not self.fichier_modifie():
+                continue
+            try:
+                self.recharger()
+            except Exception:
+                # Probably a partially written file: keep the current model and
+                # remember this state, the next write will change it again.
+                self._signature = _signature_fichiers(self.chemin)
+
+    def demarrer_surveillance(self) -> None:
+        """
+        Start the file watcher in this process if a polling period is configured.
+        """
+        if self.intervalle_surveillance <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._arret.clear()
+        self._thread = threading.Thread(target=self._surveiller, name="model-watcher", daemon=True)
+        self._thread.start()
+        self._pid = os.getpid()
+        logger.info(f"Surveillance de {self.chemin} toutes les {self.intervalle_surveillance}s")
+
+    def arreter_surveillance(self) -> None:
+        """
+        Stop the file watcher.
+        """
+        self._arret.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def informations(self) -> dict:
+        """
+        Describe the model currently served.
+
+        Returns:
+            Dictionary with the version, path, load time and engine mode
+        """
+        engine = self.engine
+        return {
+            "model_version": engine.version,
+            "path": str(self.chemin),
+            "loaded_at": self.charge_le,
+            "fast_path": engine.fast_path,
+            "compiled": engine.compiled,
+        }
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_validator
-from typing import List
+from pydantic import BaseModel, field_validator, model_validator
+from typing import List, Optional
 
 
 class Passenger(BaseModel):
@@ -39,4 +39,128 @@ class Passengers(BaseModel):
     Attributes:
         passengers: List of Passenger objects
     """
-    passengers: List[Passenger]
\ No newline at end of file
+    passengers: List[Passenger]
+
+
+class PassengersColumns(BaseModel):
+    """
+    Columnar representation of multiple Titanic passengers.
+
+    Each attribute holds one column, validated as a whole array rather than
+    one Passenger object per row.
+
+    Attributes:
+        Sex: Passenger sexes ('M' or 'F')
+        Fare: Ticket fare prices
+    """
+    Sex: List[str]
+    Fare: List[float]
+
+    @field_validator("Sex")
+    def validate_sex(cls, v):
+        """
+        Validate that every sex value is either 'M' or 'F'.
+
+        Args:
+            v: Sex column to validate
+
+        Returns:
+            Sex column, unchanged (lowercase values are accepted)
+
+        Raises:
+            ValueError: If a value is not 'M' or 'F'
+        """
+        invalides = set(v) - {"M", "F", "m", "f"}
+        if invalides:
+            raise ValueError(f"Sex must be 'M' or 'F', got {sorted(invalides)[:5]}")
+        return v
+
+    @model_validator(mode="after")
+    def validate_lengths(self):
+        """
+        Validate that both columns are non-empty and of the same length.
+
+        Raises:
+            ValueError: If the columns are empty or of different lengths
+        """
+        if not self.Sex:
+            raise ValueError("Columns must not be empty")
+        if len(self.Sex) != len(self.Fare):
+            raise ValueError(
+                f"Sex and Fare must have the same length ({len(self.Sex)} != {len(self.Fare)})"
+            )
+        return self
+
+
+class Feedback(BaseModel):
+    """
+    True label of a served prediction.
+
+    Attributes:
+        prediction_id: ID returned with the prediction
+        label: True outcome ('Survived' or 'Died')
+    """
+    prediction_id: str
+    label: str
+
+    @field_validator("label")
+    def validate_label(cls, v):
+        """
+        Validate that the label is either 'Survived' or 'Died'.
+
+        Args:
+            v: Label to validate
+
+        Returns:
+            Capitalized label
+
+        Raises:
+            ValueError: If the label is not 'Survived' or 'Died'
+        """
+        if v.capitalize() not in ("Survived", "Died"):
+            raise ValueError("label must be 'Survived' or 'Died'")
+        return v.capitalize()
+
+
+class Feedbacks(BaseModel):
+    """
+    True labels of multiple served predictions.
+
+    Attributes:
+        feedbacks: List of Feedback objects
+    """
+    feedbacks: List[Feedback]
+
+
+class DemandeRapport(BaseModel):
+    """
+    Report job to generate.
+
+    Attributes:
+        report: Report to generate ('drift', 'classification' or 'complet')
+        since: Start of the window of the drift report (Unix time, optional)
+        until: End of the window of the drift report (Unix time, optional)
+        sample_size: Maximum rows of each dataset of the reports (optional)
+    """
+    report: str
+    since: Optional[float] = None
+    until: Optional[float] = None
+    sample_size: Optional[int] = None
+
+    @field_validator("report")
+    def validate_report(cls, v):
+        """
+        Validate that the report is one a job can generate.
+
+        Args:
+            v: Report name to validate
+
+        Returns:
+            Lowercased report name
+
+        Raises:
+            ValueError: If the report is unknown
+        """
+        if v.lower() not in ("drift", "classification", "complet"):
+            raise ValueError("report must be 'drift', 'classification' or 'complet'")
+        return v.lower()
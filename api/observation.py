@@ -0,0 +1,49 @@
+"""
+Observation of the scored traffic.
+Every prediction path hands its scored batch to `observer_predictions`,
+which feeds the in-process monitors (live drift, history of recent
+predictions, reservoir samples) and the durable prediction log.
+"""
+
+import numpy as np
+from loguru import logger
+
+from api.drift import moniteur
+from api.echantillons import echantillons
+from api.historique import historique
+from api.journal import journal
+
+
+def observer_predictions(model_version: str, features: np.ndarray, labels, confidences, latence: float) -> None:
+    """
+    Feed a scored batch to the in-process monitors and the prediction log.
+
+    Errors are logged and never reach the request.
+
+    Args:
+        model_version: Version of the model that scored the batch
+        features: Array of shape (n, 2) with columns Sex, Fare
+        labels: Predicted label of each row ("Survived" or "Died")
+        confidences: Confidence of each prediction
+        latence: Duration of the model call for the whole batch, in seconds
+    """
+    survivants = np.asarray(labels) == "Survived"
+    try:
+        historique.ajouter(features, survivants, confidences, latence)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'ajout à l'historique des prédictions: {e}")
+    if echantillons is not None:
+        try:
+            echantillons.ajouter(features, survivants)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'échantillonnage des prédictions: {e}")
+    if journal is not None:
+        try:
+            journal.ajouter(model_version, features, survivants, confidences, latence)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'ajout au journal des prédictions: {e}")
+    if moniteur is not None:
+        try:
+            moniteur.observer(features, survivants)
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour du drift en direct: {e}")
@@ -0,0 +1,271 @@
+"""
+Scheduled drift and classification monitoring.
+A background thread of the API periodically submits the Evidently
+evaluation of `api.rapports` to a one-process pool, so the reports never
+compete with serving for the GIL, and pushes the returned scores into the
+drift and accuracy gauges along with the run duration and staleness.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from api import config
+from api.echantillons import echantillons
+from api.historique import historique
+from api.journal import journal
+from api.metrics import (
+    enregistrer_surveillance,
+    mettre_a_jour_accuracy,
+    mettre_a_jour_drift,
+    mettre_a_jour_fraicheur_surveillance,
+)
+from api.model_manager import calculer_empreinte
+from api.predict import BASE_DIR, DATA_DIR, MODEL_PATH, manager
+from api.rapports import executer_surveillance
+from api.reference import dossier_profil
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Maximum time between two updates of the staleness gauge in seconds
+PAS_FRAICHEUR = 15.0
+
+
+class PlanificateurSurveillance:
+    """
+    Run the drift and classification evaluation every `intervalle` seconds.
+
+    Drift is evaluated on the predictions of the last `fenetre` seconds,
+    read from the Parquet prediction log (every worker's traffic) or, when
+    the log is disabled, from the reservoir samples (or the history of
+    recent predictions) of this process. Classification needs true labels, so it scores the labelled
+    dataset `chemin_labels` with the served model; it runs again only when
+    the model or that dataset changes, so `ml_model_accuracy` is not
+    overwritten with the same value every run.
+
+    The evaluation runs in a child process started with "spawn", reused
+    from one run to the next. With several workers, the scheduler only runs
+    in the worker holding the lock file; another worker takes over if that
+    one exits.
+
+    Attributes:
+        intervalle: Time between the end of a run and the start of the next, in seconds
+        fenetre: Length of the evaluated window of production data, in seconds
+        min_lignes: Predictions needed in the window to run the drift report
+        chemin_labels: CSV file of labelled passengers
+        fichier_verrou: Lock file electing the worker that runs the scheduler
+    """
+
+    def __init__(
+        self,
+        intervalle: float,
+        fenetre: float = 3600,
+        min_lignes: int = 100,
+        chemin_labels: Optional[Path] = None,
+        fichier_verrou: Optional[Path] = None
+    ):
+        self.intervalle = intervalle
+        self.fenetre = fenetre
+        self.min_lignes = min_lignes
+        self.chemin_labels = Path(chemin_labels) if chemin_labels else None
+        self.fichier_verrou = Path(fichier_verrou) if fichier_verrou else None
+        self._pool = None
+        self._verrou_fichier = None
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._thread = None
+        self._debut = time.time()
+        self._cle_classification = None
+        self._etat = {"running": False, "last_run": None, "last_success": None, "last_error": None}
+
+    def demarrer(self) -> None:
+        """
+        Start the scheduler thread of this process.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._debut = time.time()
+        self._arret.clear()
+        self._thread = threading.Thread(target=self._boucle, name="monitoring-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Surveillance planifiée toutes les {self.intervalle}s sur {self.fenetre}s de trafic")
+
+    def arreter(self) -> None:
+        """
+        Stop the scheduler thread and the evaluation process.
+        """
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._verrou_fichier is not None:
+            self._verrou_fichier.close()
+            self._verrou_fichier = None
+
+    def _verrouiller(self) -> bool:
+        """
+        Try to become the process that runs the scheduler.
+
+        Returns:
+            True if this process holds the lock file (or no lock is used)
+        """
+        if self._verrou_fichier is not None or self.fichier_verrou is None or fcntl is None:
+            return True
+        self.fichier_verrou.parent.mkdir(parents=True, exist_ok=True)
+        fichier = open(self.fichier_verrou, "a")
+        try:
+            fcntl.flock(fichier, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fichier.close()
+            return False
+        self._verrou_fichier = fichier
+        logger.info(f"Surveillance planifiée exécutée par le processus {os.getpid()}")
+        return True
+
+    def _boucle(self) -> None:
+        """
+        Scheduler loop: run when due and keep the staleness gauge current.
+        """
+        prochaine = time.time()
+        while not self._arret.is_set():
+            if self._verrouiller():
+                if time.time() >= prochaine:
+                    self.executer()
+                    prochaine = time.time() + self.intervalle
+                derniere = self._etat["last_success"] or self._debut
+                mettre_a_jour_fraicheur_surveillance(time.time() - derniere)
+            self._arret.wait(max(0.0, min(PAS_FRAICHEUR, prochaine - time.time())))
+
+    def _obtenir_pool(self) -> ProcessPoolExecutor:
+        """
+        Get the evaluation process pool, creating it on first use.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _parametres(self, maintenant: float) -> tuple:
+        """
+        Build the arguments of `executer_surveillance` for a run.
+
+        Returns:
+            Tuple (keyword arguments, model version, classification key or None)
+        """
+        chemin_reference = DATA_DIR / config.DRIFT_REFERENCE_FILE
+        parametres = {
+            "chemin_reference": chemin_reference,
+            "dossier_profil": dossier_profil(chemin_reference, config.REFERENCE_PROFILE_DIR or MODEL_PATH.parent / "profiles"),
+            "nb_bins": config.DRIFT_FARE_BINS,
+            "depuis": maintenant - self.fenetre,
+            "min_lignes": self.min_lignes,
+            "moteur": config.MONITOR_DRIFT_ENGINE,
+        }
+        if journal is not None:
+            parametres["dossier_journal"] = journal.dossier
+        elif echantillons is not None:
+            parametres["donnees"] = echantillons.echantillon(depuis=maintenant - self.fenetre, taille=config.REPORT_SAMPLE_SIZE or None)
+        else:
+            parametres["donnees"] = historique.dataframe(depuis=maintenant - self.fenetre)
+
+        modele = manager.engine
+        cle = None
+        if self.chemin_labels is not None and self.chemin_labels.exists():
+            cle = f"{modele.empreinte or calculer_empreinte(manager.chemin)}:{calculer_empreinte(self.chemin_labels)}"
+            if cle != self._cle_classification:
+                parametres["chemin_modele"] = manager.chemin
+                parametres["chemin_labels"] = self.chemin_labels
+        return parametres, modele.version, cle
+
+    def executer(self) -> dict:
+        """
+        Run one evaluation now and publish its results.
+
+        The caller waits for the child process; the serving threads do not.
+
+        Returns:
+            Description of the run, as in `etat()["last_run"]`
+        """
+        debut = time.time()
+        with self._verrou:
+            self._etat["running"] = True
+        try:
+            parametres, version, cle = self._parametres(debut)
+            resultat = self._obtenir_pool().submit(executer_surveillance, **parametres).result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._pool = None
+            duree = time.time() - debut
+            enregistrer_surveillance("error", duree)
+            logger.error(f"Erreur lors de la surveillance planifiée: {e}")
+            with self._verrou:
+                self._etat.update(running=False, last_error=str(e))
+            return {"status": "error", "error": str(e), "duration": duree}
+
+        fin = time.time()
+        if "drift_score" in resultat["drift"]:
+            mettre_a_jour_drift(resultat["drift"])
+        classification = resultat["classification"]
+        if classification is not None:
+            self._cle_classification = cle
+            if "accuracy" in classification:
+                mettre_a_jour_accuracy(model_version=version, accuracy=classification["accuracy"])
+        enregistrer_surveillance("success", fin - debut, fin)
+
+        execution = {
+            "status": "success",
+            "started_at": debut,
+            "finished_at": fin,
+            "duration": fin - debut,
+            "model_version": version,
+            "window": self.fenetre,
+            **resultat,
+        }
+        with self._verrou:
+            if classification is None and self._etat["last_run"] is not None and cle == self._cle_classification:
+                execution["classification"] = self._etat["last_run"]["classification"]
+            self._etat.update(running=False, last_run=execution, last_success=fin, last_error=None)
+        logger.info(f"Surveillance planifiée terminée en {fin - debut:.2f}s")
+        return execution
+
+    def etat(self) -> dict:
+        """
+        Describe the scheduler and its last run.
+
+        Returns:
+            Dictionary with the schedule, "running", the last successful run
+            ("last_run"), its end time ("last_success"), the seconds elapsed
+            since then ("staleness") and the last error
+        """
+        with self._verrou:
+            etat = dict(self._etat)
+        derniere = etat["last_success"]
+        return {
+            "interval": self.intervalle,
+            "window": self.fenetre,
+            "staleness": time.time() - derniere if derniere else None,
+            **etat,
+        }
+
+
+planificateur = None
+if config.MONITOR_INTERVAL_S > 0:
+    planificateur = PlanificateurSurveillance(
+        config.MONITOR_INTERVAL_S,
+        fenetre=config.MONITOR_WINDOW_S,
+        min_lignes=config.MONITOR_MIN_ROWS,
+        chemin_labels=DATA_DIR / config.MONITOR_LABELLED_FILE,
+        fichier_verrou=Path(config.MONITOR_LOCK_FILE or BASE_DIR / "reports" / "cache" / "monitoring.lock"),
+    )
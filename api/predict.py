@@ -1,11 +1,27 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from itertools import chain
 from pathlib import Path
-import joblib
+import numpy as np
 import pandas as pd
+from loguru import logger
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+from api import config
+from api.batching import MicroBatcher
+from api.compiled import compiler_modele, verifier_modele_compile
+from api.executor import executer_inference
+from api.model_manager import ModelManager
+from api.metrics import enregistrer_cache_prediction
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 MODEL_PATH = BASE_DIR / "models" / "model.pkl"
+DATA_DIR = BASE_DIR / "data"
 
-pipeline = joblib.load(MODEL_PATH)
+FEATURES = ("Sex", "Fare")
 
 
 def encode_sex(sex: str) -> int:
@@ -34,7 +50,514 @@ def decode_survived(pred: int) -> str:
     return "Died" if pred == 0 else "Survived"
 
 
-def predict_passenger(passenger: dict) -> int:
+def passengers_to_array(passengers: list) -> np.ndarray:
+    """
+    Build the contiguous float64 feature matrix expected by `InferenceEngine`.
+
+    Columns follow `FEATURES`: encoded "Sex" then "Fare". Passengers may be
+    validated `Passenger` objects (whose "Sex" is already uppercased) or raw
+    dictionaries.
+
+    Args:
+        passengers: List of Passenger objects or passenger dictionaries
+
+    Returns:
+        Array of shape (n, 2)
+    """
+    n = len(passengers)
+    if n and isinstance(passengers[0], dict):
+        valeurs = chain.from_iterable((encode_sex(p["Sex"]), p["Fare"]) for p in passengers)
+    else:
+        valeurs = chain.from_iterable((p.Sex == "F", p.Fare) for p in passengers)
+    return np.fromiter(valeurs, dtype=np.float64, count=2 * n).reshape(n, 2)
+
+
+def columns_to_array(sex: list, fare: list) -> np.ndarray:
+    """
+    Build the feature matrix expected by `InferenceEngine` from columns.
+
+    Args:
+        sex: Sex column ('M'/'F', case-insensitive)
+        fare: Fare column
+
+    Returns:
+        Array of shape (n, 2) with columns `FEATURES`
+    """
+    sexes = np.asarray(sex)
+    features = np.empty((len(sexes), 2), dtype=np.float64)
+    features[:, 0] = (sexes == "F") | (sexes == "f")
+    features[:, 1] = fare
+    return features
+
+
+class InferenceEngine:
+    """
+    Run a fitted pipeline on (n, 2) float64 arrays of [Sex, Fare] rows.
+
+    The pipeline is inspected once at construction. When its preprocessing
+    can be reproduced on plain arrays (a ColumnTransformer made of
+    StandardScaler/passthrough blocks, or a pipeline fitted without feature
+    names), arrays are fed straight to the estimator. Otherwise the engine
+    falls back to a DataFrame named after `FEATURES`.
+
+    With `compiler=True`, a tree-based model is additionally compiled into
+    a decision table (see `api.compiled`), verified against the pipeline on
+    the datasets of `DATA_DIR`, and served by table lookups.
+
+    Attributes:
+        pipeline: Fitted scikit-learn pipeline
+        version: Version label of the model, used in metrics
+        empreinte: Content hash of the model file (set by `ModelManager`)
+        labels: Human-readable label of each `predict_proba` column
+        fast_path: True if the NumPy path is used
+        compiled: True if predictions are served by the decision table
+    """
+
+    def __init__(self, pipeline, compiler: bool = False, version: str = "inconnue"):
+        self.pipeline = pipeline
+        self.version = version
+        self.empreinte = None
+        self.labels = np.array([decode_survived(int(c)) for c in pipeline.classes_])
+        self._rapide = self._construire_chemin_rapide()
+        self.fast_path = self._rapide is not None
+        self._table = self._compiler() if compiler else None
+        self.compiled = self._table is not None
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Compute class probabilities.
+
+        Args:
+            features: Array of shape (n, 2) with columns `FEATURES`
+
+        Returns:
+            Array of shape (n, n_classes)
+        """
+        if self._table is not None:
+            return self._table.predict_proba(features)
+        return self._predict_proba_pipeline(features)
+
+    def _predict_proba_pipeline(self, features: np.ndarray) -> np.ndarray:
+        """
+        Compute class probabilities with the pipeline itself.
+        """
+        if self._rapide is not None:
+            pretraitement, estimateur = self._rapide
+            return estimateur.predict_proba(pretraitement(features))
+        return self._predict_proba_dataframe(features)
+
+    def predict(self, features: np.ndarray) -> tuple:
+        """
+        Compute the predicted class index and the class probabilities.
+
+        Args:
+            features: Array of shape (n, 2) with columns `FEATURES`
+
+        Returns:
+            Tuple (index of the predicted class in `labels`, probabilities)
+        """
+        probas = self.predict_proba(features)
+        return probas.argmax(axis=1), probas
+
+    def _predict_proba_dataframe(self, features: np.ndarray) -> np.ndarray:
+        """
+        Compute class probabilities through a DataFrame with named columns.
+        """
+        df = pd.DataFrame(features, columns=list(FEATURES))
+        return self.pipeline.predict_proba(df)
+
+    def _construire_chemin_rapide(self):
+        """
+        Build the DataFrame-free path and check it against the DataFrame path.
+
+        Returns:
+            Tuple (preprocessing function, estimator), or None when the
+            pipeline requires feature names
+
+        Raises:
+            ValueError: If the pipeline was fitted on other columns than `FEATURES`
+        """
+        noms = getattr(self.pipeline, "feature_names_in_", None)
+        if noms is None:
+            chemin = (np.asarray, self.pipeline)
+        elif set(noms) != set(FEATURES):
+            raise ValueError(f"Colonnes du modèle inattendues: {list(noms)}, attendues: {list(FEATURES)}")
+        else:
+            chemin = _decomposer_pipeline(self.pipeline)
+            if chemin is None:
+                logger.info("Pipeline non décomposable: inférence via DataFrame")
+                return None
+
+        sonde = np.array([[sex, fare] for sex in (0.0, 1.0) for fare in (0.0, 7.25, 30.0, 512.33)])
+        pretraitement, estimateur = chemin
+        if not np.allclose(estimateur.predict_proba(pretraitement(sonde)), self._predict_proba_dataframe(sonde)):
+            logger.warning("Chemin NumPy incohérent avec le pipeline: inférence via DataFrame")
+            return None
+
+        logger.info("Inférence NumPy sans DataFrame activée")
+        return chemin
+
+    def _compiler(self):
+        """
+        Compile the model into a decision table and verify it.
+
+        Returns:
+            CompiledModel, or None if the model cannot be compiled or the
+            table does not match the pipeline
+        """
+        if self._rapide is None:
+            logger.info("Compilation impossible sans chemin NumPy")
+            return None
+        table = compiler_modele(*self._rapide)
+        if table is None:
+            return None
+        if not verifier_modele_compile(table, self._predict_proba_pipeline, _features_verification()):
+            return None
+        return table
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of single predictions keyed on encoded features.
+
+    Keys are (encoded sex, fare), the fare being optionally rounded to a
+    multiple of `pas_fare`; in that case the model is also evaluated on the
+    rounded fare, so a cached answer is exactly what the model would return
+    for that key. Entries belong to the engine that computed them: looking
+    up with another engine (after a model change) empties the cache.
+
+    Attributes:
+        capacite: Maximum number of entries
+        pas_fare: Fare quantization step, 0 for exact fares
+    """
+
+    def __init__(self, capacite: int, pas_fare: float = 0.0):
+        self.capacite = capacite
+        self.pas_fare = pas_fare
+        self._entrees = OrderedDict()
+        self._modele = None
+        self._verrou = threading.Lock()
+
+    def preparer(self, features: np.ndarray) -> tuple:
+        """
+        Quantize a feature row and compute its cache key.
+
+        Args:
+            features: Array [encoded sex, fare]
+
+        Returns:
+            Tuple (features to score, cache key)
+        """
+        if self.pas_fare > 0:
+            features = np.array([features[0], round(features[1] / self.pas_fare) * self.pas_fare])
+        return features, (float(features[0]), float(features[1]))
+
+    def get(self, modele, cle: tuple):
+        """
+        Look up a prediction.
+
+        Args:
+            modele: Engine serving the request
+            cle: Key returned by `preparer`
+
+        Returns:
+            Cached (class index, probabilities row), or None on a miss
+        """
+        with self._verrou:
+            if modele is not self._modele:
+                if self._entrees:
+                    enregistrer_cache_prediction("invalidation")
+                self._entrees.clear()
+                self._modele = modele
+            valeur = self._entrees.get(cle)
+            if valeur is not None:
+                self._entrees.move_to_end(cle)
+        enregistrer_cache_prediction("hit" if valeur is not None else "miss", len(self._entrees))
+        return valeur
+
+    def put(self, modele, cle: tuple, valeur: tuple) -> None:
+        """
+        Store a prediction, evicting the least recently used entry if full.
+
+        Args:
+            modele: Engine that computed the prediction
+            cle: Key returned by `preparer`
+            valeur: (class index, probabilities row)
+        """
+        with self._verrou:
+            if modele is not self._modele:
+                return
+            self._entrees[cle] = valeur
+            self._entrees.move_to_end(cle)
+            evincee = len(self._entrees) > self.capacite
+            if evincee:
+                self._entrees.popitem(last=False)
+        if evincee:
+            enregistrer_cache_prediction("eviction", len(self._entrees))
+
+
+def _features_verification() -> np.ndarray:
+    """
+    Load the [Sex, Fare] rows of the datasets of `DATA_DIR`, plus a grid
+    covering both sexes and a wide fare range.
+
+    Returns:
+        Array of shape (n, 2) with columns `FEATURES`
+    """
+    grille = np.array([[sex, fare] for sex in (0.0, 1.0) for fare in np.linspace(0.0, 600.0, 6001)])
+    jeux = [grille]
+    for chemin in sorted(DATA_DIR.glob("*.csv")):
+        df = pd.read_csv(chemin)
+        if set(FEATURES) <= set(df.columns) and pd.api.types.is_numeric_dtype(df["Sex"]):
+            jeux.append(df[list(FEATURES)].dropna().to_numpy(dtype=np.float64))
+    return np.vstack(jeux)
+
+
+def _decomposer_pipeline(pipeline):
+    """
+    Reproduce the leading ColumnTransformer of a pipeline on plain arrays.
+
+    Only StandardScaler and passthrough blocks (stored as identity
+    FunctionTransformer once fitted) selecting `FEATURES` by name are
+    supported; output columns keep the ColumnTransformer order.
+
+    Args:
+        pipeline: Fitted pipeline whose inputs are named `FEATURES`
+
+    Returns:
+        Tuple (preprocessing function, remaining pipeline), or None
+    """
+    if not isinstance(pipeline, Pipeline) or len(pipeline.steps) < 2:
+        return None
+    transformer = pipeline.steps[0][1]
+    if not isinstance(transformer, ColumnTransformer):
+        return None
+
+    blocs = []
+    for nom, bloc, colonnes in transformer.transformers_:
+        if bloc == "drop":
+            continue
+        if not all(isinstance(c, str) and c in FEATURES for c in colonnes):
+            return None
+        indices = [FEATURES.index(c) for c in colonnes]
+        if bloc == "passthrough" or (isinstance(bloc, FunctionTransformer) and bloc.func is None):
+            blocs.append((indices, None, None))
+        elif isinstance(bloc, StandardScaler):
+            blocs.append((indices, bloc.mean_, bloc.scale_))
+        else:
+            return None
+
+    def pretraitement(X: np.ndarray) -> np.ndarray:
+        parties = []
+        for indices, moyenne, echelle in blocs:
+            partie = X[:, indices]
+            if moyenne is not None:
+                partie = partie - moyenne
+            if echelle is not None:
+                partie = partie / echelle
+            parties.append(partie)
+        return np.hstack(parties)
+
+    return pretraitement, pipeline[1:]
+
+
+manager = ModelManager(
+    MODEL_PATH,
+    lambda pipeline, version: InferenceEngine(pipeline, compiler=config.MODEL_COMPILED, version=version),
+    intervalle_surveillance=config.MODEL_WATCH_INTERVAL_S,
+)
+manager.recharger()
+
+
+def __getattr__(nom: str):
+    """
+    Resolve `engine` and `pipeline` to the model currently served.
+
+    Code running per request should read `manager.engine` once instead, so
+    a reload cannot change the model in the middle of a request.
+    """
+    if nom == "engine":
+        return manager.engine
+    if nom == "pipeline":
+        return manager.engine.pipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+
+
+batcher = None
+if config.PREDICT_BATCHING_ENABLED:
+    batcher = MicroBatcher(
+        lambda features: manager.engine.predict(features),
+        max_batch_size=config.PREDICT_BATCH_MAX_SIZE,
+        max_wait_s=config.PREDICT_BATCH_MAX_WAIT_US / 1e6,
+    )
+
+
+cache = None
+if config.PREDICTION_CACHE_SIZE > 0:
+    cache = PredictionCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_FARE_STEP)
+
+
+def _formater_resultats(modele: InferenceEngine, indices, probas) -> list:
+    """
+    Convert predicted class indices and probabilities into result dictionaries.
+
+    Args:
+        modele: Engine that computed the probabilities
+        indices: Index of the predicted class of each row
+        probas: Probabilities of each row
+
+    Returns:
+        List of dictionaries with "prediction", "probabilities" and "confidence"
+    """
+    labels = modele.labels.tolist()
+
+    results = []
+    for row, idx in zip(np.asarray(probas).tolist(), np.asarray(indices).tolist()):
+        results.append({
+            "prediction": labels[idx],
+            "probabilities": dict(zip(labels, row)),
+            "confidence": row[idx],
+        })
+    return results
+
+
+def _formater_valeur(modele: InferenceEngine, valeur: tuple) -> dict:
+    """
+    Convert one (class index, probabilities row) pair into a result
+    dictionary, labelled with the version of the model that computed it.
+    """
+    idx, row = valeur
+    resultat = _formater_resultats(modele, [idx], [row])[0]
+    resultat["model_version"] = modele.version
+    return resultat
+
+
+def predict_passengers_with_proba(passengers: list, modele=None) -> list:
+    """
+    Predict label, class probabilities and confidence for multiple passengers.
+
+    The pipeline is invoked once through `predict_proba`; the predicted class
+    is the argmax of the probabilities, which is what `pipeline.predict`
+    returns for the classifiers used by this project.
+
+    Args:
+        passengers: List of Passenger objects or dictionaries with "Sex" and "Fare"
+        modele: Engine to use, defaults to the one being served
+
+    Returns:
+        List of dictionaries, one per passenger, containing:
+        - "prediction": "Survived" or "Died"
+        - "probabilities": probability of each class, keyed by label
+        - "confidence": probability of the predicted class
+
+    Example:
+        Input:  [{"Sex": "F", "Fare": 23.45}]
+        Output: [{"prediction": "Survived",
+                  "probabilities": {"Died": 0.2, "Survived": 0.8},
+                  "confidence": 0.8}]
+    """
+    if modele is None:
+        modele = manager.engine
+    indices, probas = modele.predict(passengers_to_array(passengers))
+    return _formater_resultats(modele, indices, probas)
+
+
+def predict_columns(sex: list, fare: list, modele=None) -> dict:
+    """
+    Predict survival for passengers given as columns, in one model call.
+
+    Args:
+        sex: Sex column ('M' or 'F')
+        fare: Fare column
+        modele: Engine to use, defaults to the one being served
+
+    Returns:
+        Columnar dictionary with:
+        - "prediction": list of "Survived" / "Died"
+        - "confidence": list of probabilities of the predicted class
+
+    Example:
+        Input:  ["M", "F"], [10.0, 50.0]
+        Output: {"prediction": ["Died", "Survived"], "confidence": [0.87, 0.93]}
+    """
+    if modele is None:
+        modele = manager.engine
+    indices, probas = modele.predict(columns_to_array(sex, fare))
+    return {
+        "prediction": modele.labels[indices].tolist(),
+        "confidence": probas[np.arange(len(indices)), indices].tolist(),
+    }
+
+
+def predict_passenger_with_proba(passenger) -> dict:
+    """
+    Predict label, class probabilities and confidence for a single passenger.
+
+    Repeated inputs are answered from the LRU cache (`PREDICTION_CACHE_SIZE`).
+    On a miss with micro-batching enabled (`PREDICT_BATCHING_ENABLED`), the
+    passenger is scored together with the requests arriving concurrently.
+
+    Args:
+        passenger: Passenger object or dictionary with "Sex" and "Fare"
+
+    Returns:
+        Dictionary with "prediction", "probabilities" and "confidence"
+        (see `predict_passengers_with_proba`), plus "model_version"
+    """
+    features = passengers_to_array([passenger])[0]
+    modele = manager.engine
+    if cache is not None:
+        features, cle = cache.preparer(features)
+        valeur = cache.get(modele, cle)
+        if valeur is not None:
+            return _formater_valeur(modele, valeur)
+
+    if batcher is not None:
+        valeur = batcher.predict(features)
+    else:
+        indices, probas = modele.predict(features[np.newaxis, :])
+        valeur = (int(indices[0]), probas[0])
+
+    if cache is not None:
+        cache.put(modele, cle, valeur)
+    return _formater_valeur(modele, valeur)
+
+
+async def predict_passenger_with_proba_async(passenger) -> dict:
+    """
+    Async variant of `predict_passenger_with_proba` for the API handlers.
+
+    Cache hits are answered on the event loop; the model call never is: it
+    goes through the micro-batcher when enabled, otherwise through the
+    inference pool.
+
+    Args:
+        passenger: Passenger object or dictionary with "Sex" and "Fare"
+
+    Returns:
+        Dictionary with "prediction", "probabilities", "confidence" and
+        "model_version"
+    """
+    features = passengers_to_array([passenger])[0]
+    modele = manager.engine
+    if cache is not None:
+        features, cle = cache.preparer(features)
+        valeur = cache.get(modele, cle)
+        if valeur is not None:
+            return _formater_valeur(modele, valeur)
+
+    if batcher is not None:
+        valeur = await asyncio.wrap_future(batcher.submit(features))
+    else:
+        indices, probas = await executer_inference(modele.predict, features[np.newaxis, :])
+        valeur = (int(indices[0]), probas[0])
+
+    if cache is not None:
+        cache.put(modele, cle, valeur)
+    return _formater_valeur(modele, valeur)
+
+
+def predict_passenger(passenger: dict) -> str:
     """
     Predict the survival outcome for a single Titanic passenger.
 
@@ -58,12 +581,7 @@ def predict_passenger(passenger: dict) -> int:
         Input:  {"Sex": "F", "Fare": 23.45}
         Output: "Survived"
     """
-    passenger_encoded = passenger.copy()
-    passenger_encoded["Sex"] = encode_sex(passenger["Sex"])
-
-    df = pd.DataFrame([passenger_encoded])
-    prediction = pipeline.predict(df)[0]
-    return decode_survived(int(prediction))
+    return predict_passenger_with_proba(passenger)["prediction"]
 
 
 def predict_passengers(passengers: list) -> list:
@@ -96,13 +614,4 @@ def predict_passengers(passengers: list) -> list:
         Output:
             ["Died", "Survived"]
     """
-    passenger_encoded = []
-    for p in passengers:
-        passenger_encoded.append({
-            "Sex": encode_sex(p["Sex"]),
-            "Fare": p["Fare"]
-        })
-
-    df = pd.DataFrame(passenger_encoded)
-    predictions = pipeline.predict(df)
-    return [decode_survived(int(p)) for p in predictions]
\ No newline at end of file
+    return [r["prediction"] for r in predict_passengers_with_proba(passengers)]
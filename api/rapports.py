@@ -0,0 +1,279 @@
+"""
+Evidently drift and classification evaluation for the scheduled monitoring
+and the report jobs.
+These functions run in a separate process (see `api.planificateur` and
+`api.taches`): they read their inputs from disk, run the reports and return
+plain summaries, and leave the Prometheus metrics to the API process.
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import pandas as pd
+
+from api.journal import lire_predictions
+from api.metrics import (
+    generer_rapport_classification,
+    generer_rapport_complet,
+    generer_rapport_drift,
+    resumer_rapport_classification,
+    resumer_rapport_drift,
+)
+from api.reference import ProfilReference, charger_profil, lire_reference
+
+# Model inputs, compared by the drift report
+COLONNES = ["Sex", "Fare"]
+
+# Target column of the labelled datasets
+CIBLE = "Survived"
+
+
+def evaluer_drift(profil: ProfilReference, courant: pd.DataFrame, min_lignes: int, moteur: str = "evidently") -> dict:
+    """
+    Run the drift report of recent production data against the reference.
+
+    Args:
+        profil: Profile of the reference dataset
+        courant: Recent predictions, with the columns `COLONNES`
+        min_lignes: Rows needed to run the report
+        moteur: Drift engine of `generer_rapport_drift` ("evidently" or "numpy")
+
+    Returns:
+        Dictionary with "rows", "sampling" (sampled fraction of the
+        predictions) and the summary of `resumer_rapport_drift`, or "rows"
+        and "skipped" when there are too few rows
+    """
+    if len(courant) < max(1, min_lignes):
+        return {"rows": len(courant), "skipped": f"moins de {min_lignes} prédictions récentes"}
+    resultats = generer_rapport_drift(
+        reference_data=profil if moteur == "numpy" else profil.dataframe(COLONNES),
+        current_data=courant[COLONNES].astype("float64"),
+        mettre_a_jour_metriques=False,
+        moteur=moteur,
+    )
+    return {"rows": len(courant), "sampling": resultats["echantillonnage"]["current"], **resumer_rapport_drift(resultats)}
+
+
+def donnees_labellisees(profil: ProfilReference, chemin_modele: Path, chemin_labels: Path) -> tuple:
+    """
+    Score the reference dataset and a labelled dataset with a model file.
+
+    Args:
+        profil: Profile of the reference dataset (with the `CIBLE` column)
+        chemin_modele: Model file served by the API
+        chemin_labels: CSV file of labelled passengers
+
+    Returns:
+        Tuple (reference, labelled) DataFrames with the columns `CIBLE`,
+        `COLONNES` and "prediction"
+    """
+    pipeline = joblib.load(chemin_modele)
+    reference = profil.dataframe([CIBLE] + COLONNES)
+    courant = lire_reference(chemin_labels)[[CIBLE] + COLONNES]
+    for df in (reference, courant):
+        df["prediction"] = pipeline.predict(df[COLONNES])
+        df[CIBLE] = df[CIBLE].astype("int64")
+    return reference, courant
+
+
+def evaluer_classification(profil: ProfilReference, chemin_modele: Path, chemin_labels: Path) -> dict:
+    """
+    Run the classification report of the served model on a labelled dataset.
+
+    The model file is loaded in this process and scores both the reference
+    dataset and the labelled one.
+
+    Args:
+        profil: Profile of the reference dataset (with the `CIBLE` column)
+        chemin_modele: Model file served by the API
+        chemin_labels: CSV file of labelled passengers
+
+    Returns:
+        Dictionary with "rows" and the scores of `resumer_rapport_classification`
+    """
+    reference, courant = donnees_labellisees(profil, chemin_modele, chemin_labels)
+    resultats = generer_rapport_classification(
+        reference_data=reference,
+        current_data=courant,
+        target_column=CIBLE,
+        prediction_column="prediction",
+    )
+    return {"rows": len(courant), **resumer_rapport_classification(resultats)}
+
+
+def executer_surveillance(
+    chemin_reference: Path,
+    dossier_profil: Path,
+    nb_bins: int,
+    depuis: float,
+    min_lignes: int,
+    dossier_journal: Optional[Path] = None,
+    donnees: Optional[pd.DataFrame] = None,
+    chemin_modele: Optional[Path] = None,
+    chemin_labels: Optional[Path] = None,
+    moteur: str = "evidently"
+) -> dict:
+    """
+    Run one scheduled evaluation: drift, then classification.
+
+    Recent production data is read from the Parquet prediction log when
+    `dossier_journal` is given, or taken from `donnees`.
+
+    Args:
+        chemin_reference: CSV file of the reference dataset
+        dossier_profil: Directory of its profile
+        nb_bins: Number of quantile bins of the profile
+        depuis: Start of the evaluated window (seconds since the epoch)
+        min_lignes: Rows needed to run the drift report
+        dossier_journal: Root directory of the Parquet prediction log
+        donnees: Recent predictions, when there is no log
+        chemin_modele: Model file to evaluate; classification is skipped if None
+        chemin_labels: CSV file of labelled passengers
+        moteur: Drift engine ("evidently" or "numpy")
+
+    Returns:
+        Dictionary with "drift", "classification" (None if skipped) and
+        "durations" (seconds spent in each step)
+    """
+    durees = {}
+    debut = time.perf_counter()
+    profil = charger_profil(chemin_reference, dossier_profil, nb_bins=nb_bins)
+    if dossier_journal is not None:
+        donnees = lire_predictions(dossier_journal, debut=datetime.fromtimestamp(depuis, tz=timezone.utc))
+    elif donnees is None:
+        donnees = pd.DataFrame(columns=COLONNES)
+    durees["load"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    drift = evaluer_drift(profil, donnees, min_lignes, moteur)
+    durees["drift"] = time.perf_counter() - debut
+
+    classification = None
+    if chemin_modele is not None:
+        debut = time.perf_counter()
+        classification = evaluer_classification(profil, chemin_modele, chemin_labels)
+        durees["classification"] = time.perf_counter() - debut
+
+    return {"drift": drift, "classification": classification, "durations": durees}
+
+
+def executer_rapport(
+    rapport: str,
+    dossier_sortie: Path,
+    chemin_reference: Path,
+    dossier_profil: Path,
+    nb_bins: int,
+    depuis: Optional[float] = None,
+    jusqu_a: Optional[float] = None,
+    dossier_journal: Optional[Path] = None,
+    donnees: Optional[pd.DataFrame] = None,
+    chemin_modele: Optional[Path] = None,
+    chemin_labels: Optional[Path] = None,
+    taille_echantillon: Optional[int] = None,
+    moteur: str = "evidently"
+) -> dict:
+    """
+    Run the report of a report job and write its results to `dossier_sortie`.
+
+    The drift report compares the predictions made in [depuis, jusqu_a),
+    read from the Parquet prediction log when `dossier_journal` is given or
+    taken from `donnees`, with the reference. The classification and
+    complete reports need true labels: they score the labelled dataset
+    `chemin_labels` with the model file.
+
+    Args:
+        rapport: "drift", "classification" or "complet"
+        dossier_sortie: Directory of the job, receiving "result.json" and the HTML files
+        chemin_reference: CSV file of the reference dataset
+        dossier_profil: Directory of its profile
+        nb_bins: Number of quantile bins of the profile
+        depuis: Start of the window (seconds since the epoch, optional)
+        jusqu_a: End of the window (seconds since the epoch, optional)
+        dossier_journal: Root directory of the Parquet prediction log
+        donnees: Predictions of the window, when there is no log
+        chemin_modele: Model file, for the classification and complete reports
+        chemin_labels: CSV file of labelled passengers
+        taille_echantillon: Maximum rows of each dataset of the reports
+        moteur: Drift engine ("evidently" or "numpy")
+
+    Returns:
+        Dictionary with "rows" (rows of current data), "summary", "files"
+        (HTML files written), "started_at" (seconds since the epoch) and
+        "duration" (seconds)
+
+    Raises:
+        ValueError: If the report is unknown or the window has no predictions
+    """
+    debut, chrono = time.time(), time.perf_counter()
+    dossier_sortie = Path(dossier_sortie)
+    dossier_sortie.mkdir(parents=True, exist_ok=True)
+    profil = charger_profil(chemin_reference, dossier_profil, nb_bins=nb_bins)
+
+    if rapport == "drift":
+        if dossier_journal is not None:
+            donnees = lire_predictions(
+                dossier_journal,
+                debut=datetime.fromtimestamp(depuis, tz=timezone.utc) if depuis else None,
+                fin=datetime.fromtimestamp(jusqu_a, tz=timezone.utc) if jusqu_a else None,
+            )
+        elif donnees is None:
+            donnees = pd.DataFrame(columns=COLONNES)
+        if len(donnees) == 0:
+            raise ValueError("Aucune prédiction dans la fenêtre demandée")
+        fichier = dossier_sortie / "drift_report.html" if moteur == "evidently" else None
+        resultats = generer_rapport_drift(
+            reference_data=profil if moteur == "numpy" else profil.dataframe(COLONNES),
+            current_data=donnees[COLONNES].astype("float64"),
+            output_path=fichier,
+            mettre_a_jour_metriques=False,
+            moteur=moteur,
+            taille_echantillon=taille_echantillon,
+        )
+        resume = resumer_rapport_drift(resultats)
+        fichiers = {"drift": fichier} if fichier else {}
+        lignes = len(donnees)
+    elif rapport in ("classification", "complet"):
+        reference, courant = donnees_labellisees(profil, chemin_modele, chemin_labels)
+        lignes = len(courant)
+        if rapport == "classification":
+            fichier = dossier_sortie / "classification_report.html"
+            resultats = generer_rapport_classification(
+                reference_data=reference,
+                current_data=courant,
+                target_column=CIBLE,
+                prediction_column="prediction",
+                output_path=fichier,
+                taille_echantillon=taille_echantillon,
+            )
+            resume = resumer_rapport_classification(resultats)
+            fichiers = {"classification": fichier}
+        else:
+            resultats = generer_rapport_complet(
+                reference,
+                courant,
+                CIBLE,
+                "prediction",
+                report_dir=dossier_sortie,
+                taille_echantillon=taille_echantillon,
+                en_parallele=False,
+            )
+            resume = {
+                "classification": resumer_rapport_classification(resultats["classification"]),
+                "drift": resumer_rapport_drift(resultats["drift"]),
+            }
+            fichiers = resultats["fichiers"]
+    else:
+        raise ValueError(f"Rapport inconnu: {rapport} (attendu: drift, classification ou complet)")
+
+    (dossier_sortie / "result.json").write_text(json.dumps(resultats, default=str))
+    return {
+        "rows": lignes,
+        "summary": resume,
+        "files": {nom: str(chemin) for nom, chemin in fichiers.items()},
+        "started_at": debut,
+        "duration": time.perf_counter() - chrono,
+    }
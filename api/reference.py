@@ -0,0 +1,235 @@
+"""
+Reference-distribution profiles.
+A reference dataset is profiled once (quantiles, histograms, category
+frequencies, row count, schema hash) and stored on disk next to the model,
+with its columns as .npy files memory-mapped on load. The live drift
+monitor and the reports reuse the profile instead of reading and profiling
+the CSV again.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Format of the profile files; profiles of another version are rebuilt
+VERSION_PROFIL = 1
+
+# Columns with at most this many distinct values also get category frequencies
+MAX_CATEGORIES = 20
+
+# Quantiles stored for every column
+QUANTILES = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+
+def lire_reference(chemin: Path) -> pd.DataFrame:
+    """
+    Read a reference CSV, dropping the index column written by pandas.
+
+    Args:
+        chemin: CSV file of the reference dataset
+
+    Returns:
+        DataFrame of the numeric columns
+    """
+    df = pd.read_csv(chemin)
+    df = df.drop(columns=[c for c in df.columns if c == "" or c.startswith("Unnamed")])
+    return df.select_dtypes("number")
+
+
+def _profiler_colonne(valeurs: np.ndarray, nb_bins: int) -> dict:
+    """
+    Summarize one numeric column.
+
+    Histogram bins are open-ended at both ends, with the quantiles of the
+    column as inner edges: a value v falls in bin
+    `searchsorted(bin_edges, v, side="right")`.
+
+    Args:
+        valeurs: Values of the column, without missing values
+        nb_bins: Number of quantile bins of the histogram
+
+    Returns:
+        Dictionary of statistics
+    """
+    bornes = np.unique(np.quantile(valeurs, np.linspace(0, 1, nb_bins + 1)[1:-1]))
+    resume = {
+        "count": int(len(valeurs)),
+        "mean": float(valeurs.mean()),
+        "std": float(valeurs.std()),
+        "min": float(valeurs.min()),
+        "max": float(valeurs.max()),
+        "quantiles": {f"{q:g}": float(v) for q, v in zip(QUANTILES, np.quantile(valeurs, QUANTILES))},
+        "bin_edges": bornes.tolist(),
+        "histogram": np.bincount(
+            np.searchsorted(bornes, valeurs, side="right"), minlength=len(bornes) + 1
+        ).tolist(),
+    }
+    categories, comptes = np.unique(valeurs, return_counts=True)
+    if len(categories) <= MAX_CATEGORIES:
+        resume["categories"] = categories.tolist()
+        resume["counts"] = comptes.tolist()
+        resume["frequencies"] = (comptes / comptes.sum()).tolist()
+    return resume
+
+
+class ProfilReference:
+    """
+    Profile of a reference dataset, loaded from its directory.
+
+    Attributes:
+        dossier: Directory holding "profile.json" and the column files
+        meta: Content of "profile.json": source and schema hashes, row count,
+            number of bins and the statistics of each column
+        colonnes: Values of each column, memory-mapped
+        valeurs_triees: Sorted values of each column (missing values removed),
+            memory-mapped
+    """
+
+    def __init__(self, dossier: Path, meta: dict):
+        self.dossier = Path(dossier)
+        self.meta = meta
+        self.colonnes = {}
+        self.valeurs_triees = {}
+        for nom in meta["columns"]:
+            self.colonnes[nom] = np.load(self.dossier / f"{nom}.npy", mmap_mode="r")
+            self.valeurs_triees[nom] = np.load(self.dossier / f"{nom}.sorted.npy", mmap_mode="r")
+
+    @property
+    def nb_lignes(self) -> int:
+        """
+        Number of rows of the reference dataset.
+        """
+        return self.meta["rows"]
+
+    def statistiques(self, colonne: str) -> dict:
+        """
+        Get the statistics of a column (see `_profiler_colonne`).
+        """
+        return self.meta["columns"][colonne]
+
+    def dataframe(self, colonnes: Optional[list] = None) -> pd.DataFrame:
+        """
+        Build a DataFrame over the memory-mapped columns, e.g. for Evidently.
+
+        The columns are not copied: the DataFrame is read-only.
+
+        Args:
+            colonnes: Columns to include, all by default
+
+        Returns:
+            DataFrame of the reference dataset
+        """
+        colonnes = colonnes or list(self.colonnes)
+        return pd.DataFrame({nom: self.colonnes[nom] for nom in colonnes}, copy=False)
+
+
+def construire_profil(df: pd.DataFrame, dossier: Path, nb_bins: int = 10, meta: Optional[dict] = None) -> ProfilReference:
+    """
+    Profile a reference DataFrame and write the profile to a directory.
+
+    Files are written under temporary names and renamed, "profile.json"
+    last, so a reader never sees a partial profile.
+
+    Args:
+        df: Reference data (numeric columns)
+        dossier: Directory of the profile
+        nb_bins: Number of quantile bins of the histograms
+        meta: Extra entries stored in "profile.json" (e.g. the source hash)
+
+    Returns:
+        The written profile, memory-mapped
+    """
+    dossier = Path(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+    schema = [(nom, str(dtype)) for nom, dtype in df.dtypes.items()]
+    contenu = {
+        **(meta or {}),
+        "version": VERSION_PROFIL,
+        "schema_sha256": hashlib.sha256(json.dumps(schema).encode()).hexdigest(),
+        "rows": int(len(df)),
+        "bins": nb_bins,
+        "columns": {},
+    }
+
+    suffixe = f".{os.getpid()}.tmp"
+    for nom in df.columns:
+        valeurs = df[nom].to_numpy(dtype=np.float64)
+        presentes = valeurs[~np.isnan(valeurs)]
+        contenu["columns"][nom] = _profiler_colonne(presentes, nb_bins)
+        for fichier, tableau in ((f"{nom}.npy", valeurs), (f"{nom}.sorted.npy", np.sort(presentes))):
+            temporaire = dossier / (fichier + suffixe)
+            with open(temporaire, "wb") as sortie:
+                np.save(sortie, tableau)
+            os.replace(temporaire, dossier / fichier)
+
+    temporaire = dossier / ("profile.json" + suffixe)
+    temporaire.write_text(json.dumps(contenu, indent=2))
+    os.replace(temporaire, dossier / "profile.json")
+    return ProfilReference(dossier, contenu)
+
+
+def charger_profil(source: Path, dossier: Path, nb_bins: int = 10) -> ProfilReference:
+    """
+    Load the profile of a reference CSV, building it if missing or outdated.
+
+    The profile is reused as long as the CSV content, the profile format
+    and the number of bins are unchanged.
+
+    Args:
+        source: CSV file of the reference dataset
+        dossier: Directory of the profile
+        nb_bins: Number of quantile bins of the histograms
+
+    Returns:
+        Profile of the reference dataset
+    """
+    # Imported here: api.model_manager imports api.metrics, which imports this module
+    from api.model_manager import calculer_empreinte
+
+    source = Path(source)
+    dossier = Path(dossier)
+    empreinte = calculer_empreinte(source)
+    try:
+        meta = json.loads((dossier / "profile.json").read_text())
+        if (meta.get("source_sha256"), meta.get("version"), meta.get("bins")) == (empreinte, VERSION_PROFIL, nb_bins):
+            return ProfilReference(dossier, meta)
+    except (OSError, ValueError, KeyError) as e:
+        logger.info(f"Profil de référence {dossier} à construire: {e}")
+
+    logger.info(f"Construction du profil de référence de {source} dans {dossier}")
+    return construire_profil(
+        lire_reference(source),
+        dossier,
+        nb_bins,
+        meta={"source": source.name, "source_sha256": empreinte},
+    )
+
+
+def dossier_profil(source: Path, racine: Path) -> Path:
+    """
+    Directory of the profile of a reference CSV under a root directory.
+
+    Args:
+        source: CSV file of the reference dataset
+        racine: Root directory of the profiles (next to the model)
+
+    Returns:
+        "<racine>/<CSV name without extension>"
+    """
+    return Path(racine) / Path(source).stem
+
+
+def comme_dataframe(donnees) -> pd.DataFrame:
+    """
+    Get a DataFrame from a DataFrame or a `ProfilReference`.
+    """
+    if isinstance(donnees, ProfilReference):
+        return donnees.dataframe()
+    return donnees
+
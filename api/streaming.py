@@ -0,0 +1,206 @@
+"""
+Streaming NDJSON batch scoring.
+Reads passengers line by line from the request body, scores them in
+fixed-size chunks and streams the predictions back, so memory stays flat
+whatever the number of passengers.
+"""
+
+import json
+import math
+import time
+from typing import AsyncIterator
+
+import numpy as np
+from loguru import logger
+from starlette.responses import StreamingResponse
+
+from api import config
+from api.executor import executer_inference
+from api.metrics import enregistrer_erreur, enregistrer_predictions_lot
+from api.observation import observer_predictions
+from api.predict import columns_to_array, manager
+
+
+class ReponseNDJSON(StreamingResponse):
+    """
+    Streaming response whose body iterator also consumes the request body.
+
+    StreamingResponse normally listens for client disconnection on
+    `receive` while streaming; here the body iterator reads the request
+    through the same channel, so that listener would steal request chunks.
+    Disconnections still surface through `request.stream()`.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _lire_ligne(ligne: bytes) -> tuple:
+    """
+    Parse and validate one NDJSON passenger.
+
+    Args:
+        ligne: Raw JSON line, e.g. b'{"Sex": "F", "Fare": 23.45}'
+
+    Returns:
+        Tuple (sex, fare)
+
+    Raises:
+        ValueError: If the line is not a valid passenger, e.g. a fare of
+            1e400 (parsed as inf) or an integer too large for a float
+    """
+    passager = json.loads(ligne)
+    if not isinstance(passager, dict):
+        raise ValueError("Each line must be a JSON object")
+    sex = passager.get("Sex")
+    if not isinstance(sex, str) or sex.upper() not in ("M", "F"):
+        raise ValueError("Sex must be 'M' or 'F'")
+    fare = passager.get("Fare")
+    if isinstance(fare, bool) or not isinstance(fare, (int, float)):
+        raise ValueError("Fare must be a number")
+    try:
+        fare = float(fare)
+    except OverflowError:
+        raise ValueError("Fare must be a finite number")
+    if not math.isfinite(fare):
+        raise ValueError("Fare must be a finite number")
+    return sex, fare
+
+
+def _element(ligne: bytes, numero: int):
+    """
+    Decode one NDJSON line into a chunk element.
+
+    Args:
+        ligne: Raw line
+        numero: Position of the line in the stream (from 1)
+
+    Returns:
+        Tuple (sex, fare), or the error returned for the line: a message
+        for an invalid passenger, {"error": ..., "status": 413} for a line
+        longer than `STREAM_MAX_LINE_BYTES`
+    """
+    if len(ligne) > config.STREAM_MAX_LINE_BYTES:
+        enregistrer_erreur("stream_line_too_long")
+        return {"error": f"line {numero}: longer than {config.STREAM_MAX_LINE_BYTES} bytes", "status": 413}
+    try:
+        return _lire_ligne(ligne)
+    except ValueError as e:
+        enregistrer_erreur("stream_validation_error")
+        return f"line {numero}: {e}"
+
+
+def _predire_bloc(sexes: list, fares: list) -> tuple:
+    """
+    Score one chunk, record its metrics and feed the in-process monitors.
+
+    Args:
+        sexes: Sex column of the chunk
+        fares: Fare column of the chunk
+
+    Returns:
+        Tuple (predicted labels, confidences) as lists
+    """
+    modele = manager.engine
+    features = columns_to_array(sexes, fares)
+    debut = time.perf_counter()
+    indices, probas = modele.predict(features)
+    latence = time.perf_counter() - debut
+
+    labels = modele.labels[indices]
+    confidences = probas[np.arange(len(indices)), indices]
+    enregistrer_predictions_lot(
+        model_version=modele.version,
+        prediction_classes=np.char.lower(labels),
+        confidences=confidences,
+        latency=latence,
+        endpoint="predict_many_stream"
+    )
+    observer_predictions(modele.version, features, labels, confidences, latence)
+    return labels.tolist(), confidences.tolist()
+
+
+async def _traiter_bloc(bloc: list) -> bytes:
+    """
+    Score the valid passengers of a chunk and serialize the chunk in order.
+
+    Args:
+        bloc: List of (sex, fare) tuples, or errors for invalid lines
+
+    Returns:
+        NDJSON encoded results, one line per input line
+    """
+    valides = [element for element in bloc if isinstance(element, tuple)]
+    labels, confidences = [], []
+    if valides:
+        sexes, fares = zip(*valides)
+        labels, confidences = await executer_inference(_predire_bloc, list(sexes), list(fares))
+
+    sortie = []
+    position = 0
+    for element in bloc:
+        if isinstance(element, tuple):
+            sortie.append(json.dumps({"prediction": labels[position], "confidence": confidences[position]}))
+            position += 1
+        else:
+            sortie.append(json.dumps(element if isinstance(element, dict) else {"error": element}))
+    return ("\n".join(sortie) + "\n").encode()
+
+
+async def generer_predictions_ndjson(corps: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Stream NDJSON predictions for an NDJSON stream of passengers.
+
+    Lines are grouped in chunks of `STREAM_CHUNK_SIZE` passengers. Each
+    output line matches the input line at the same position: either
+    {"prediction": ..., "confidence": ...} or {"error": ...} for an invalid
+    line. Blank lines are ignored. A line longer than
+    `STREAM_MAX_LINE_BYTES` gets {"error": ..., "status": 413} and the
+    rest of it is skipped as it arrives, so a body without newlines cannot
+    grow the buffer.
+
+    Args:
+        corps: Request body, as an async iterator of byte chunks
+
+    Yields:
+        NDJSON encoded results
+    """
+    reste = b""
+    ignorer = False
+    bloc = []
+    nb_lignes = 0
+
+    async for morceau in corps:
+        lignes = (reste + morceau).split(b"\n")
+        reste = lignes.pop()
+        if ignorer:
+            # End of a line already answered as too long
+            if not lignes:
+                reste = b""
+                continue
+            lignes.pop(0)
+            ignorer = False
+        if len(reste) > config.STREAM_MAX_LINE_BYTES:
+            lignes.append(reste)
+            reste = b""
+            ignorer = True
+        for ligne in lignes:
+            if not ligne.strip():
+                continue
+            nb_lignes += 1
+            bloc.append(_element(ligne, nb_lignes))
+            if len(bloc) >= config.STREAM_CHUNK_SIZE:
+                yield await _traiter_bloc(bloc)
+                bloc = []
+
+    if reste.strip():
+        nb_lignes += 1
+        bloc.append(_element(reste, nb_lignes))
+    if bloc:
+        yield await _traiter_bloc(bloc)
+
+    logger.info(f"Flux NDJSON traité: {nb_lignes} lignes")
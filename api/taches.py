@@ -0,0 +1,429 @@
+"""
+Asynchronous report jobs.
+A job generates a drift, classification or complete report in a process
+pool: submitting it returns an ID right away, its state and results are
+persisted under "reports/jobs/<id>/" so any worker can answer a poll.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from api import config
+from api.echantillons import echantillons
+from api.historique import historique
+from api.journal import journal
+from api.metrics import enregistrer_tache_rapport, mettre_a_jour_taches_rapports
+from api.predict import BASE_DIR, DATA_DIR, MODEL_PATH, manager
+from api.rapports import executer_rapport
+from api.reference import dossier_profil
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Reports a job can generate
+RAPPORTS = ("drift", "classification", "complet")
+
+# Finished jobs kept in memory; older ones are still read from disk
+MAX_TACHES_MEMOIRE = 1000
+
+
+class TachesSaturees(RuntimeError):
+    """
+    Raised when the limit of pending and running jobs is reached.
+    """
+
+
+class GestionnaireTaches:
+    """
+    Submit report jobs to a bounded process pool and track them.
+
+    At most `nb_workers` jobs run at once, in processes started with
+    "spawn" and reused from one job to the next, so reports never compete
+    with serving for the GIL. At most `max_actives` jobs can be pending or
+    running across all the API workers: past that, `soumettre` raises
+    `TachesSaturees`. A job identical to a pending or running one (same
+    report, window, sample size and model), submitted by any worker, is not
+    submitted again: its ID is returned.
+
+    Each job has a directory with "job.json" (its state, written at
+    submission and at the end), "result.json" and the HTML files. Each
+    pending or running job also has a key file "actives/<hash>.json",
+    created with O_EXCL and removed at the end, which the workers share for
+    deduplication and the limit. A worker holds a lock on
+    "workers/<token>.lock" while it lives: the jobs of a worker whose lock
+    is free were lost with it and are marked as errors when read.
+
+    Attributes:
+        dossier: Root directory of the jobs
+        nb_workers: Number of processes running the jobs
+        max_actives: Maximum number of pending and running jobs
+    """
+
+    def __init__(self, dossier: Path, nb_workers: int = 1, max_actives: int = 8):
+        self.dossier = Path(dossier)
+        self.nb_workers = max(1, nb_workers)
+        self.max_actives = max(1, max_actives)
+        self._pool = None
+        self._taches = {}
+        self._futures = {}
+        self._verrou = threading.Lock()
+        self._jeton = None
+        self._fichier_jeton = None
+
+    def _obtenir_pool(self) -> ProcessPoolExecutor:
+        """
+        Get the job process pool, creating it on first use.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.nb_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _parametres(self, rapport: str, depuis: float, jusqu_a: Optional[float], taille_echantillon: Optional[int]) -> dict:
+        """
+        Build the arguments of `executer_rapport` for a job.
+        """
+        chemin_reference = DATA_DIR / config.DRIFT_REFERENCE_FILE
+        parametres = {
+            "rapport": rapport,
+            "chemin_reference": chemin_reference,
+            "dossier_profil": dossier_profil(chemin_reference, config.REFERENCE_PROFILE_DIR or MODEL_PATH.parent / "profiles"),
+            "nb_bins": config.DRIFT_FARE_BINS,
+            "taille_echantillon": taille_echantillon,
+            "moteur": config.MONITOR_DRIFT_ENGINE,
+        }
+        if rapport == "drift":
+            parametres.update(depuis=depuis, jusqu_a=jusqu_a)
+            if journal is not None:
+                parametres["dossier_journal"] = journal.dossier
+            else:
+                if echantillons is not None:
+                    donnees = echantillons.echantillon(depuis=depuis, taille=taille_echantillon or config.REPORT_SAMPLE_SIZE or None)
+                else:
+                    donnees = historique.dataframe(depuis=depuis)
+                if jusqu_a is not None:
+                    donnees = donnees[donnees["timestamp"] < jusqu_a]
+                parametres["donnees"] = donnees
+        else:
+            parametres["chemin_modele"] = manager.chemin
+            parametres["chemin_labels"] = DATA_DIR / config.MONITOR_LABELLED_FILE
+        return parametres
+
+    @contextmanager
+    def _verrouiller(self):
+        """
+        Hold the job lock of this process and of all the workers.
+        """
+        with self._verrou:
+            if fcntl is None:
+                yield
+                return
+            self.dossier.mkdir(parents=True, exist_ok=True)
+            with open(self.dossier / "actives.lock", "a") as fichier:
+                fcntl.flock(fichier, fcntl.LOCK_EX)
+                yield
+
+    def _proprietaire(self) -> Optional[str]:
+        """
+        Token of this process, whose lock file is held while it lives.
+        """
+        if self._jeton is None and fcntl is not None:
+            jeton = uuid.uuid4().hex
+            chemin = self.dossier / "workers" / f"{jeton}.lock"
+            chemin.parent.mkdir(parents=True, exist_ok=True)
+            fichier = open(chemin, "a")
+            fcntl.flock(fichier, fcntl.LOCK_EX)
+            self._jeton, self._fichier_jeton = jeton, fichier
+        return self._jeton
+
+    def _vivant(self, jeton: Optional[str]) -> bool:
+        """
+        Whether the worker with this token still runs (True when unknown).
+        """
+        if jeton is None or fcntl is None or jeton == self._jeton:
+            return True
+        chemin = self.dossier / "workers" / f"{jeton}.lock"
+        try:
+            fichier = open(chemin, "r")
+        except FileNotFoundError:
+            return False
+        except OSError:
+            return True
+        with fichier:
+            try:
+                fcntl.flock(fichier, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            chemin.unlink(missing_ok=True)
+            return False
+
+    def _lire(self, identifiant: str) -> Optional[dict]:
+        """
+        Read the state of a job from its directory.
+        """
+        try:
+            return json.loads((self.dossier / identifiant / "job.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _abandonner(self, identifiant: str) -> Optional[dict]:
+        """
+        Mark a job of a stopped worker as an error (the caller holds the locks).
+        """
+        tache = self._lire(identifiant)
+        if tache is not None and tache["status"] in ("pending", "running"):
+            fin = time.time()
+            tache.update(status="error", error="Tâche perdue: le worker qui l'exécutait s'est arrêté",
+                         finished_at=fin, duration=fin - tache["submitted_at"])
+            self._ecrire(tache)
+            logger.warning(f"Tâche de rapport {identifiant} perdue avec son worker")
+        return tache
+
+    def _actives(self) -> dict:
+        """
+        Pending and running jobs of all the workers by request key, dropping
+        those of stopped workers (the caller holds the locks).
+        """
+        actives = {}
+        for chemin in (self.dossier / "actives").glob("*.json"):
+            try:
+                active = json.loads(chemin.read_text())
+            except (OSError, ValueError):
+                continue
+            if self._vivant(active["worker"]):
+                actives[chemin.stem] = active["id"]
+            else:
+                chemin.unlink(missing_ok=True)
+                self._abandonner(active["id"])
+        return actives
+
+    def _reserver(self, cle: str, identifiant: str) -> None:
+        """
+        Create the key file of a pending job (the caller holds the locks).
+
+        Raises:
+            FileExistsError: If a job with this key is already active
+        """
+        dossier = self.dossier / "actives"
+        dossier.mkdir(parents=True, exist_ok=True)
+        descripteur = os.open(dossier / f"{cle}.json", os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        with os.fdopen(descripteur, "w") as fichier:
+            json.dump({"id": identifiant, "worker": self._jeton}, fichier)
+
+    def _ecrire(self, tache: dict) -> None:
+        """
+        Persist the state of a job in its directory.
+        """
+        try:
+            dossier = self.dossier / tache["id"]
+            dossier.mkdir(parents=True, exist_ok=True)
+            temporaire = dossier / f"job.json.{os.getpid()}.tmp"
+            temporaire.write_text(json.dumps(tache, default=str))
+            os.replace(temporaire, dossier / "job.json")
+        except OSError as e:
+            logger.warning(f"État de la tâche {tache['id']} non sauvegardé: {e}")
+
+    def soumettre(
+        self,
+        rapport: str,
+        depuis: Optional[float] = None,
+        jusqu_a: Optional[float] = None,
+        taille_echantillon: Optional[int] = None
+    ) -> tuple:
+        """
+        Submit a report job, or find the identical pending one.
+
+        Args:
+            rapport: "drift", "classification" or "complet"
+            depuis: Start of the window of the drift report (seconds since
+                the epoch), defaults to `MONITOR_WINDOW_S` seconds ago
+            jusqu_a: End of the window (optional)
+            taille_echantillon: Maximum rows of each dataset of the reports
+
+        Returns:
+            Tuple (job, True if an identical pending job was returned)
+
+        Raises:
+            ValueError: If the report is unknown
+            TachesSaturees: If `max_actives` jobs are pending or running
+        """
+        if rapport not in RAPPORTS:
+            raise ValueError(f"Rapport inconnu: {rapport} (attendu: {', '.join(RAPPORTS)})")
+        demande = {"report": rapport, "since": depuis, "until": jusqu_a, "sample_size": taille_echantillon}
+        cle = hashlib.sha256(json.dumps({**demande, "model": manager.version}, sort_keys=True).encode()).hexdigest()
+
+        with self._verrouiller():
+            actives = self._actives()
+            identifiant = actives.get(cle)
+            if identifiant is not None:
+                enregistrer_tache_rapport(rapport, "deduplicated")
+                return self._etat(identifiant) or self._lire(identifiant), True
+            if len(actives) >= self.max_actives:
+                enregistrer_tache_rapport(rapport, "rejected")
+                raise TachesSaturees(f"{len(actives)} tâches de rapport déjà en attente ou en cours")
+
+            maintenant = time.time()
+            depuis = maintenant - config.MONITOR_WINDOW_S if depuis is None else depuis
+            parametres = self._parametres(rapport, depuis, jusqu_a, taille_echantillon)
+            identifiant = uuid.uuid4().hex
+            parametres["dossier_sortie"] = self.dossier / identifiant
+            tache = {
+                "id": identifiant,
+                "report": rapport,
+                "request": demande,
+                "model_version": manager.version,
+                "status": "pending",
+                "submitted_at": maintenant,
+                "worker": self._proprietaire(),
+            }
+            self._taches[identifiant] = tache
+            self._ecrire(tache)
+            self._reserver(cle, identifiant)
+            try:
+                try:
+                    future = self._obtenir_pool().submit(executer_rapport, **parametres)
+                except BrokenProcessPool:
+                    self._pool = None
+                    future = self._obtenir_pool().submit(executer_rapport, **parametres)
+            except Exception:
+                (self.dossier / "actives" / f"{cle}.json").unlink(missing_ok=True)
+                del self._taches[identifiant]
+                raise
+            self._futures[identifiant] = future
+            mettre_a_jour_taches_rapports(len(self._futures))
+        enregistrer_tache_rapport(rapport, "submitted")
+        logger.info(f"Tâche de rapport {rapport} soumise: {identifiant}")
+        future.add_done_callback(lambda f: self._terminer(identifiant, cle, f))
+        return dict(tache), False
+
+    def _terminer(self, identifiant: str, cle: str, future) -> None:
+        """
+        Record the end of a job (called by the pool when its future is done).
+        """
+        fin = time.time()
+        with self._verrouiller():
+            tache = self._taches[identifiant]
+            (self.dossier / "actives" / f"{cle}.json").unlink(missing_ok=True)
+            self._futures.pop(identifiant, None)
+            mettre_a_jour_taches_rapports(len(self._futures))
+            try:
+                resultat = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._pool = None
+                tache.update(status="error", error=str(e), finished_at=fin, duration=fin - tache["submitted_at"])
+                attente = None
+            else:
+                duree = resultat.pop("duration")
+                debut = resultat.pop("started_at")
+                attente = max(0.0, debut - tache["submitted_at"])
+                tache.update(status="success", started_at=debut, finished_at=fin, duration=duree, result=resultat)
+            self._ecrire(tache)
+            self._oublier()
+        enregistrer_tache_rapport(tache["report"], tache["status"], tache["duration"], attente)
+        if tache["status"] == "error":
+            logger.error(f"Erreur de la tâche de rapport {identifiant}: {tache['error']}")
+        else:
+            logger.info(f"Tâche de rapport {identifiant} terminée en {tache['duration']:.2f}s")
+
+    def _oublier(self) -> None:
+        """
+        Drop the oldest finished jobs from memory past `MAX_TACHES_MEMOIRE`.
+        """
+        terminees = [i for i, t in self._taches.items() if t["status"] in ("success", "error")]
+        for identifiant in terminees[:max(0, len(terminees) - MAX_TACHES_MEMOIRE)]:
+            del self._taches[identifiant]
+
+    def _etat(self, identifiant: str) -> Optional[dict]:
+        """
+        State of a job known to this process (the caller holds the lock).
+        """
+        tache = self._taches.get(identifiant)
+        if tache is None:
+            return None
+        tache = dict(tache)
+        future = self._futures.get(identifiant)
+        if tache["status"] == "pending" and future is not None and future.running():
+            tache["status"] = "running"
+        return tache
+
+    def obtenir(self, identifiant: str) -> Optional[dict]:
+        """
+        Get the state of a job.
+
+        Jobs of other workers, or dropped from memory, are read from disk;
+        a pending or running job whose worker stopped is marked as an error.
+
+        Args:
+            identifiant: Job ID
+
+        Returns:
+            Job with "status" ("pending", "running", "success" or "error"),
+            its request, times and, once done, "result" (summary and HTML
+            files) or "error"; None if the job is unknown
+        """
+        with self._verrou:
+            tache = self._etat(identifiant)
+        if tache is not None:
+            return tache
+        if not identifiant.isalnum():
+            return None
+        tache = self._lire(identifiant)
+        if tache is not None and tache["status"] in ("pending", "running") and not self._vivant(tache.get("worker")):
+            with self._verrouiller():
+                tache = self._abandonner(identifiant)
+        return tache
+
+    def fichier_resultat(self, identifiant: str, nom: Optional[str] = None) -> Optional[Path]:
+        """
+        Get a result file of a successful job.
+
+        Args:
+            identifiant: Job ID
+            nom: HTML report ("drift" or "classification"), or None for
+                the JSON results
+
+        Returns:
+            Path of the file, or None if the job did not succeed or has no such file
+        """
+        tache = self.obtenir(identifiant)
+        if tache is None or tache["status"] != "success":
+            return None
+        if nom is None:
+            chemin = self.dossier / identifiant / "result.json"
+        else:
+            chemin = tache["result"]["files"].get(nom)
+        return Path(chemin) if chemin and Path(chemin).exists() else None
+
+    def arreter(self) -> None:
+        """
+        Stop the job processes, cancelling the pending jobs.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._fichier_jeton is not None:
+            (self.dossier / "workers" / f"{self._jeton}.lock").unlink(missing_ok=True)
+            self._fichier_jeton.close()
+            self._fichier_jeton = None
+            self._jeton = None
+
+
+taches = GestionnaireTaches(
+    Path(config.REPORT_JOBS_DIR or BASE_DIR / "reports" / "jobs"),
+    nb_workers=config.REPORT_JOB_WORKERS,
+    max_actives=config.REPORT_JOB_MAX_ACTIVE,
+)
@@ -0,0 +1,110 @@
+"""
+Script to benchmark the drift engines.
+Compares an Evidently DataDriftPreset report (run directly, without the
+report cache) with the vectorized NumPy engine on growing windows of
+production data.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from evidently import Report
+from evidently.presets import DataDriftPreset
+
+from api.metrics import calculer_drift_numpy, resumer_rapport_drift
+from api.metrics.monitoring import _resultats_rapport
+
+TAILLES = (10_000, 1_000_000, 10_000_000)
+TAILLE_REFERENCE = 100_000
+
+
+def generer_donnees(nb_lignes, decalage=0.0, graine=42):
+    """
+    Generate random predictions with the monitored columns.
+
+    Args:
+        nb_lignes: Number of rows
+        decalage: Shift added to Fare
+        graine: Random seed
+
+    Returns:
+        DataFrame with the columns Sex, Fare and prediction
+    """
+    rng = np.random.default_rng(graine)
+    sexes = rng.integers(0, 2, nb_lignes).astype(np.float64)
+    fares = rng.exponential(30.0, nb_lignes) + decalage
+    return pd.DataFrame({
+        "Sex": sexes,
+        "Fare": fares,
+        "prediction": ((sexes == 1) | (fares > 50)).astype(np.float64),
+    })
+
+
+def chronometrer(fonction):
+    """
+    Return the wall-clock time and the result of one call.
+
+    Args:
+        fonction: Function to benchmark
+
+    Returns:
+        Tuple (duration in seconds, result)
+    """
+    debut = time.perf_counter()
+    resultat = fonction()
+    return time.perf_counter() - debut, resultat
+
+
+def rapport_evidently(reference, courant):
+    """
+    Run the Evidently drift report, without the report cache.
+    """
+    return _resultats_rapport(Report(metrics=[DataDriftPreset()]).run(reference_data=reference, current_data=courant))
+
+
+def main():
+    """
+    Run the benchmark on each window size.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark des moteurs de drift")
+    parser.add_argument("--max-lignes", type=int, default=TAILLES[-1], help="Taille maximale des fenêtres testées")
+    parser.add_argument("--sans-evidently", action="store_true", help="Ne mesurer que le moteur numpy")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BENCHMARK DES MOTEURS DE DRIFT")
+    print("=" * 70)
+    print()
+
+    reference = generer_donnees(TAILLE_REFERENCE, graine=0)
+    print(f"🔬 Référence de {TAILLE_REFERENCE} lignes, fenêtre avec Fare décalé de 5")
+    for nb_lignes in (t for t in TAILLES if t <= args.max_lignes):
+        courant = generer_donnees(nb_lignes, decalage=5.0)
+        duree_numpy, resultats = chronometrer(lambda: calculer_drift_numpy(reference, courant))
+        ligne = f"   {nb_lignes:>10} lignes : numpy={duree_numpy:8.3f}s"
+        if not args.sans_evidently:
+            duree_evidently, attendus = chronometrer(lambda: rapport_evidently(reference, courant))
+            ligne += f"  evidently={duree_evidently:8.3f}s  (x{duree_evidently / duree_numpy:.0f})"
+            identiques = all(
+                resumer_rapport_drift(resultats)["columns"][c]["drift_detected"]
+                == resumer_rapport_drift(attendus)["columns"][c]["drift_detected"]
+                for c in courant.columns
+            )
+            ligne += "  ✅" if identiques else "  ⚠️  décisions différentes"
+        print(ligne)
+    print()
+
+    print("=" * 70)
+    print("FIN DU BENCHMARK")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
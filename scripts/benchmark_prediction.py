@@ -0,0 +1,233 @@
+"""
+Script to benchmark the inference path of the Titanic API.
+Measures the per-request latency of the prediction functions in-process,
+without HTTP overhead, so that optimisations can be compared.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.models import Passenger, Passengers, PassengersColumns
+from api.predict import (
+    InferenceEngine,
+    pipeline,
+    engine,
+    encode_sex,
+    passengers_to_array,
+    predict_columns,
+    predict_passenger_with_proba,
+    predict_passengers_with_proba,
+)
+
+NB_REPETITIONS = 300
+PASSAGER = {"Sex": "F", "Fare": 23.45}
+
+
+def mesurer(fonction, nb_repetitions=NB_REPETITIONS):
+    """
+    Measure the latency of a function called without arguments.
+
+    Args:
+        fonction: Function to benchmark
+        nb_repetitions: Number of timed calls
+
+    Returns:
+        Array of latencies in seconds
+    """
+    for _ in range(50):
+        fonction()
+
+    latences = np.empty(nb_repetitions)
+    for i in range(nb_repetitions):
+        debut = time.perf_counter()
+        fonction()
+        latences[i] = time.perf_counter() - debut
+    return latences
+
+
+def afficher(nom, latences):
+    """
+    Print latency statistics in microseconds.
+
+    Args:
+        nom: Label of the benchmark
+        latences: Array of latencies in seconds
+    """
+    p50, p95, p99 = np.percentile(latences, [50, 95, 99]) * 1e6
+    print(f"   {nom:<40} p50={p50:8.1f}µs  p95={p95:8.1f}µs  p99={p99:8.1f}µs")
+
+
+def ancienne_prediction_double():
+    """
+    Previous /predict implementation: one predict call, then a second
+    DataFrame and a predict_proba call to get the confidence.
+    """
+    passenger_encoded = dict(PASSAGER)
+    passenger_encoded["Sex"] = encode_sex(PASSAGER["Sex"])
+    prediction = pipeline.predict(pd.DataFrame([passenger_encoded]))[0]
+
+    passenger_encoded = dict(PASSAGER)
+    passenger_encoded["Sex"] = encode_sex(PASSAGER["Sex"])
+    proba = pipeline.predict_proba(pd.DataFrame([passenger_encoded]))[0]
+    return prediction, float(max(proba))
+
+
+def benchmark_passe_unique():
+    """
+    Compare the two-call /predict path with the single predict_proba call.
+    """
+    print("🔬 /predict : double appel vs appel unique a predict_proba")
+    ancien = mesurer(ancienne_prediction_double)
+    nouveau = mesurer(lambda: predict_passenger_with_proba(PASSAGER))
+    afficher("deux appels (predict + predict_proba)", ancien)
+    afficher("un appel (predict_proba)", nouveau)
+    gain = 1 - np.median(nouveau) / np.median(ancien)
+    print(f"   ➡️  Reduction de la latence p50: {gain * 100:.1f}%")
+    print()
+
+
+def benchmark_chemin_numpy():
+    """
+    Compare the DataFrame path with the NumPy fast path for one passenger.
+    """
+    print("🔬 Prediction unitaire : DataFrame vs tableau NumPy")
+    if not engine.fast_path:
+        print("   ⚠️  Pipeline non decomposable, chemin NumPy indisponible")
+        print()
+        return
+
+    passager = Passenger(**PASSAGER)
+    dataframe = mesurer(lambda: engine._predict_proba_dataframe(passengers_to_array([passager])))
+    numpy = mesurer(lambda: engine.predict_proba(passengers_to_array([passager])))
+    afficher("DataFrame + pipeline complet", dataframe)
+    afficher("NumPy + estimateur", numpy)
+    gain = 1 - np.median(numpy) / np.median(dataframe)
+    print(f"   ➡️  Reduction de la latence p50: {gain * 100:.1f}%")
+    print()
+
+
+def generer_passagers(nb_lignes, graine=42):
+    """
+    Generate random passengers.
+
+    Args:
+        nb_lignes: Number of passengers
+        graine: Random seed
+
+    Returns:
+        Tuple (sex column, fare column)
+    """
+    rng = np.random.default_rng(graine)
+    sexes = rng.choice(["M", "F"], size=nb_lignes).tolist()
+    fares = np.round(rng.uniform(5.0, 150.0, size=nb_lignes), 2).tolist()
+    return sexes, fares
+
+
+def chronometrer(fonction, nb_repetitions=3):
+    """
+    Return the best wall-clock time of a function over a few runs.
+
+    Args:
+        fonction: Function to benchmark
+        nb_repetitions: Number of runs
+
+    Returns:
+        Best duration in seconds
+    """
+    meilleur = float("inf")
+    for _ in range(nb_repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def benchmark_format_colonnes():
+    """
+    Compare row-oriented and columnar batch scoring, from JSON body to
+    response, in rows per second.
+    """
+    print("🔬 /predict_many : format lignes vs format colonnes (lignes/s)")
+    for nb_lignes in (1_000, 10_000, 100_000):
+        sexes, fares = generer_passagers(nb_lignes)
+        corps_lignes = json.dumps({"passengers": [{"Sex": s, "Fare": f} for s, f in zip(sexes, fares)]})
+        corps_colonnes = json.dumps({"Sex": sexes, "Fare": fares})
+
+        def lignes():
+            passagers = Passengers.model_validate_json(corps_lignes)
+            resultats = predict_passengers_with_proba(passagers.passengers)
+            return {
+                "predictions": [r["prediction"] for r in resultats],
+                "confidences": [r["confidence"] for r in resultats],
+            }
+
+        def colonnes():
+            colonnes_validees = PassengersColumns.model_validate_json(corps_colonnes)
+            return predict_columns(colonnes_validees.Sex, colonnes_validees.Fare)
+
+        duree_lignes = chronometrer(lignes)
+        duree_colonnes = chronometrer(colonnes)
+        print(
+            f"   {nb_lignes:>7} lignes : lignes={nb_lignes / duree_lignes:>10.0f}/s  "
+            f"colonnes={nb_lignes / duree_colonnes:>10.0f}/s  "
+            f"(x{duree_lignes / duree_colonnes:.2f})"
+        )
+    print()
+
+
+def benchmark_modele_compile():
+    """
+    Compare pipeline.predict_proba with the compiled decision table,
+    for one passenger and in rows per second on large batches.
+    """
+    print("🔬 Modele compile (table de decision) vs pipeline.predict_proba")
+    compile = InferenceEngine(pipeline, compiler=True)
+    if not compile.compiled:
+        print("   ⚠️  Modele non compilable, benchmark ignore")
+        print()
+        return
+
+    ligne = passengers_to_array([Passenger(**PASSAGER)])
+    afficher("pipeline.predict_proba (1 ligne)", mesurer(lambda: compile._predict_proba_pipeline(ligne)))
+    afficher("table compilee (1 ligne)", mesurer(lambda: compile.predict_proba(ligne)))
+
+    for nb_lignes in (10_000, 1_000_000):
+        sexes, fares = generer_passagers(nb_lignes)
+        features = np.column_stack([np.array(sexes) == "F", fares]).astype(np.float64)
+        duree_pipeline = chronometrer(lambda: compile._predict_proba_pipeline(features), nb_repetitions=1)
+        duree_table = chronometrer(lambda: compile.predict_proba(features))
+        print(
+            f"   {nb_lignes:>9} lignes : pipeline={nb_lignes / duree_pipeline:>12.0f}/s  "
+            f"table={nb_lignes / duree_table:>12.0f}/s  (x{duree_pipeline / duree_table:.0f})"
+        )
+    print()
+
+
+def main():
+    """
+    Run all benchmarks.
+    """
+    print("=" * 70)
+    print("BENCHMARK DE L'INFERENCE")
+    print("=" * 70)
+    print()
+
+    benchmark_passe_unique()
+    benchmark_chemin_numpy()
+    benchmark_format_colonnes()
+    benchmark_modele_compile()
+
+    print("=" * 70)
+    print("FIN DU BENCHMARK")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
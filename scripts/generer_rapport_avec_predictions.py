@@ -1,17 +1,21 @@
 """
 Script to generate an Evidently report with real model predictions.
 Loads the trained model, makes predictions on test data,
-then generates a complete report (classification + drift).
+then generates a drift report against the reference dataset of the API
+(DRIFT_REFERENCE_FILE, read from its profile, with prediction = Survived).
+The test data is MONITOR_LABELLED_FILE: the same datasets as the API's
+scheduled classification report, not a 70/30 split of titanic_cleaned_dataset.csv as before.
 """
 
 import sys
 from pathlib import Path
-import pandas as pd
 import joblib
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from api import config
 from api.metrics.monitoring import generer_rapport_drift
+from api.reference import charger_profil, dossier_profil, lire_reference
 
 print("=" * 70)
 print("GENERATION DE RAPPORT EVIDENTLY AVEC VRAIES PREDICTIONS")
@@ -37,30 +41,29 @@ except Exception as e:
 
 print()
 
-data_path = BASE_DIR / "data" / "titanic_cleaned_dataset.csv"
+reference_path = BASE_DIR / "data" / config.DRIFT_REFERENCE_FILE
+data_path = BASE_DIR / "data" / config.MONITOR_LABELLED_FILE
 
-print(f"📂 Chargement des donnees depuis: {data_path}")
+print(f"📂 Chargement des donnees depuis: {reference_path} et {data_path}")
 
-if not data_path.exists():
-    print(f"❌ Erreur: Fichier {data_path} introuvable")
-    sys.exit(1)
+for chemin in (reference_path, data_path):
+    if not chemin.exists():
+        print(f"❌ Erreur: Fichier {chemin} introuvable")
+        sys.exit(1)
 
 try:
-    df = pd.read_csv(data_path)
-    print(f"✅ Donnees chargees: {len(df)} lignes, {len(df.columns)} colonnes")
-    print(f"   Colonnes: {list(df.columns)}")
+    # Profile shared with the API: built once, then memory-mapped
+    profiles_dir = Path(config.REFERENCE_PROFILE_DIR or MODEL_PATH.parent / "profiles")
+    profil = charger_profil(reference_path, dossier_profil(reference_path, profiles_dir), config.DRIFT_FARE_BINS)
+    train_data = profil.dataframe()
+    test_data = lire_reference(data_path)
+    print(f"✅ Donnees chargees, colonnes: {list(test_data.columns)}")
 except Exception as e:
     print(f"❌ Erreur lors du chargement des donnees: {e}")
     sys.exit(1)
 
 print()
 
-print("📊 Preparation des donnees...")
-
-split_idx = int(len(df) * 0.7)
-train_data = df.iloc[:split_idx].copy()
-test_data = df.iloc[split_idx:].copy()
-
 print(f"   Donnees d'entrainement (reference): {len(train_data)} lignes")
 print(f"   Donnees de test (current): {len(test_data)} lignes")
 print()
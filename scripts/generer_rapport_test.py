@@ -1,38 +1,42 @@
 """
 Script to generate a test Evidently report.
-Uses Titanic data to create a sample report.
+Compares the labelled test data (MONITOR_LABELLED_FILE) with the reference
+dataset of the API (DRIFT_REFERENCE_FILE), read from its profile: the same
+datasets as the API's scheduled classification report, not a 70/30 split of
+titanic_cleaned_dataset.csv as before.
 """
 
 import sys
 from pathlib import Path
-import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from api import config
 from api.metrics.monitoring import generer_rapport_drift
+from api.reference import charger_profil, dossier_profil, lire_reference
 
 print("=" * 70)
 print("GENERATION D'UN RAPPORT EVIDENTLY DE TEST")
 print("=" * 70)
 print()
 
-data_path = Path("data/titanic_cleaned_dataset.csv")
+reference_path = Path("data") / config.DRIFT_REFERENCE_FILE
+data_path = Path("data") / config.MONITOR_LABELLED_FILE
 
-if not data_path.exists():
-    print(f"❌ Erreur: Fichier {data_path} introuvable")
-    print("Assurez-vous d'avoir les donnees Titanic dans data/")
-    sys.exit(1)
+for chemin in (reference_path, data_path):
+    if not chemin.exists():
+        print(f"❌ Erreur: Fichier {chemin} introuvable")
+        print("Assurez-vous d'avoir les donnees Titanic dans data/")
+        sys.exit(1)
 
+# Profile shared with the API: built once, then memory-mapped
+profiles_dir = Path(config.REFERENCE_PROFILE_DIR or Path("models") / "profiles")
+print(f"📂 Chargement du profil de reference de: {reference_path}")
+reference_data = charger_profil(reference_path, dossier_profil(reference_path, profiles_dir), config.DRIFT_FARE_BINS)
 print(f"📂 Chargement des donnees depuis: {data_path}")
-df = pd.read_csv(data_path)
-print(f"✅ Donnees chargees: {len(df)} lignes, {len(df.columns)} colonnes")
-print()
-
-split_idx = int(len(df) * 0.7)
-reference_data = df.iloc[:split_idx]
-current_data = df.iloc[split_idx:]
+current_data = lire_reference(data_path)
 
-print(f"📊 Donnees de reference: {len(reference_data)} lignes")
+print(f"📊 Donnees de reference: {reference_data.nb_lignes} lignes")
 print(f"📊 Donnees actuelles: {len(current_data)} lignes")
 print()
 
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    """
+    Point every directory the API writes to at a temporary directory.
+
+    The API modules read their configuration when they are imported, during
+    collection, so the variables are set here rather than in a fixture.
+    `config._tmp_path_factory` is the factory behind `tmp_path_factory`,
+    created by pytest's own `pytest_configure`, hence `trylast`. The report
+    processes started with "spawn" inherit the variables.
+    """
+    dossier = config._tmp_path_factory.mktemp("api")
+    os.environ["PREDICTION_LOG_DIR"] = str(dossier / "predictions")
+    os.environ["REPORT_CACHE_DIR"] = str(dossier / "cache" / "evidently")
+    os.environ["EVALUATION_CACHE_FILE"] = str(dossier / "cache" / "evaluation.json")
+    os.environ["MONITOR_LOCK_FILE"] = str(dossier / "cache" / "monitoring.lock")
+    os.environ["FEEDBACK_DB_FILE"] = str(dossier / "feedback" / "feedback.sqlite")
+    os.environ["SAMPLE_SHARED_DIR"] = str(dossier / "samples")
+    os.environ["REPORT_JOBS_DIR"] = str(dossier / "jobs")
+    os.environ["LOG_FILE"] = str(dossier / "logs" / "api.log")
@@ -1,5 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
 import sys
 import os
 
@@ -67,6 +68,29 @@ def test_predict_many_valid_input():
     assert len(data["predictions"]) == 2
 
 
+def test_predict_many_records_batch_metrics():
+    """
+    Test that /predict_many and its columnar form count their predictions and batch sizes.
+    """
+    def total(texte, nom, **labels):
+        return sum(
+            s.value for famille in text_string_to_metric_families(texte) for s in famille.samples
+            if s.name == nom and all(s.labels.get(k) == v for k, v in labels.items())
+        )
+
+    avant = client.get("/metrics").text
+    client.post("/predict_many", json={"passengers": [{"Sex": "M", "Fare": 10.0}, {"Sex": "F", "Fare": 50.0}]})
+    client.post("/predict_many/columnar", json={"Sex": ["M", "F", "F"], "Fare": [10.0, 50.0, 80.0]})
+    apres = client.get("/metrics").text
+
+    assert total(apres, "ml_predictions_total") == total(avant, "ml_predictions_total") + 5
+    for endpoint, taille in (("predict_many", 2), ("predict_many_columnar", 3)):
+        somme = "ml_prediction_request_batch_size_sum"
+        assert total(apres, somme, endpoint=endpoint) == total(avant, somme, endpoint=endpoint) + taille
+        compte = "ml_prediction_item_latency_seconds_count"
+        assert total(apres, compte, endpoint=endpoint) == total(avant, compte, endpoint=endpoint) + 1
+
+
 def test_predict_many_empty_list():
     """
     Test that an empty batch returns a 422 validation error.
@@ -90,4 +114,370 @@ def test_predict_many_invalid_passenger():
             {"Sex": "X", "Fare": 50}
         ]
     )
-    assert response.status_code == 422
\ No newline at end of file
+    assert response.status_code == 422
+
+def test_predict_returns_confidence():
+    """
+    Test that /predict returns the probabilities and the confidence
+    of the predicted class.
+    """
+    response = client.post(
+        "/predict",
+        json={"Sex": "M", "Fare": 7.25}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert set(data["probabilities"]) == {"Died", "Survived"}
+    assert data["confidence"] == data["probabilities"][data["prediction"]]
+    assert data["confidence"] == max(data["probabilities"].values())
+
+
+def test_reload_model_endpoint(monkeypatch):
+    """
+    Test that the admin reload endpoint swaps the model and that
+    predictions report the version being served.
+    """
+    from api import config
+
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    entetes = {"Authorization": "Bearer secret"}
+    response = client.post("/admin/model/reload", headers=entetes)
+
+    assert response.status_code == 200
+    version = response.json()["data"]["model_version"]
+    assert client.get("/admin/model", headers=entetes).json()["data"]["model_version"] == version
+
+    prediction = client.post("/predict", json={"Sex": "F", "Fare": 30.0})
+    assert prediction.json()["model_version"] == version
+
+
+def test_admin_endpoints_require_the_token(monkeypatch):
+    """
+    Test that the admin endpoints are disabled without ADMIN_TOKEN and
+    refuse requests that do not carry it.
+    """
+    from api import config
+
+    monkeypatch.setattr(config, "ADMIN_TOKEN", None)
+    assert client.post("/admin/model/reload").status_code == 403
+    assert client.get("/admin/model", headers={"Authorization": "Bearer secret"}).status_code == 403
+
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    assert client.post("/admin/model/reload").status_code == 401
+    assert client.get("/admin/model", headers={"Authorization": "Bearer autre"}).status_code == 401
+
+
+def test_inference_runs_in_dedicated_pool():
+    """
+    Test that model calls are offloaded to the inference pool rather than
+    the event loop or Starlette's I/O threadpool.
+    """
+    import asyncio
+    import threading
+    from api.executor import executer_inference
+
+    nom_thread = asyncio.run(executer_inference(lambda: threading.current_thread().name))
+
+    assert nom_thread.startswith("inference")
+
+
+def test_predict_many_columnar_matches_row_oriented():
+    """
+    Test that the columnar endpoint returns the same predictions as
+    /predict_many, in columnar form.
+    """
+    passagers = [{"Sex": "M", "Fare": 10.0}, {"Sex": "f", "Fare": 50.0}, {"Sex": "F", "Fare": 7.5}]
+
+    lignes = client.post("/predict_many", json={"passengers": passagers}).json()
+    response = client.post(
+        "/predict_many/columnar",
+        json={"Sex": [p["Sex"] for p in passagers], "Fare": [p["Fare"] for p in passagers]}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["prediction"] == lignes["predictions"]
+    assert data["confidence"] == pytest.approx(lignes["confidences"])
+
+
+def test_predict_many_columnar_invalid_columns():
+    """
+    Test validation of the columnar schema: invalid sex and mismatched lengths.
+    """
+    invalid_sex = client.post("/predict_many/columnar", json={"Sex": ["M", "X"], "Fare": [1.0, 2.0]})
+    mismatched = client.post("/predict_many/columnar", json={"Sex": ["M"], "Fare": [1.0, 2.0]})
+
+    assert invalid_sex.status_code == 422
+    assert mismatched.status_code == 422
+
+
+def test_predict_many_stream_ndjson(monkeypatch):
+    """
+    Test the NDJSON streaming endpoint: one output line per input line,
+    in order across chunks, with errors reported in place.
+    """
+    import json
+    from api import config
+
+    monkeypatch.setattr(config, "STREAM_CHUNK_SIZE", 2)
+
+    corps = '{"Sex": "M", "Fare": 10.0}\n{"Sex": "X", "Fare": 5.0}\n\n{"Sex": "F", "Fare": 50.0}'
+    response = client.post(
+        "/predict_many/stream",
+        content=corps,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    lignes = [json.loads(l) for l in response.text.splitlines()]
+    attendues = client.post(
+        "/predict_many",
+        json={"passengers": [{"Sex": "M", "Fare": 10.0}, {"Sex": "F", "Fare": 50.0}]}
+    ).json()
+
+    assert len(lignes) == 3
+    assert "error" in lignes[1]
+    assert [lignes[0]["prediction"], lignes[2]["prediction"]] == attendues["predictions"]
+
+
+def test_predict_many_stream_skips_too_long_lines(monkeypatch):
+    """
+    Test that a line longer than the limit gets a 413 error line, even when
+    it spans several body chunks, and that the next lines are still scored.
+    """
+    import asyncio
+    import json
+    from api import config
+    from api.streaming import generer_predictions_ndjson
+
+    monkeypatch.setattr(config, "STREAM_MAX_LINE_BYTES", 64)
+
+    async def morceaux():
+        yield b'{"Sex": "M", "Fare": 10.0}\n{"Sex": "F", "Fare": ' + b"1" * 50
+        yield b"2" * 100
+        yield b'}\n{"Sex": "F", "Fare": 50.0}'
+
+    async def lire():
+        return b"".join([sortie async for sortie in generer_predictions_ndjson(morceaux())])
+
+    lignes = [json.loads(l) for l in asyncio.run(lire()).decode().splitlines()]
+
+    assert len(lignes) == 3
+    assert "prediction" in lignes[0] and "prediction" in lignes[2]
+    assert lignes[1]["status"] == 413
+    assert lignes[1]["error"].startswith("line 2")
+
+
+def test_predict_many_stream_rejects_non_finite_fares():
+    """
+    Test that an infinite or overflowing fare is reported on its own line
+    without ending the stream.
+    """
+    import json
+
+    corps = '{"Sex": "M", "Fare": 1e400}\n{"Sex": "M", "Fare": ' + "9" * 400 + '}\n{"Sex": "F", "Fare": 50.0}'
+    response = client.post(
+        "/predict_many/stream",
+        content=corps,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    lignes = [json.loads(l) for l in response.text.splitlines()]
+    assert len(lignes) == 3
+    assert lignes[0]["error"] == "line 1: Fare must be a finite number"
+    assert lignes[1]["error"] == "line 2: Fare must be a finite number"
+    assert "prediction" in lignes[2]
+
+
+def test_predict_batch_npy_and_arrow():
+    """
+    Test binary batch scoring: .npy and Arrow IPC inputs give the same
+    predictions as the JSON format, returned in the request format.
+    """
+    import io
+    import numpy as np
+    import pyarrow as pa
+
+    sexes, fares = ["M", "F", "F"], [10.0, 50.0, 7.5]
+    attendu = client.post("/predict_batch", json={"Sex": sexes, "Fare": fares}).json()
+
+    tableau = np.array([[0, 10.0], [1, 50.0], [1, 7.5]])
+    flux = io.BytesIO()
+    np.save(flux, tableau)
+    reponse_npy = client.post(
+        "/predict_batch",
+        content=flux.getvalue(),
+        headers={"Content-Type": "application/x-npy"}
+    )
+    assert reponse_npy.status_code == 200
+    sortie = np.load(io.BytesIO(reponse_npy.content))
+    assert sortie["prediction"].tolist() == attendu["prediction"]
+    assert sortie["probability_Survived"].tolist() == pytest.approx(attendu["probabilities"]["Survived"])
+
+    table = pa.table({"Sex": sexes, "Fare": fares})
+    puits = pa.BufferOutputStream()
+    with pa.ipc.new_stream(puits, table.schema) as ecrivain:
+        ecrivain.write_table(table)
+    reponse_arrow = client.post(
+        "/predict_batch",
+        content=puits.getvalue().to_pybytes(),
+        headers={"Content-Type": "application/vnd.apache.arrow.stream", "Accept": "application/json"}
+    )
+    assert reponse_arrow.status_code == 200
+    assert reponse_arrow.json()["prediction"] == attendu["prediction"]
+
+
+def test_predict_batch_rejects_unsupported_format():
+    """
+    Test content negotiation errors on /predict_batch.
+    """
+    unsupported = client.post("/predict_batch", content=b"Sex,Fare", headers={"Content-Type": "text/csv"})
+    invalid = client.post("/predict_batch", content=b"not npy", headers={"Content-Type": "application/x-npy"})
+
+    assert unsupported.status_code == 415
+    assert invalid.status_code == 422
+
+
+def test_predict_batch_rejects_invalid_npy_fields():
+    """
+    Test that structured .npy arrays with non-numeric fields or no dimension
+    are refused with a 422.
+    """
+    import io
+    import numpy as np
+
+    def npy(tableau):
+        flux = io.BytesIO()
+        np.save(flux, tableau)
+        return flux.getvalue()
+
+    invalides = [
+        np.array([("M", "cher")], dtype=[("Sex", "U1"), ("Fare", "U4")]),
+        np.array([(0, 1 + 2j)], dtype=[("Sex", "i1"), ("Fare", "c16")]),
+        np.array((0, 10.0), dtype=[("Sex", "i1"), ("Fare", "f8")]),
+        np.array([([0, 1], 10.0)], dtype=[("Sex", "i1", (2,)), ("Fare", "f8")]),
+    ]
+    for tableau in invalides:
+        reponse = client.post("/predict_batch", content=npy(tableau), headers={"Content-Type": "application/x-npy"})
+        assert reponse.status_code == 422, tableau.dtype
+        assert reponse.json()["detail"].startswith(("Structured arrays", "Fare must be numeric"))
+
+    valide = np.array([("F", 10), ("M", 20)], dtype=[("Sex", "U1"), ("Fare", "i4")])
+    reponse = client.post(
+        "/predict_batch",
+        content=npy(valide),
+        headers={"Content-Type": "application/x-npy", "Accept": "application/json"}
+    )
+    assert reponse.status_code == 200
+    assert len(reponse.json()["prediction"]) == 2
+
+
+def test_ready_reports_startup_evaluation():
+    """
+    Test that /ready reports the state of the background evaluation
+    separately from the /health liveness check.
+    """
+    from api.evaluation import _pret
+
+    response = client.get("/ready")
+    data = response.json()
+
+    assert response.status_code == (200 if _pret.is_set() else 503)
+    assert data["evaluation"]["status"] in {"pending", "running", "done", "skipped", "failed"}
+    assert client.get("/health").status_code == 200
+
+
+def test_feedback_updates_live_accuracy():
+    """
+    Test that true labels sent with the prediction IDs are joined and
+    reported in the live performance.
+    """
+    prediction = client.post("/predict", json={"Sex": "F", "Fare": 30.0}).json()
+    lot = client.post(
+        "/predict_many/columnar",
+        json={"Sex": ["M", "F"], "Fare": [10.0, 50.0]}
+    ).json()
+
+    response = client.post(
+        "/feedback",
+        json={"prediction_id": prediction["prediction_id"], "label": prediction["prediction"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["matched"] == 1
+
+    response = client.post(
+        "/feedback_many",
+        json={"feedbacks": [
+            {"prediction_id": i, "label": label}
+            for i, label in zip(lot["prediction_id"], lot["prediction"])
+        ] + [{"prediction_id": prediction["prediction_id"], "label": "Died"}]}
+    )
+    data = response.json()
+    assert data["matched"] == 2
+    assert data["unknown"] == [prediction["prediction_id"]]
+
+    fenetres = data["performance"][prediction["model_version"]]
+    assert all(f["accuracy"] == 1.0 for f in fenetres.values())
+
+
+def test_feedback_invalid_label():
+    """
+    Test validation of the true label.
+    """
+    response = client.post("/feedback", json={"prediction_id": "x-1", "label": "Maybe"})
+    assert response.status_code == 422
+
+
+def test_live_drift_endpoint():
+    """
+    Test that the live drift endpoint reports the traffic window.
+    """
+    client.post("/predict_many/columnar", json={"Sex": ["M", "F"] * 100, "Fare": [10.0, 50.0] * 100})
+
+    response = client.get("/monitoring/drift")
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["samples"] >= 200
+    assert set(data["variables"]) == {"Sex", "Fare", "prediction"}
+
+
+def test_recent_predictions_snapshot():
+    """
+    Test that scored passengers appear in the history of recent predictions.
+    """
+    client.post("/predict_many/columnar", json={"Sex": ["M", "F"], "Fare": [12.5, 87.0]})
+
+    response = client.get("/monitoring/recent-predictions", params={"limit": 2})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["Fare"] == [12.5, 87.0]
+    assert data["Sex"] == [0, 1]
+    assert set(data) == {"Sex", "Fare", "prediction", "confidence", "latency", "timestamp"}
+    assert response.json()["scope"] == "all_workers"
+
+
+def test_sample_endpoint_reports_fraction():
+    """
+    Test that the reservoir sample endpoint returns a budgeted sample of the traffic.
+    """
+    client.post("/predict_many/columnar", json={"Sex": ["M", "F"] * 100, "Fare": [10.0, 50.0] * 100})
+
+    response = client.get("/monitoring/sample", params={"size": 50})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] <= 50
+    assert body["sampling"]["rows"] >= 200
+    assert set(body["data"]) == {"Sex", "Fare", "prediction", "timestamp"}
+
+
+def test_report_job_validation_and_unknown_job():
+    """
+    Test that an unknown report is rejected and an unknown job is not found.
+    """
+    response = client.post("/reports/jobs", json={"report": "fairness"})
+    assert response.status_code == 422
+
+    response = client.get("/reports/jobs/0123456789abcdef")
+    assert response.status_code == 404
@@ -0,0 +1,51 @@
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.batching import MicroBatcher
+from api.predict import engine
+
+
+def test_micro_batcher_matches_direct_prediction():
+    """
+    Test that concurrent rows are grouped and each caller gets its own result.
+    """
+    tailles = []
+    verrou = threading.Lock()
+
+    def predict_fn(features):
+        with verrou:
+            tailles.append(len(features))
+        return engine.predict(features)
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=16, max_wait_s=0.05)
+    features = np.array([[i % 2, 5.0 + i * 3.5] for i in range(40)], dtype=np.float64)
+
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        resultats = list(pool.map(batcher.predict, features))
+
+    indices, probas = engine.predict(features)
+    assert [r[0] for r in resultats] == indices.tolist()
+    np.testing.assert_allclose(np.vstack([r[1] for r in resultats]), probas)
+    assert sum(tailles) == 40
+    assert max(tailles) <= 16
+    assert len(tailles) < 40
+
+
+def test_micro_batcher_propagates_errors():
+    """
+    Test that a model failure is raised in every waiting caller.
+    """
+    def predict_fn(features):
+        raise RuntimeError("modèle indisponible")
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=4, max_wait_s=0.001)
+    future = batcher.submit(np.array([1.0, 10.0]))
+
+    with pytest.raises(RuntimeError, match="modèle indisponible"):
+        future.result(timeout=5)
@@ -0,0 +1,59 @@
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.metrics import monitoring
+from api.metrics import generer_rapport_drift, report_cache_hits, report_cache_misses
+from api.cache_rapports import CacheRapports
+from api.predict import DATA_DIR
+from api.reference import lire_reference
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = CacheRapports(tmp_path / "cache", 64 * 1024 * 1024)
+    monkeypatch.setattr(monitoring, "cache_rapports", cache)
+    return cache
+
+
+def test_identical_drift_report_is_served_from_cache(cache, tmp_path):
+    """
+    Test that a report over the same data is read back, HTML included, and changed data is recomputed.
+    """
+    reference = lire_reference(DATA_DIR / "titanic_train.csv")[["Sex", "Fare"]]
+    courant = lire_reference(DATA_DIR / "titanic_test.csv")[["Sex", "Fare"]]
+    succes = report_cache_hits.labels(report="drift")._value.get()
+    echecs = report_cache_misses.labels(report="drift")._value.get()
+
+    premier = generer_rapport_drift(reference, courant, output_path=tmp_path / "premier.html")
+    second = generer_rapport_drift(reference.copy(), courant.copy(), output_path=tmp_path / "second.html")
+    generer_rapport_drift(reference, courant.assign(Fare=courant["Fare"] * 2))
+
+    assert second == premier
+    assert (tmp_path / "second.html").read_bytes() == (tmp_path / "premier.html").read_bytes()
+    assert report_cache_hits.labels(report="drift")._value.get() == succes + 1
+    assert report_cache_misses.labels(report="drift")._value.get() == echecs + 2
+
+
+def test_cache_evicts_least_recently_used_reports(tmp_path):
+    """
+    Test that reports past the size budget are evicted, oldest use first.
+    """
+    cache = CacheRapports(tmp_path, taille_max=10**6)
+    resultats = {"metrics": ["x" * 3000]}
+    for numero, cle in enumerate(["a", "b", "c"]):
+        cache.ecrire(cle, resultats)
+        os.utime(tmp_path / f"{cle}.json", (numero, numero))
+
+    assert cache.lire("a") is not None
+    cache.taille_max = 2 * cache.taille() // 3 + 100
+    evinces = cache.ecrire("d", resultats)
+
+    assert evinces == 2
+    assert cache.lire("b") is None
+    assert cache.lire("c") is None
+    assert cache.lire("a") is not None
+    assert cache.lire("d") is not None
+    assert cache.lire("a", avec_html=True) is None
@@ -0,0 +1,64 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.drift import MoniteurDrift, comparer_distributions
+from api.metrics import data_drift_score
+from api.reference import construire_profil
+
+
+def reference(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.integers(0, 2, n), rng.exponential(30.0, n)]).astype(np.float64)
+
+
+def profil(donnees, dossier):
+    return construire_profil(pd.DataFrame(donnees, columns=["Sex", "Fare"]), dossier)
+
+
+def test_identical_distributions_do_not_drift():
+    """
+    Test that the statistics are zero for identical histograms.
+    """
+    statistiques = comparer_distributions(np.array([10, 30, 60]), np.array([1, 3, 6]))
+
+    assert statistiques["psi"] < 1e-9
+    assert statistiques["ks"] < 1e-9
+    assert statistiques["js"] < 1e-6
+
+
+def test_shifted_fares_are_detected(tmp_path):
+    """
+    Test that a shift of Fare is detected and pushed into the drift gauge,
+    while the other variables stay stable.
+    """
+    donnees = reference()
+    moniteur = MoniteurDrift(profil(donnees, tmp_path), duree=60, min_echantillons=100, intervalle=0)
+    survivants = donnees[:, 0] == 1
+
+    moniteur.observer(donnees, survivants, maintenant=0.0)
+    assert not moniteur.resultats["drift_detected"]
+
+    decales = donnees.copy()
+    decales[:, 1] *= 5
+    moniteur.observer(decales, survivants, maintenant=120.0)
+
+    variables = moniteur.resultats["variables"]
+    assert variables["Fare"]["drift_detected"]
+    assert not variables["Sex"]["drift_detected"]
+    assert moniteur.resultats["samples"] == len(donnees)
+    assert data_drift_score._value.get() == moniteur.resultats["drift_score"]
+
+
+def test_statistics_wait_for_enough_samples(tmp_path):
+    """
+    Test that no drift is reported before the window holds enough predictions.
+    """
+    donnees = reference()
+    moniteur = MoniteurDrift(profil(donnees, tmp_path), min_echantillons=100, intervalle=0)
+    moniteur.observer(donnees[:10] * 5, donnees[:10, 0] == 1, maintenant=0.0)
+
+    assert moniteur.calculer(maintenant=0.0) == {"samples": 10}
@@ -0,0 +1,102 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import ks_2samp, wasserstein_distance
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.metrics import calculer_drift_numpy, data_drift_score, generer_rapport_drift, resumer_rapport_drift
+from api.reference import construire_profil
+
+
+def donnees(n=5000, decalage=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Sex": rng.integers(0, 2, n).astype(np.float64),
+        "Fare": rng.exponential(30.0, n) + decalage,
+    })
+
+
+def valeur_drift(resultats, colonne):
+    return next(m for m in resultats["metrics"] if m["config"].get("column") == colonne)
+
+
+def test_statistics_match_scipy():
+    """
+    Test that KS and Wasserstein match scipy on a continuous column.
+    """
+    reference, courant = donnees(seed=0), donnees(n=3000, decalage=1.0, seed=1)
+
+    statistiques = valeur_drift(calculer_drift_numpy(reference, courant), "Fare")["statistics"]
+
+    attendu = ks_2samp(reference["Fare"], courant["Fare"])
+    assert statistiques["ks"] == pytest.approx(attendu.statistic)
+    assert statistiques["ks_p_value"] == pytest.approx(attendu.pvalue, abs=0.01)
+    distance = wasserstein_distance(reference["Fare"], courant["Fare"]) / reference["Fare"].std(ddof=0)
+    assert statistiques["wasserstein"] == pytest.approx(distance)
+
+
+def test_default_tests_and_values_match_evidently():
+    """
+    Test that the default test of each column and its value are those of Evidently.
+    """
+    for n in (500, 5000):
+        reference, courant = donnees(n=n, seed=0), donnees(n=n, decalage=5.0, seed=1)
+
+        attendus = generer_rapport_drift(reference, courant, mettre_a_jour_metriques=False)
+        resultats = calculer_drift_numpy(reference, courant)
+
+        for colonne in ("Sex", "Fare"):
+            attendu, valeur = valeur_drift(attendus, colonne), valeur_drift(resultats, colonne)
+            if n > 1000:
+                assert valeur["config"]["method"] == attendu["config"]["method"]
+                assert valeur["value"] == pytest.approx(attendu["value"])
+            assert resumer_rapport_drift(resultats)["columns"][colonne]["drift_detected"] == \
+                resumer_rapport_drift(attendus)["columns"][colonne]["drift_detected"]
+
+
+def test_shifted_column_drifts_and_identical_data_does_not():
+    """
+    Test that a shifted Fare drifts with the default tests (Wasserstein, Jensen-Shannon for Sex).
+    """
+    reference = donnees(seed=0)
+
+    stable = calculer_drift_numpy(reference, donnees(seed=1))
+    decale = calculer_drift_numpy(reference, donnees(decalage=20.0, seed=1))
+
+    assert valeur_drift(stable, "Sex")["config"]["method"] == "Jensen-Shannon distance"
+    assert valeur_drift(calculer_drift_numpy(reference[:500], donnees(seed=1)), "Sex")["config"]["method"] == "chi-square p_value"
+    assert resumer_rapport_drift(stable)["drift_score"] == 0.0
+    assert resumer_rapport_drift(decale)["columns"]["Fare"]["drift_detected"]
+    assert not resumer_rapport_drift(decale)["columns"]["Sex"]["drift_detected"]
+
+    psi = calculer_drift_numpy(reference, donnees(decalage=20.0, seed=1), methode="psi")
+    assert valeur_drift(psi, "Fare")["config"]["method"] == "PSI"
+    assert resumer_rapport_drift(psi)["drift_score"] == 0.5
+
+
+def test_profile_reference_and_report_engine(tmp_path):
+    """
+    Test that the engine reads a profile and that the report updates the drift gauge.
+    """
+    reference = donnees(seed=0)
+    profil = construire_profil(reference, tmp_path)
+    courant = donnees(decalage=20.0, seed=1)
+
+    resultats = generer_rapport_drift(profil, courant, moteur="numpy")
+
+    assert resultats["engine"] == "numpy"
+    assert resultats["metrics"] == calculer_drift_numpy(reference, courant)["metrics"]
+    assert data_drift_score._value.get() == resumer_rapport_drift(resultats)["drift_score"]
+
+
+def test_unknown_method_or_engine_is_rejected():
+    """
+    Test that an unknown drift test or engine raises ValueError.
+    """
+    with pytest.raises(ValueError):
+        calculer_drift_numpy(donnees(), donnees(), methode="kl")
+    with pytest.raises(ValueError):
+        generer_rapport_drift(donnees(), donnees(), moteur="autre")
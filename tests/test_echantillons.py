@@ -0,0 +1,148 @@
+import sys
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.echantillons import ReservoirsPredictions, echantillonner
+from api.metrics import generer_rapport_drift
+
+
+def trafic(n, part_survivants=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    survivants = rng.random(n) < part_survivants
+    fares = np.where(survivants, rng.exponential(80.0, n), rng.exponential(20.0, n))
+    return np.column_stack([survivants.astype(np.float64), fares]), survivants
+
+
+def test_reservoirs_keep_a_bounded_uniform_sample_per_class():
+    """
+    Test that memory is bounded and each class reservoir is a uniform sample of its traffic.
+    """
+    reservoirs = ReservoirsPredictions(taille=2000, duree_fenetre=3600, graine=0)
+    features, survivants = trafic(200_000)
+    for debut in range(0, len(features), 10_000):
+        reservoirs.ajouter(features[debut:debut + 10_000], survivants[debut:debut + 10_000], maintenant=100.0)
+
+    classes = reservoirs.etat()["windows"][0]["classes"]
+    assert classes["Died"] == {"seen": int((~survivants).sum()), "kept": 2000}
+    assert classes["Survived"]["kept"] == 2000
+
+    echantillon = reservoirs.echantillon(classe=0)
+    assert len(echantillon) == 2000
+    assert abs(echantillon["Fare"].mean() - features[~survivants, 1].mean()) < 1.5
+
+
+def test_sample_is_stratified_and_records_its_fraction():
+    """
+    Test that a budgeted sample keeps the class proportions of the traffic.
+    """
+    reservoirs = ReservoirsPredictions(taille=5000, graine=0)
+    features, survivants = trafic(100_000, part_survivants=0.1)
+    reservoirs.ajouter(features, survivants, maintenant=100.0)
+
+    echantillon = reservoirs.echantillon(taille=1000)
+    infos = echantillon.attrs["echantillonnage"]
+
+    assert len(echantillon) == 1000
+    assert abs(echantillon["prediction"].mean() - survivants.mean()) < 0.005
+    assert infos["rows"] == 100_000
+    assert infos["fraction"] == 0.01
+    assert infos["classes"]["Survived"]["rows"] == int(survivants.sum())
+
+
+def test_windows_are_rotated_and_filtered_by_time():
+    """
+    Test that old windows are dropped and `depuis` keeps only the recent ones.
+    """
+    reservoirs = ReservoirsPredictions(taille=100, duree_fenetre=60, nb_fenetres=2, graine=0)
+    for minute in range(3):
+        features, survivants = trafic(50, seed=minute)
+        reservoirs.ajouter(features, survivants, maintenant=minute * 60.0 + 1)
+
+    assert [fenetre["start"] for fenetre in reservoirs.etat()["windows"]] == [60.0, 120.0]
+    assert len(reservoirs.echantillon()) == 100
+    assert (reservoirs.echantillon(depuis=120.0)["timestamp"] >= 120.0).all()
+    assert len(reservoirs.echantillon(depuis=120.0)) == 50
+
+
+def test_report_samples_large_inputs_down_to_its_budget():
+    """
+    Test that the drift report samples its inputs and records the fraction,
+    counting the population of a reservoir sample.
+    """
+    rng = np.random.default_rng(0)
+    reference = pd.DataFrame({"Sex": rng.integers(0, 2, 1000).astype(np.float64), "Fare": rng.exponential(30.0, 1000)})
+    courant = pd.DataFrame({"Sex": rng.integers(0, 2, 200_000).astype(np.float64), "Fare": rng.exponential(30.0, 200_000)})
+
+    resultats = generer_rapport_drift(reference, courant, moteur="numpy", mettre_a_jour_metriques=False, taille_echantillon=5000)
+
+    assert resultats["echantillonnage"]["reference"] == {"rows": 1000, "sampled": 1000, "fraction": 1.0}
+    assert resultats["echantillonnage"]["current"] == {"rows": 200_000, "sampled": 5000, "fraction": 0.025}
+    assert echantillonner(courant, 5000)[0].equals(echantillonner(courant, 5000)[0])
+
+    reservoirs = ReservoirsPredictions(taille=1000, graine=0)
+    features, survivants = trafic(20_000)
+    reservoirs.ajouter(features, survivants, maintenant=100.0)
+    echantillon = reservoirs.echantillon()[["Sex", "Fare"]].astype("float64")
+
+    resultats = generer_rapport_drift(reference, echantillon, moteur="numpy", mettre_a_jour_metriques=False)
+
+    assert resultats["echantillonnage"]["current"]["rows"] == 20_000
+    assert resultats["echantillonnage"]["current"]["sampled"] == len(echantillon)
+
+
+def test_sample_covers_the_reservoirs_shared_by_other_workers(tmp_path):
+    """
+    Test that a sample combines the reservoirs of all the workers sharing a directory.
+    """
+    worker_1 = ReservoirsPredictions(taille=1000, graine=0, dossier=tmp_path)
+    worker_2 = ReservoirsPredictions(taille=1000, graine=1, dossier=tmp_path)
+    features, survivants = trafic(30_000)
+    worker_1.ajouter(features[:10_000], survivants[:10_000], maintenant=100.0)
+    worker_2.ajouter(features[10_000:], survivants[10_000:], maintenant=100.0)
+    worker_1.ajouter(features[:10], survivants[:10], maintenant=100_000.0)
+
+    assert worker_2.partager() == 1
+    assert worker_2.partager() == 0
+    echantillon = worker_1.echantillon(depuis=50.0, taille=1000)
+    infos = echantillon.attrs["echantillonnage"]
+    worker_1.arreter()
+    worker_2.arreter()
+
+    assert infos["rows"] == 30_010
+    assert len(echantillon) == 1000
+    assert abs(infos["classes"]["Survived"]["rows"] - int(survivants.sum()) - int(survivants[:10].sum())) <= 1
+    assert len(worker_2.echantillon(depuis=50_000.0)) == 10
+
+
+def test_forked_workers_share_their_reservoirs(tmp_path):
+    """
+    Test that processes forked from one instance (gunicorn preload) write
+    their own files and each read the other's.
+    """
+    reservoirs = ReservoirsPredictions(taille=100, graine=0, dossier=tmp_path, intervalle_partage=3600)
+
+    def partager_et_lire(fare, attendu):
+        reservoirs.ajouter(np.array([[0.0, fare]] * 10), np.zeros(10, dtype=bool), maintenant=100.0)
+        reservoirs.partager()
+        fin = time.time() + 30
+        while len(list(tmp_path.glob("fenetre=0/*.npz"))) < 2 and time.time() < fin:
+            time.sleep(0.05)
+        return set(reservoirs.echantillon()["Fare"]) == {fare, attendu}
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os._exit(0 if partager_et_lire(1.0, 2.0) else 1)
+        except BaseException:
+            os._exit(2)
+    lu = partager_et_lire(2.0, 1.0)
+    _, statut = os.waitpid(pid, 0)
+    reservoirs.arreter()
+
+    assert len(list(tmp_path.glob("fenetre=0/*.npz"))) == 2
+    assert lu
+    assert os.waitstatus_to_exitcode(statut) == 0
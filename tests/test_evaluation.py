@@ -0,0 +1,54 @@
+import sys
+import os
+import shutil
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api import evaluation
+from api.evaluation import DATASET_PATH, evaluer_modele
+from api.predict import manager
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    chemin = tmp_path / "evaluation.json"
+    monkeypatch.setattr(evaluation, "CACHE_PATH", chemin)
+    return chemin
+
+
+def test_evaluation_is_cached_on_unchanged_inputs(cache):
+    """
+    Test that a second evaluation with the same model and dataset is read from the cache.
+    """
+    premier = evaluer_modele(manager.engine)
+    second = evaluer_modele(manager.engine)
+
+    assert cache.exists()
+    assert not premier["cached"]
+    assert second["cached"]
+    assert second["accuracy"] == premier["accuracy"]
+    assert 0.0 <= premier["accuracy"] <= 1.0
+    assert premier["test_samples"] > 0
+
+
+def test_evaluation_cache_keyed_on_dataset(cache, tmp_path):
+    """
+    Test that a changed dataset is evaluated again.
+    """
+    evaluer_modele(manager.engine)
+
+    donnees = tmp_path / "dataset.csv"
+    shutil.copy(DATASET_PATH, donnees)
+    with open(donnees, "a") as fichier:
+        fichier.write("\n")
+
+    assert not evaluer_modele(manager.engine, donnees)["cached"]
+
+
+def test_missing_dataset_raises(cache, tmp_path):
+    """
+    Test that evaluating on a missing dataset raises FileNotFoundError.
+    """
+    with pytest.raises(FileNotFoundError):
+        evaluer_modele(manager.engine, tmp_path / "absent.csv")
@@ -0,0 +1,79 @@
+import sys
+import os
+import sqlite3
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.feedback import SuiviFeedback
+
+
+def test_labels_are_joined_to_their_predictions(tmp_path):
+    """
+    Test that labels are counted once, for the version that made the prediction.
+    """
+    suivi = SuiviFeedback(tmp_path / "feedback.sqlite", capacite=100, durees_fenetres=[60])
+    ids_v1 = suivi.enregistrer("v1", ["Survived", "Died", "Survived"])
+    ids_v2 = suivi.enregistrer("v2", ["Died"])
+
+    resultat = suivi.ajouter_verites(
+        ids_v1 + ids_v2 + [ids_v1[0], "inconnu-1"],
+        ["Survived", "Died", "Died", "Survived", "Survived", "Died"],
+        maintenant=1000.0
+    )
+
+    assert resultat["matched"] == 4
+    assert resultat["unknown"] == [ids_v1[0], "inconnu-1"]
+
+    metriques = suivi.metriques(maintenant=1000.0)
+    assert metriques["v1"]["60s"] == {"samples": 3, "accuracy": 2 / 3, "precision": 0.5, "recall": 1.0}
+    assert metriques["v2"]["60s"]["accuracy"] == 0.0
+
+
+def test_store_keeps_only_the_latest_predictions(tmp_path):
+    """
+    Test that predictions past the capacity of the store can no longer be labelled.
+    """
+    suivi = SuiviFeedback(tmp_path / "feedback.sqlite", capacite=4, durees_fenetres=[60])
+    anciens = suivi.enregistrer("v1", ["Died"] * 3)
+    recents = suivi.enregistrer("v1", ["Died"] * 3)
+
+    resultat = suivi.ajouter_verites(anciens + recents, ["Died"] * 6, maintenant=0.0)
+
+    assert resultat["matched"] == 4
+    assert resultat["unknown"] == anciens[:2]
+
+
+def test_labels_are_joined_by_any_worker(tmp_path):
+    """
+    Test that a label sent to another worker is joined, and that every worker computes the same metrics.
+    """
+    worker_1 = SuiviFeedback(tmp_path / "feedback.sqlite", capacite=1000, durees_fenetres=[60, 3600])
+    worker_2 = SuiviFeedback(tmp_path / "feedback.sqlite", capacite=1000, durees_fenetres=[60, 3600])
+    ids_1 = worker_1.enregistrer("v1", ["Survived"] * 300 + ["Died"] * 200)
+    ids_2 = worker_2.enregistrer("v1", ["Died"] * 10)
+
+    ancien = worker_2.ajouter_verites(ids_1[:300], ["Survived"] * 300, maintenant=0.0)
+    recent = worker_1.ajouter_verites(ids_2 + ids_1[300:] + ids_1[:1], ["Survived"] * 10 + ["Died"] * 200 + ["Died"], maintenant=3000.0)
+
+    assert ancien == {"matched": 300, "unknown": []}
+    assert recent == {"matched": 210, "unknown": ids_1[:1]}
+    assert worker_1.metriques(maintenant=3000.0) == worker_2.metriques(maintenant=3000.0)
+    assert worker_1.metriques(maintenant=3000.0)["v1"] == {
+        "60s": {"samples": 210, "accuracy": 200 / 210, "precision": None, "recall": 0.0},
+        "3600s": {"samples": 510, "accuracy": 500 / 510, "precision": 1.0, "recall": 300 / 310},
+    }
+
+
+def test_window_counts_stay_bounded_and_slide(tmp_path):
+    """
+    Test that labels are kept as per-bucket counts, bounded whatever their
+    number, and leave a window once it has slid past them.
+    """
+    suivi = SuiviFeedback(tmp_path / "feedback.sqlite", capacite=100_000, durees_fenetres=[60])
+    ids = suivi.enregistrer("v1", ["Survived"] * 50_000)
+    for i in range(0, 50_000, 500):
+        suivi.ajouter_verites(ids[i:i + 500], ["Survived"] * 500, maintenant=i / 250)
+
+    connexion = sqlite3.connect(tmp_path / "feedback.sqlite")
+    assert connexion.execute("SELECT COUNT(*) FROM comptes").fetchone()[0] <= 60
+    assert suivi.metriques(maintenant=199.0)["v1"]["60s"]["samples"] == 500 * 30
+    assert suivi.metriques(maintenant=1000.0) == {}
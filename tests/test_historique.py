@@ -0,0 +1,42 @@
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.historique import HistoriquePredictions
+
+
+def lot(debut, n):
+    fares = np.arange(debut, debut + n, dtype=np.float64)
+    return np.column_stack([fares % 2, fares]), fares % 3 == 0, np.full(n, 0.9)
+
+
+def test_history_keeps_the_latest_predictions_in_order():
+    """
+    Test that the ring buffer wraps around and snapshots oldest first.
+    """
+    historique = HistoriquePredictions(capacite=5)
+    historique.ajouter(*lot(0, 3), latence=0.3, maintenant=1.0)
+    historique.ajouter(*lot(3, 4), latence=0.4, maintenant=2.0)
+
+    df = historique.dataframe()
+    assert len(historique) == 5
+    assert df["Fare"].tolist() == [2.0, 3.0, 4.0, 5.0, 6.0]
+    assert df["Sex"].tolist() == [0, 1, 0, 1, 0]
+    assert df["prediction"].tolist() == [0, 1, 0, 0, 1]
+    assert np.allclose(df["latency"], [0.1, 0.1, 0.1, 0.1, 0.1])
+    assert df["timestamp"].tolist() == [1.0, 2.0, 2.0, 2.0, 2.0]
+
+    assert historique.dataframe(limite=2)["Fare"].tolist() == [5.0, 6.0]
+    assert len(historique.dataframe(depuis=1.5)) == 4
+
+
+def test_batch_larger_than_capacity():
+    """
+    Test that only the end of a batch larger than the buffer is kept.
+    """
+    historique = HistoriquePredictions(capacite=4)
+    historique.ajouter(*lot(0, 10), latence=1.0)
+
+    assert historique.dataframe()["Fare"].tolist() == [6.0, 7.0, 8.0, 9.0]
@@ -0,0 +1,57 @@
+import sys
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.journal import JournalPredictions, lire_predictions
+
+# 2026-01-01 10:30 and 11:15 UTC
+DIX_HEURES = datetime(2026, 1, 1, 10, 30, tzinfo=timezone.utc).timestamp()
+ONZE_HEURES = datetime(2026, 1, 1, 11, 15, tzinfo=timezone.utc).timestamp()
+
+
+def lot(n):
+    features = np.column_stack([np.arange(n) % 2, np.linspace(5.0, 50.0, n)])
+    return features, features[:, 0] == 1, np.full(n, 0.8)
+
+
+def test_batches_are_written_to_hourly_partitions(tmp_path):
+    """
+    Test that queued batches land in their hour partition and can be read back by time range.
+    """
+    journal = JournalPredictions(tmp_path, intervalle=3600)
+    journal.ajouter("v1", *lot(3), latence=0.3, maintenant=DIX_HEURES)
+    journal.ajouter("v2", *lot(2), latence=0.2, maintenant=ONZE_HEURES)
+
+    assert journal.ecrire() == 5
+    journal.arreter()
+    assert len(list(tmp_path.glob("date=2026-01-01/hour=10/*.parquet"))) == 1
+    assert len(list(tmp_path.glob("date=2026-01-01/hour=11/*.parquet"))) == 1
+
+    df = lire_predictions(tmp_path)
+    assert len(df) == 5
+    assert df["model_version"].tolist() == ["v1"] * 3 + ["v2"] * 2
+    assert df["Sex"].tolist() == [0, 1, 0, 0, 1]
+    assert np.allclose(df["latency"], 0.1)
+
+    recentes = lire_predictions(tmp_path, debut=datetime(2026, 1, 1, 11, 0))
+    assert recentes["model_version"].tolist() == ["v2", "v2"]
+
+    dernieres = lire_predictions(tmp_path, limite=3)
+    assert dernieres["model_version"].tolist() == ["v1", "v2", "v2"]
+    assert dernieres["Fare"].tolist() == [50.0, 5.0, 50.0]
+
+
+def test_full_queue_drops_batches(tmp_path):
+    """
+    Test that batches beyond the pending limit are dropped instead of queued.
+    """
+    journal = JournalPredictions(tmp_path, intervalle=3600, max_en_attente=4)
+
+    assert journal.ajouter("v1", *lot(3), latence=0.1)
+    assert not journal.ajouter("v1", *lot(2), latence=0.1)
+    assert journal.ecrire() == 3
+    assert journal.ajouter("v1", *lot(2), latence=0.1)
+    journal.arreter()
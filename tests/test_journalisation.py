@@ -0,0 +1,96 @@
+import sys
+import os
+import gzip
+import json
+import time
+
+import numpy as np
+from loguru import logger
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.journalisation import SinkAsynchrone
+from api.metrics import ResumePredictions, log_records
+
+
+def test_sink_writes_json_lines_and_rotates_compressed(tmp_path):
+    """
+    Test that queued records end up in the file as JSON lines and that full files are gzipped.
+    """
+    chemin = tmp_path / "api.log"
+    sink = SinkAsynchrone(chemin, taille_max=2000, nb_archives=3)
+    sink.demarrer()
+    identifiant = logger.add(sink, serialize=True)
+    try:
+        for i in range(50):
+            logger.bind(numero=i).info(f"ligne {i}")
+    finally:
+        logger.remove(identifiant)
+        sink.arreter()
+
+    archives = sorted(tmp_path.glob("api.log.*.gz"))
+    assert 1 <= len(archives) <= 3
+    lignes = gzip.decompress(archives[0].read_bytes()).decode().splitlines() + chemin.read_text().splitlines()
+    assert all(json.loads(ligne)["record"]["message"].startswith("ligne") for ligne in lignes)
+    assert json.loads(chemin.read_text().splitlines()[-1])["record"]["extra"]["numero"] == 49
+
+
+def test_full_queue_drops_records_without_blocking(tmp_path):
+    """
+    Test that records are dropped and counted when the queue is full.
+    """
+    sink = SinkAsynchrone(tmp_path / "api.log", taille_max=0, taille_file=2)
+    perdus = log_records.labels(status="dropped")._value.get()
+
+    for i in range(5):
+        sink(f"ligne {i}\n")
+    sink.demarrer()
+    sink.arreter()
+
+    assert log_records.labels(status="dropped")._value.get() == perdus + 3
+    assert (tmp_path / "api.log").read_text() == "ligne 0\nligne 1\n"
+
+
+def test_predictions_are_summarized_per_interval():
+    """
+    Test that predictions are logged as one summary per interval, with latency quantiles.
+    """
+    messages = []
+    identifiant = logger.add(messages.append, format="{message}")
+    resume = ResumePredictions(intervalle=60, capacite=100)
+    debut = time.time()
+    try:
+        for i in range(1000):
+            resume.ajouter({"survived": 1, "died": 2}, latence=(i % 100) / 1000, maintenant=debut + i * 0.01)
+        assert messages == []
+        resume.ajouter({"died": 1}, latence=0.05, maintenant=debut + 61)
+    finally:
+        logger.remove(identifiant)
+
+    assert len(messages) == 1
+    donnees = messages[0].record["extra"]["resume"]
+    assert donnees["predictions"] == 3001
+    assert donnees["calls"] == 1001
+    assert donnees["classes"] == {"survived": 1000, "died": 2001}
+    assert 0.03 < donnees["latency_p50"] < 0.07
+    assert donnees["latency_max"] <= 0.099
+    assert not np.isnan(donnees["latency_p99"])
+
+
+def test_sink_per_process_writes_and_rotates_its_own_file(tmp_path):
+    """
+    Test that a per-process sink writes and rotates a file named after the PID.
+    """
+    sink = SinkAsynchrone(tmp_path / "api.log", taille_max=2000, nb_archives=2, par_processus=True)
+    sink.demarrer()
+    identifiant = logger.add(sink, serialize=True)
+    try:
+        for i in range(50):
+            logger.info(f"ligne {i}")
+    finally:
+        logger.remove(identifiant)
+        sink.arreter()
+
+    assert sink.fichier() == tmp_path / f"api.{os.getpid()}.log"
+    assert json.loads(sink.fichier().read_text().splitlines()[-1])["record"]["message"] == "ligne 49"
+    assert list(tmp_path.glob(f"api.{os.getpid()}.log.*.gz"))
+    assert not (tmp_path / "api.log").exists()
@@ -0,0 +1,76 @@
+import sys
+import os
+
+import numpy as np
+from prometheus_client import CollectorRegistry, Histogram, Summary
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.metrics import (
+    enregistrer_predictions_lot,
+    prediction_batch_latency,
+    prediction_confidence_distribution,
+    prediction_confidence_summary,
+    prediction_errors,
+    prediction_item_latency,
+    prediction_latency,
+    prediction_request_batch_size,
+    predictions_total,
+)
+from api.metrics.monitoring import _observer_valeurs
+
+
+def echantillons(histogramme):
+    return [(s.name, s.labels, s.value) for metrique in histogramme.collect() for s in metrique.samples if not s.name.endswith("_created")]
+
+
+def test_batch_observation_matches_one_observe_per_value():
+    """
+    Test that observing the values of a batch gives the same samples as
+    calling observe for each value, and skips non-finite values.
+    """
+    registre = CollectorRegistry()
+    buckets = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99, 1.0)
+    un_par_un = Histogram("un_par_un", "", buckets=buckets, registry=registre)
+    en_lot = Histogram("en_lot", "", buckets=buckets, registry=registre)
+    resume_un_par_un = Summary("resume_un_par_un", "", registry=registre)
+    resume_en_lot = Summary("resume_en_lot", "", registry=registre)
+    valeurs = np.concatenate([np.random.default_rng(0).uniform(0.5, 1.0, 1000), buckets, [2.0]])
+    erreurs = prediction_errors.labels(error_type="non_finite_value")._value.get()
+
+    for valeur in valeurs:
+        un_par_un.observe(valeur)
+        resume_un_par_un.observe(valeur)
+    _observer_valeurs(en_lot, np.append(valeurs, [np.nan, np.inf]))
+    _observer_valeurs(resume_en_lot, valeurs)
+
+    for attendu, obtenu in ((un_par_un, en_lot), (resume_un_par_un, resume_en_lot)):
+        nom = attendu._name
+        attendus = [(n.replace(nom, obtenu._name), labels, v) for n, labels, v in echantillons(attendu)]
+        assert echantillons(obtenu) == attendus
+    assert prediction_errors.labels(error_type="non_finite_value")._value.get() == erreurs + 2
+
+
+def test_batch_recording_aggregates_per_class():
+    """
+    Test that a batch increments the counters per class and observes its size and amortized latency once.
+    """
+    classes = np.array(["died"] * 600 + ["survived"] * 400)
+    confidences = np.where(classes == "died", 0.7, 0.97)
+    morts = predictions_total.labels(model_version="lot", prediction_class="died")
+    tailles = prediction_request_batch_size.labels(endpoint="test")
+    latences = prediction_item_latency.labels(model_version="lot", endpoint="test")
+    lots = prediction_batch_latency.labels(model_version="lot", endpoint="test")
+    requetes = prediction_latency.labels(model_version="lot")
+    confiance = prediction_confidence_summary.labels(model_version="lot")
+    tres_surs = prediction_confidence_distribution.labels(prediction_class="survived")._buckets[6]
+    avant = [morts._value.get(), tailles._sum.get(), latences._sum.get(), confiance._count.get(), tres_surs.get(), lots._sum.get(), requetes._sum.get()]
+
+    enregistrer_predictions_lot("lot", classes, confidences, latency=0.05, endpoint="test")
+
+    assert morts._value.get() == avant[0] + 600
+    assert tailles._sum.get() == avant[1] + 1000
+    assert np.isclose(latences._sum.get(), avant[2] + 0.05 / 1000)
+    assert confiance._count.get() == avant[3] + 1000
+    assert tres_surs.get() == avant[4] + 400
+    assert np.isclose(lots._sum.get(), avant[5] + 0.05)
+    assert requetes._sum.get() == avant[6]
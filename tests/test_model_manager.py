@@ -0,0 +1,89 @@
+import sys
+import os
+import json
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.model_manager import ModelManager, calculer_version_modele
+from api.predict import MODEL_PATH, InferenceEngine, PredictionCache
+
+
+def fabrique(pipeline, version):
+    return InferenceEngine(pipeline, version=version)
+
+
+@pytest.fixture
+def chemin_modele(tmp_path):
+    chemin = tmp_path / "model.pkl"
+    shutil.copy(MODEL_PATH, chemin)
+    return chemin
+
+
+def test_reload_swaps_engine_and_version(chemin_modele):
+    """
+    Test that a reload serves a new engine labelled with the sidecar version.
+    """
+    manager = ModelManager(chemin_modele, fabrique)
+    ancien = manager.engine
+    assert manager.version == calculer_version_modele(chemin_modele)
+    assert manager.version.startswith("sha256-")
+    assert not manager.fichier_modifie()
+
+    chemin_modele.with_suffix(".json").write_text(json.dumps({"version": "v2.0"}))
+    assert manager.fichier_modifie()
+
+    resultat = manager.recharger()
+    assert resultat["model_version"] == "v2.0"
+    assert resultat["previous_version"] == ancien.version
+    assert manager.engine is not ancien
+
+    features = np.array([[0.0, 7.25], [1.0, 71.28]])
+    np.testing.assert_allclose(manager.engine.predict_proba(features), ancien.predict_proba(features))
+
+
+def test_failed_reload_keeps_current_engine(chemin_modele):
+    """
+    Test that an unreadable model file leaves the served engine in place.
+    """
+    manager = ModelManager(chemin_modele, fabrique)
+    ancien = manager.engine
+
+    chemin_modele.write_bytes(b"pas un modele")
+    with pytest.raises(Exception):
+        manager.recharger()
+    assert manager.engine is ancien
+
+
+def test_cache_is_invalidated_by_reload(chemin_modele):
+    """
+    Test that cached predictions of the previous engine are not served.
+    """
+    manager = ModelManager(chemin_modele, fabrique)
+    cache = PredictionCache(8)
+    _, cle = cache.preparer(np.array([1.0, 30.0]))
+    cache.get(manager.engine, cle)
+    cache.put(manager.engine, cle, (1, "ancien"))
+
+    manager.recharger()
+    assert cache.get(manager.engine, cle) is None
+
+
+def test_file_watcher_reloads_on_change(chemin_modele):
+    """
+    Test that the watcher thread picks up a new model version.
+    """
+    manager = ModelManager(chemin_modele, fabrique, intervalle_surveillance=0.05)
+    manager.engine
+    manager.demarrer_surveillance()
+    try:
+        chemin_modele.with_suffix(".json").write_text(json.dumps({"version": "v3.0"}))
+        limite = time.time() + 10
+        while manager.version != "v3.0" and time.time() < limite:
+            time.sleep(0.05)
+        assert manager.version == "v3.0"
+    finally:
+        manager.arreter_surveillance()
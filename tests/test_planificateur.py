@@ -0,0 +1,84 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api import planificateur as module_planificateur
+from api.historique import HistoriquePredictions
+from api.metrics import data_drift_score, monitoring_runs, resumer_rapport_drift
+from api.planificateur import PlanificateurSurveillance
+from api.predict import DATA_DIR
+from api.rapports import evaluer_drift
+from api.reference import construire_profil
+
+
+def profil(dossier, n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"Sex": rng.integers(0, 2, n).astype(np.float64), "Fare": rng.exponential(30.0, n)})
+    return construire_profil(df, dossier)
+
+
+def test_drift_summary_reads_value_drift_metrics():
+    """
+    Test that p-value tests drift below their threshold and distances at or above it.
+    """
+    resultats = {"metrics": [
+        {"config": {"type": "evidently:metric_v2:DriftedColumnsCount", "drift_share": 0.5},
+         "value": {"count": 1.0, "share": 0.5}},
+        {"config": {"type": "evidently:metric_v2:ValueDrift", "column": "Fare", "method": "K-S p_value", "threshold": 0.05},
+         "value": 0.01},
+        {"config": {"type": "evidently:metric_v2:ValueDrift", "column": "Sex", "method": "Wasserstein distance (normed)", "threshold": 0.1},
+         "value": 0.05},
+    ]}
+
+    resume = resumer_rapport_drift(resultats)
+
+    assert resume["drift_score"] == 0.5
+    assert resume["drift_detected"]
+    assert resume["columns"]["Fare"]["drift_detected"]
+    assert not resume["columns"]["Sex"]["drift_detected"]
+    assert resumer_rapport_drift({}) == {}
+
+
+def test_drift_is_skipped_without_enough_rows(tmp_path):
+    """
+    Test that the report does not run on a window with too few predictions.
+    """
+    resultat = evaluer_drift(profil(tmp_path), pd.DataFrame({"Sex": [1.0], "Fare": [10.0]}), min_lignes=100)
+
+    assert resultat["rows"] == 1
+    assert "skipped" in resultat
+
+
+def test_scheduled_run_publishes_drift_from_a_child_process(tmp_path, monkeypatch):
+    """
+    Test that a run evaluates the recent history in another process and updates the gauges.
+    """
+    historique = HistoriquePredictions(capacite=1000)
+    n = 500
+    features = np.column_stack([np.ones(n), np.full(n, 500.0)])
+    historique.ajouter(features, np.ones(n, dtype=bool), np.full(n, 0.9), latence=0.01)
+    monkeypatch.setattr(module_planificateur, "journal", None)
+    monkeypatch.setattr(module_planificateur, "historique", historique)
+    monkeypatch.setattr(module_planificateur, "echantillons", None)
+    monkeypatch.setattr(module_planificateur.config, "REFERENCE_PROFILE_DIR", str(tmp_path / "profiles"))
+
+    planificateur = PlanificateurSurveillance(60, min_lignes=100, chemin_labels=DATA_DIR / "titanic_test.csv")
+    succes = monitoring_runs.labels(status="success")._value.get()
+    try:
+        execution = planificateur.executer()
+        seconde = planificateur.executer()
+    finally:
+        planificateur.arreter()
+
+    assert execution["status"] == "success"
+    assert execution["drift"]["rows"] == n
+    assert execution["drift"]["drift_detected"]
+    assert data_drift_score._value.get() == execution["drift"]["drift_score"]
+    assert 0.0 <= execution["classification"]["accuracy"] <= 1.0
+    assert "classification" not in seconde["durations"]
+    assert seconde["classification"] == execution["classification"]
+    assert monitoring_runs.labels(status="success")._value.get() == succes + 2
+    assert planificateur.etat()["staleness"] is not None
@@ -0,0 +1,132 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.models import Passenger
+from api.predict import (
+    FEATURES,
+    InferenceEngine,
+    PredictionCache,
+    engine,
+    passengers_to_array,
+    pipeline,
+    predict_passengers,
+    predict_passengers_with_proba,
+)
+
+
+PASSAGERS = [
+    {"Sex": "M", "Fare": 7.25},
+    {"Sex": "F", "Fare": 71.2833},
+    {"Sex": "F", "Fare": 8.05},
+    {"Sex": "M", "Fare": 512.3292},
+]
+
+
+def test_single_pass_matches_pipeline_predict():
+    """
+    Test that the label derived from predict_proba matches pipeline.predict.
+    """
+    df = pd.DataFrame({
+        "Sex": [0 if p["Sex"] == "M" else 1 for p in PASSAGERS],
+        "Fare": [p["Fare"] for p in PASSAGERS],
+    })
+    attendus = ["Died" if c == 0 else "Survived" for c in pipeline.predict(df)]
+
+    assert predict_passengers(PASSAGERS) == attendus
+
+
+def test_probabilities_sum_to_one():
+    """
+    Test that each result exposes coherent probabilities and confidence.
+    """
+    for resultat in predict_passengers_with_proba(PASSAGERS):
+        assert abs(sum(resultat["probabilities"].values()) - 1.0) < 1e-9
+        assert resultat["confidence"] == resultat["probabilities"][resultat["prediction"]]
+
+
+def test_numpy_fast_path_matches_dataframe_path():
+    """
+    Test that the NumPy fast path gives the same probabilities as the
+    DataFrame path on the cleaned dataset.
+    """
+    df = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "titanic_cleaned_dataset.csv"))
+    features = df[list(FEATURES)].to_numpy(dtype=np.float64)
+
+    assert engine.fast_path
+    np.testing.assert_allclose(
+        engine.predict_proba(features),
+        pipeline.predict_proba(df[list(FEATURES)])
+    )
+
+
+def test_passengers_to_array_from_models():
+    """
+    Test that validated Passenger objects are encoded as [Sex, Fare] rows.
+    """
+    features = passengers_to_array([Passenger(Sex="f", Fare=10.5), Passenger(Sex="M", Fare=3.0)])
+
+    assert features.dtype == np.float64
+    assert features.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(features, [[1.0, 10.5], [0.0, 3.0]])
+
+
+def test_prediction_cache_lru_and_model_change():
+    """
+    Test LRU eviction and invalidation of the cache when the engine changes.
+    """
+    cache = PredictionCache(capacite=2)
+    cles = [cache.preparer(np.array([sex, 10.0]))[1] for sex in (0.0, 1.0)]
+    cache.put(engine, cles[0], "ignorée")
+    assert cache.get(engine, cles[0]) is None
+
+    cache.put(engine, cles[0], (0, "a"))
+    cache.put(engine, cles[1], (1, "b"))
+    assert cache.get(engine, cles[0]) == (0, "a")
+
+    troisieme = cache.preparer(np.array([0.0, 20.0]))[1]
+    cache.put(engine, troisieme, (0, "c"))
+    assert cache.get(engine, cles[1]) is None
+    assert cache.get(engine, cles[0]) == (0, "a")
+
+    autre_modele = InferenceEngine(pipeline)
+    assert cache.get(autre_modele, cles[0]) is None
+
+
+def test_prediction_cache_fare_quantization():
+    """
+    Test that quantized fares share a key and are scored on the rounded fare.
+    """
+    cache = PredictionCache(capacite=10, pas_fare=0.5)
+    features_a, cle_a = cache.preparer(np.array([1.0, 6.9]))
+    features_b, cle_b = cache.preparer(np.array([1.0, 7.1]))
+
+    assert cle_a == cle_b == (1.0, 7.0)
+    np.testing.assert_array_equal(features_a, [1.0, 7.0])
+
+
+def test_compiled_model_parity_with_pipeline():
+    """
+    Test that the compiled decision table returns exactly the pipeline
+    probabilities, including fares at and around every split threshold.
+    """
+    compile = InferenceEngine(pipeline, compiler=True)
+    assert compile.compiled
+
+    scaler = pipeline.steps[0][1].named_transformers_["num"]
+    frontieres = compile._table.seuils * scaler.scale_[0] + scaler.mean_[0]
+    fares = np.concatenate([
+        frontieres,
+        np.nextafter(frontieres, -np.inf),
+        np.nextafter(frontieres, np.inf),
+        np.random.default_rng(0).uniform(0.0, 600.0, 5000),
+    ])
+    features = np.array([[sex, fare] for sex in (0.0, 1.0) for fare in fares])
+
+    np.testing.assert_array_equal(
+        compile.predict_proba(features),
+        compile._predict_proba_pipeline(features)
+    )
@@ -0,0 +1,76 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api import config
+from api.metrics import monitoring
+from api.metrics import arreter_pool_rapports, data_drift_score, generer_rapport_complet
+from api.predict import DATA_DIR
+from api.reference import construire_profil, lire_reference
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pool():
+    yield
+    arreter_pool_rapports()
+
+
+@pytest.fixture(scope="module")
+def donnees():
+    reference = lire_reference(DATA_DIR / "titanic_train.csv")
+    courant = lire_reference(DATA_DIR / "titanic_test.csv")
+    reference["prediction"] = reference["Sex"]
+    courant["prediction"] = courant["Sex"]
+    return reference, courant
+
+
+@pytest.mark.parametrize("processus", [1, 2])
+def test_complete_report_times_each_report(donnees, tmp_path, monkeypatch, processus):
+    """
+    Test that both reports are generated, in the pool or in-process, with their durations.
+    """
+    monkeypatch.setattr(config, "REPORT_WORKERS", processus)
+    reference, courant = donnees
+    rapport = generer_rapport_complet(reference, courant, "Survived", "prediction", report_dir=tmp_path)
+
+    assert set(rapport["durees"]) == {"classification", "drift", "total"}
+    assert all(duree > 0 for duree in rapport["durees"].values())
+    assert rapport["classification"]["metrics"]
+    assert rapport["drift"]["metrics"]
+    for chemin in rapport["fichiers"].values():
+        assert os.path.exists(chemin)
+    assert 0.0 <= data_drift_score._value.get() <= 1.0
+
+
+def test_complete_report_shares_a_reference_profile(donnees, tmp_path, monkeypatch):
+    """
+    Test that a reference profile is read by the pool processes from its directory.
+    """
+    monkeypatch.setattr(config, "REPORT_WORKERS", 2)
+    reference, courant = donnees
+    profil = construire_profil(reference, tmp_path / "profil")
+    rapport = generer_rapport_complet(profil, courant, "Survived", "prediction", report_dir=tmp_path / "rapports")
+
+    assert rapport["classification"]["metrics"]
+    assert rapport["drift"]["metrics"]
+    assert list(courant.columns) == ["Survived", "Sex", "Fare", "prediction"]
+
+
+def test_shared_columns_are_mapped_without_copy(donnees, tmp_path):
+    """
+    Test that the report processes read the shared columns from the mapped files, without copying them.
+    """
+    def fichier_mappe(valeurs):
+        while valeurs is not None and not isinstance(valeurs, np.memmap):
+            valeurs = valeurs.base
+        return valeurs is not None
+
+    reference, _ = donnees
+
+    df = monitoring._charger_partage(monitoring._partager(reference, tmp_path / "reference"))
+
+    assert df.equals(reference)
+    assert all(fichier_mappe(df[nom].to_numpy()) for nom in df.columns)
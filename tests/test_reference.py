@@ -0,0 +1,37 @@
+import sys
+import os
+import shutil
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api.predict import DATA_DIR
+from api.reference import charger_profil, lire_reference
+
+
+def test_profile_is_built_once_and_memory_mapped(tmp_path):
+    """
+    Test that the profile matches the CSV, is reused while the CSV is
+    unchanged and rebuilt when it changes.
+    """
+    source = tmp_path / "reference.csv"
+    shutil.copy(DATA_DIR / "titanic_train.csv", source)
+    dossier = tmp_path / "profil"
+    df = lire_reference(source)
+
+    profil = charger_profil(source, dossier)
+    assert profil.nb_lignes == len(df)
+    assert set(profil.colonnes) == {"Survived", "Sex", "Fare"}
+    assert isinstance(profil.colonnes["Fare"], np.memmap)
+    assert np.shares_memory(profil.dataframe()["Fare"].to_numpy(), profil.colonnes["Fare"])
+    assert np.array_equal(profil.valeurs_triees["Fare"], np.sort(df["Fare"].to_numpy()))
+    assert sum(profil.statistiques("Fare")["histogram"]) == len(df)
+    assert profil.statistiques("Sex")["categories"] == [0.0, 1.0]
+
+    date = (dossier / "profile.json").stat().st_mtime_ns
+    assert charger_profil(source, dossier).meta == profil.meta
+    assert (dossier / "profile.json").stat().st_mtime_ns == date
+
+    with open(source, "a") as fichier:
+        fichier.write("9999,1,1,500.0\n")
+    assert charger_profil(source, dossier).nb_lignes == len(df) + 1
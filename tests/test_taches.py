@@ -0,0 +1,129 @@
+import sys
+import os
+import time
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api import taches as module_taches
+from api.echantillons import ReservoirsPredictions
+from api.metrics import report_jobs
+from api.taches import GestionnaireTaches, TachesSaturees
+
+
+@pytest.fixture(scope="module")
+def gestionnaire(tmp_path_factory):
+    gestionnaire = GestionnaireTaches(tmp_path_factory.mktemp("jobs"), nb_workers=1, max_actives=2)
+    yield gestionnaire
+    gestionnaire.arreter()
+
+
+@pytest.fixture
+def trafic(tmp_path, monkeypatch):
+    reservoirs = ReservoirsPredictions(taille=1000, graine=0)
+    n = 500
+    maintenant = time.time()
+    reservoirs.ajouter(np.column_stack([np.ones(n), np.full(n, 500.0)]), np.ones(n, dtype=bool), maintenant=maintenant)
+    monkeypatch.setattr(module_taches, "journal", None)
+    monkeypatch.setattr(module_taches, "echantillons", reservoirs)
+    monkeypatch.setattr(module_taches.config, "REFERENCE_PROFILE_DIR", str(tmp_path / "profiles"))
+    return maintenant
+
+
+def attendre(gestionnaire, identifiant, delai=120):
+    fin = time.time() + delai
+    while time.time() < fin:
+        tache = gestionnaire.obtenir(identifiant)
+        if tache["status"] in ("success", "error"):
+            return tache
+        time.sleep(0.1)
+    raise TimeoutError(identifiant)
+
+
+def test_drift_job_runs_in_background_and_persists_its_results(gestionnaire, trafic):
+    """
+    Test that a drift job returns at once, is deduplicated while pending, and
+    leaves its JSON and HTML results on disk.
+    """
+    succes = report_jobs.labels(report="drift", status="success")._value.get()
+
+    tache, dedupliquee = gestionnaire.soumettre("drift", depuis=trafic - 60)
+    identique, dedupliquee_2 = gestionnaire.soumettre("drift", depuis=trafic - 60)
+
+    assert tache["status"] == "pending"
+    assert not dedupliquee
+    assert dedupliquee_2
+    assert identique["id"] == tache["id"]
+
+    terminee = attendre(gestionnaire, tache["id"])
+
+    assert terminee["status"] == "success", terminee.get("error")
+    assert terminee["result"]["rows"] == 500
+    assert terminee["result"]["summary"]["drift_detected"]
+    assert terminee["duration"] > 0
+    assert gestionnaire.fichier_resultat(tache["id"]).exists()
+    assert gestionnaire.fichier_resultat(tache["id"], "drift").exists()
+    assert report_jobs.labels(report="drift", status="success")._value.get() == succes + 1
+
+    gestionnaire._taches.clear()
+    assert gestionnaire.obtenir(tache["id"])["status"] == "success"
+
+
+def test_jobs_past_the_limit_are_refused(gestionnaire, trafic):
+    """
+    Test that submissions past the limit of active jobs raise TachesSaturees,
+    and that a job over an empty window ends in error.
+    """
+    premiere, _ = gestionnaire.soumettre("drift", depuis=trafic + 3600)
+    seconde, _ = gestionnaire.soumettre("drift", depuis=trafic + 7200)
+    with pytest.raises(TachesSaturees):
+        gestionnaire.soumettre("drift", depuis=trafic + 10800)
+
+    for tache in (premiere, seconde):
+        terminee = attendre(gestionnaire, tache["id"])
+        assert terminee["status"] == "error"
+        assert "Aucune prédiction" in terminee["error"]
+    assert gestionnaire.fichier_resultat(premiere["id"]) is None
+
+
+def test_workers_share_deduplication_and_limit(tmp_path, trafic):
+    """
+    Test that a job pending in one worker is deduplicated and counted by
+    another worker sharing the jobs directory.
+    """
+    autre = GestionnaireTaches(tmp_path / "jobs", max_actives=1)
+    gestionnaire = GestionnaireTaches(tmp_path / "jobs", max_actives=1)
+    tache = {"id": "a" * 32, "report": "drift", "status": "pending", "submitted_at": time.time(), "worker": autre._proprietaire()}
+    autre._ecrire(tache)
+    cle = "0" * 64
+    autre._reserver(cle, tache["id"])
+
+    with pytest.raises(FileExistsError):
+        gestionnaire._reserver(cle, "b" * 32)
+    with pytest.raises(TachesSaturees):
+        gestionnaire.soumettre("drift", depuis=trafic + 3600)
+    assert gestionnaire.obtenir(tache["id"])["status"] == "pending"
+    autre.arreter()
+
+
+def test_jobs_of_a_stopped_worker_are_marked_as_errors(tmp_path, trafic):
+    """
+    Test that the pending job of a stopped worker is reported as an error and
+    no longer counts against the limit.
+    """
+    arrete = GestionnaireTaches(tmp_path / "jobs", max_actives=1)
+    gestionnaire = GestionnaireTaches(tmp_path / "jobs", max_actives=1)
+    tache = {"id": "c" * 32, "report": "drift", "status": "pending", "submitted_at": time.time(), "worker": arrete._proprietaire()}
+    arrete._ecrire(tache)
+    arrete._reserver("1" * 64, tache["id"])
+    arrete.arreter()
+
+    perdue = gestionnaire.obtenir(tache["id"])
+    assert perdue["status"] == "error"
+    assert "worker" in perdue["error"]
+
+    nouvelle, _ = gestionnaire.soumettre("drift", depuis=trafic + 3600)
+    assert attendre(gestionnaire, nouvelle["id"])["status"] == "error"
+    assert not list((tmp_path / "jobs" / "actives").iterdir())
+    gestionnaire.arreter()